@@ -0,0 +1,38 @@
+"""add reminders
+
+Revision ID: 0c5d7e2a9f18
+Revises: b6e0a4c93d21
+Create Date: 2026-10-19 16:12:05.218840
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0c5d7e2a9f18'
+down_revision: Union[str, None] = 'b6e0a4c93d21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+LIVE = sa.text('deleted_at IS NULL')
+
+
+def upgrade() -> None:
+    op.create_index('ix_interviews_starts_at_live', 'interviews', ['starts_at'],
+                    sqlite_where=LIVE, postgresql_where=LIVE)
+    op.create_table(
+        'reminders_sent',
+        sa.Column('interview_id', sa.Integer(), nullable=False),
+        sa.Column('lead_minutes', sa.Integer(), nullable=False),
+        sa.Column('starts_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('sent_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('interview_id', 'lead_minutes', 'starts_at'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('reminders_sent')
+    op.drop_index('ix_interviews_starts_at_live', table_name='interviews')
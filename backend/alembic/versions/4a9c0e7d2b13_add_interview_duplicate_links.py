@@ -0,0 +1,35 @@
+"""add interview duplicate links
+
+Revision ID: 4a9c0e7d2b13
+Revises: d38a6f0b1c72
+Create Date: 2026-10-19 18:20:37.914562
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4a9c0e7d2b13'
+down_revision: Union[str, None] = 'd38a6f0b1c72'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+LIVE = sa.text('deleted_at IS NULL')
+
+
+def upgrade() -> None:
+    op.add_column('interviews', sa.Column('dedupe_key', sa.String(), nullable=True))
+    op.add_column('interviews', sa.Column('duplicate_of', sa.Integer(), nullable=True))
+    op.create_index('ix_interviews_user_dedupe_live', 'interviews', ['user_id', 'dedupe_key'],
+                    sqlite_where=LIVE, postgresql_where=LIVE)
+    # existing rows are keyed and linked online afterwards: python -m app.services.duplicates
+
+
+def downgrade() -> None:
+    op.drop_index('ix_interviews_user_dedupe_live', table_name='interviews')
+    with op.batch_alter_table('interviews') as batch_op:
+        batch_op.drop_column('duplicate_of')
+        batch_op.drop_column('dedupe_key')
@@ -0,0 +1,53 @@
+"""add users.email_lower
+
+Revision ID: 5b2e8c41d7a3
+Revises: 29a7fbe1ba9b
+Create Date: 2026-10-19 10:12:04.118522
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b2e8c41d7a3'
+down_revision: Union[str, None] = '29a7fbe1ba9b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('email_lower', sa.String(), nullable=True))
+
+    # backfill in keyset-ordered chunks so no single statement holds the lock for long
+    conn = op.get_bind()
+    users = sa.table('users', sa.column('id', sa.Integer), sa.column('email', sa.String),
+                     sa.column('email_lower', sa.String))
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(users.c.id, users.c.email)
+            .where(users.c.id > last_id)
+            .order_by(users.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        conn.execute(
+            users.update().where(users.c.id == sa.bindparam('_id')).values(email_lower=sa.bindparam('_lower')),
+            [{'_id': row.id, '_lower': row.email.lower()} for row in rows],
+        )
+        last_id = rows[-1].id
+
+    # fails if existing rows only differ by case; resolve those before upgrading
+    op.create_index(op.f('ix_users_email_lower'), 'users', ['email_lower'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_users_email_lower'), table_name='users')
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('email_lower')
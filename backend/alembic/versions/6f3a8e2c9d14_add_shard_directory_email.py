@@ -0,0 +1,30 @@
+"""add shard directory email claims
+
+Revision ID: 6f3a8e2c9d14
+Revises: 9b2f61d8c4e0
+Create Date: 2026-10-19 20:41:09.530218
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6f3a8e2c9d14'
+down_revision: Union[str, None] = '9b2f61d8c4e0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # existing users' emails are claimed by `python -m app.db.shards claim-emails`
+    op.add_column('shard_directory', sa.Column('email_lower', sa.String(), nullable=True))
+    op.create_index('uq_shard_directory_email_lower', 'shard_directory', ['email_lower'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('uq_shard_directory_email_lower', table_name='shard_directory')
+    with op.batch_alter_table('shard_directory') as batch_op:
+        batch_op.drop_column('email_lower')
@@ -0,0 +1,113 @@
+"""compact interview encoding
+
+Revision ID: 7e21c4d9b5a6
+Revises: 0c5d7e2a9f18
+Create Date: 2026-10-19 17:03:51.662410
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.db.backfill import Backfill, BackfillRunner, checkpoints
+from app.db.models import INTERVIEW_SOURCE_CODES, INTERVIEW_TYPE_CODES
+from app.db.types import pack, unpack
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7e21c4d9b5a6'
+down_revision: Union[str, None] = '0c5d7e2a9f18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# type/source become small-integer codes and details packed bytes, via shadow columns
+interviews = sa.table(
+    'interviews', sa.column('id', sa.Integer),
+    sa.column('type', sa.String), sa.column('source', sa.String), sa.column('details', sa.JSON(none_as_null=True)),
+    sa.column('type_code', sa.SmallInteger), sa.column('source_code', sa.SmallInteger),
+    sa.column('details_packed', sa.LargeBinary),
+)
+SHADOWS = (('type', 'type_code'), ('source', 'source_code'), ('details', 'details_packed'))
+
+
+def _code(codes: dict, value):
+    if value is None:
+        return None
+    if value not in codes:
+        raise ValueError(f"interview value {value!r} has no code; fix or clear it before upgrading")
+    return codes[value]
+
+
+def _encode(conn, rows) -> None:
+    conn.execute(
+        interviews.update().where(interviews.c.id == sa.bindparam('_id')).values(
+            type_code=sa.bindparam('_type'), source_code=sa.bindparam('_source'),
+            details_packed=sa.bindparam('_details')),
+        [{'_id': row.id, '_type': _code(INTERVIEW_TYPE_CODES, row.type),
+          '_source': _code(INTERVIEW_SOURCE_CODES, row.source),
+          '_details': None if row.details is None else pack(row.details)} for row in rows],
+    )
+
+
+def _decode(conn, rows) -> None:
+    types = {code: value for value, code in INTERVIEW_TYPE_CODES.items()}
+    sources = {code: value for value, code in INTERVIEW_SOURCE_CODES.items()}
+    conn.execute(
+        interviews.update().where(interviews.c.id == sa.bindparam('_id')).values(
+            type=sa.bindparam('_type'), source=sa.bindparam('_source'), details=sa.bindparam('_details')),
+        [{'_id': row.id, '_type': types.get(row.type_code), '_source': sources.get(row.source_code),
+          '_details': None if row.details_packed is None else unpack(row.details_packed)} for row in rows],
+    )
+
+
+def _alter(drop: tuple = (), rename: dict = {}, types: dict = {}) -> None:
+    # one table rebuild on sqlite for all the column drops and renames
+    with op.batch_alter_table('interviews') as batch_op:
+        for column in drop:
+            batch_op.drop_column(column)
+        for old, new in rename.items():
+            batch_op.alter_column(old, new_column_name=new, existing_type=types[old])
+
+
+def _run(name: str, apply, columns) -> None:
+    # commit chunk by chunk outside the migration's transaction, so the table is never locked for the whole pass
+    with op.get_context().autocommit_block():
+        conn = op.get_bind()
+        BackfillRunner(conn, Backfill(name, interviews, apply, columns=columns)).run()
+        conn.execute(checkpoints.delete().where(checkpoints.c.name == name))
+
+
+def _catch_up(apply, pairs) -> None:
+    # rows inserted after the backfill cursor passed them, in the migration's transaction: writers stay locked
+    # out until the table rebuild commits. Rows updated in place during the backfill are not revisited.
+    conn = op.get_bind()
+    if conn.dialect.name == 'sqlite':
+        conn.execute(interviews.update().where(sa.false()).values(id=interviews.c.id)) # takes the write lock
+    else:
+        conn.execute(sa.text('LOCK TABLE interviews IN EXCLUSIVE MODE'))
+    missed = sa.or_(*(sa.and_(column.is_not(None), shadow.is_(None)) for column, shadow in pairs))
+    rows = conn.execute(sa.select(interviews.c.id, *(column for column, _ in pairs)).where(missed)).all()
+    if rows:
+        apply(conn, rows)
+
+
+def upgrade() -> None:
+    added = {'type_code': sa.SmallInteger(), 'source_code': sa.SmallInteger(), 'details_packed': sa.LargeBinary()}
+    for name, column_type in added.items():
+        op.add_column('interviews', sa.Column(name, column_type, nullable=True))
+    _run('interviews.compact_encoding', _encode,
+         (interviews.c.type, interviews.c.source, interviews.c.details))
+    _catch_up(_encode, [(interviews.c[column], interviews.c[shadow]) for column, shadow in SHADOWS])
+    _alter(drop=('type', 'source', 'details'), rename={shadow: column for column, shadow in SHADOWS}, types=added)
+
+
+def downgrade() -> None:
+    packed = {'type': sa.SmallInteger(), 'source': sa.SmallInteger(), 'details': sa.LargeBinary()}
+    _alter(rename={column: shadow for column, shadow in SHADOWS}, types=packed)
+    for name, column_type in (('type', sa.String()), ('source', sa.String()), ('details', sa.JSON())):
+        op.add_column('interviews', sa.Column(name, column_type, nullable=True))
+    _run('interviews.expand_encoding', _decode,
+         (interviews.c.type_code, interviews.c.source_code, interviews.c.details_packed))
+    _catch_up(_decode, [(interviews.c[shadow], interviews.c[column]) for column, shadow in SHADOWS])
+    _alter(drop=('type_code', 'source_code', 'details_packed'))
@@ -0,0 +1,60 @@
+"""soft delete tombstones
+
+Revision ID: 8d4a1f6c2e95
+Revises: 5b2e8c41d7a3
+Create Date: 2026-10-19 11:02:47.530911
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d4a1f6c2e95'
+down_revision: Union[str, None] = '5b2e8c41d7a3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+LIVE = sa.text('deleted_at IS NULL')
+DEAD = sa.text('deleted_at IS NOT NULL')
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('interviews', sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=True))
+
+    # uniqueness moves to partial indexes over live rows
+    op.drop_index('ix_users_email', table_name='users')
+    op.create_index('ix_users_email', 'users', ['email'])
+    op.drop_index('ix_users_email_lower', table_name='users')
+    op.drop_index('ix_users_google_sub', table_name='users')
+    op.create_index('uq_users_email_lower_live', 'users', ['email_lower'], unique=True,
+                    sqlite_where=LIVE, postgresql_where=LIVE)
+    op.create_index('uq_users_google_sub_live', 'users', ['google_sub'], unique=True,
+                    sqlite_where=LIVE, postgresql_where=LIVE)
+    op.create_index('ix_users_deleted_at', 'users', ['deleted_at'],
+                    sqlite_where=DEAD, postgresql_where=DEAD)
+
+    op.create_index('ix_interviews_user_live', 'interviews', ['user_id', 'id'],
+                    sqlite_where=LIVE, postgresql_where=LIVE)
+    op.create_index('ix_interviews_deleted_at', 'interviews', ['deleted_at'],
+                    sqlite_where=DEAD, postgresql_where=DEAD)
+
+
+def downgrade() -> None:
+    # tombstoned rows must be purged first or the unique indexes below will fail
+    op.drop_index('ix_interviews_deleted_at', table_name='interviews')
+    op.drop_index('ix_interviews_user_live', table_name='interviews')
+    op.drop_index('ix_users_deleted_at', table_name='users')
+    op.drop_index('uq_users_google_sub_live', table_name='users')
+    op.drop_index('uq_users_email_lower_live', table_name='users')
+    op.create_index('ix_users_google_sub', 'users', ['google_sub'], unique=True)
+    op.create_index('ix_users_email_lower', 'users', ['email_lower'], unique=True)
+    op.drop_index('ix_users_email', table_name='users')
+    op.create_index('ix_users_email', 'users', ['email'], unique=True)
+    with op.batch_alter_table('interviews') as batch_op:
+        batch_op.drop_column('deleted_at')
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('deleted_at')
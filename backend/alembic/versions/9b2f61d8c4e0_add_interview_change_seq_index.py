@@ -0,0 +1,25 @@
+"""add interview change_seq index
+
+Revision ID: 9b2f61d8c4e0
+Revises: 4a9c0e7d2b13
+Create Date: 2026-10-19 19:12:44.081532
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b2f61d8c4e0'
+down_revision: Union[str, None] = '4a9c0e7d2b13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_interviews_change_seq', 'interviews', ['change_seq'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_interviews_change_seq', table_name='interviews')
@@ -0,0 +1,36 @@
+"""add interview archive
+
+Revision ID: a3f1c9d27b64
+Revises: e19f5d3b8a60
+Create Date: 2026-10-19 14:02:37.118520
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3f1c9d27b64'
+down_revision: Union[str, None] = 'e19f5d3b8a60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'interview_archive',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('starts_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('archived_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column('payload', sa.LargeBinary(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_interview_archive_user_id', 'interview_archive', ['user_id', 'id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_interview_archive_user_id', table_name='interview_archive')
+    op.drop_table('interview_archive')
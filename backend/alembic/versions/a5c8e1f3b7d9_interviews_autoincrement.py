@@ -0,0 +1,40 @@
+"""interviews autoincrement
+
+Revision ID: a5c8e1f3b7d9
+Revises: 6f3a8e2c9d14
+Create Date: 2026-10-19 21:05:37.204816
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a5c8e1f3b7d9'
+down_revision: Union[str, None] = '6f3a8e2c9d14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # SQLite reuses max(id) + 1 without AUTOINCREMENT, which could hand out an archived
+    # interview's id again; PostgreSQL sequences never go back, so there is nothing to do
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    with op.batch_alter_table('interviews', recreate='always',
+                              table_kwargs={'sqlite_autoincrement': True}):
+        pass
+    # start past every id ever handed out, archived ones included
+    op.execute("DELETE FROM sqlite_sequence WHERE name = 'interviews'")
+    op.execute(
+        "INSERT INTO sqlite_sequence (name, seq) SELECT 'interviews', max("
+        "(SELECT coalesce(max(id), 0) FROM interviews), (SELECT coalesce(max(id), 0) FROM interview_archive))"
+    )
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    with op.batch_alter_table('interviews', recreate='always',
+                              table_kwargs={'sqlite_autoincrement': False}):
+        pass
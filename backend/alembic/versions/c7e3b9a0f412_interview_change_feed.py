@@ -0,0 +1,43 @@
+"""interview change feed
+
+Revision ID: c7e3b9a0f412
+Revises: 8d4a1f6c2e95
+Create Date: 2026-10-19 11:48:13.902344
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7e3b9a0f412'
+down_revision: Union[str, None] = '8d4a1f6c2e95'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'sequences',
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('value', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('name'),
+    )
+    op.add_column('interviews', sa.Column('change_seq', sa.Integer(), nullable=True))
+
+    # existing rows enter the feed in id order; the counter continues after them
+    op.execute("UPDATE interviews SET change_seq = id")
+    op.execute(
+        "INSERT INTO sequences (name, value) "
+        "SELECT 'interview_changes', COALESCE(MAX(id), 0) FROM interviews"
+    )
+    op.create_index('ix_interviews_user_change_seq', 'interviews', ['user_id', 'change_seq'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_interviews_user_change_seq', table_name='interviews')
+    with op.batch_alter_table('interviews') as batch_op:
+        batch_op.drop_column('change_seq')
+    op.drop_table('sequences')
@@ -0,0 +1,32 @@
+"""add dashboard indexes
+
+Revision ID: d38a6f0b1c72
+Revises: 7e21c4d9b5a6
+Create Date: 2026-10-19 17:48:20.305117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd38a6f0b1c72'
+down_revision: Union[str, None] = '7e21c4d9b5a6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+LIVE = sa.text('deleted_at IS NULL')
+
+
+def upgrade() -> None:
+    op.create_index('ix_interviews_user_starts_at_live', 'interviews', ['user_id', 'starts_at'],
+                    sqlite_where=LIVE, postgresql_where=LIVE)
+    op.create_index('ix_interviews_user_type_live', 'interviews', ['user_id', 'type'],
+                    sqlite_where=LIVE, postgresql_where=LIVE)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_interviews_user_type_live', table_name='interviews')
+    op.drop_index('ix_interviews_user_starts_at_live', table_name='interviews')
@@ -0,0 +1,31 @@
+"""add shard directory
+
+Revision ID: e19f5d3b8a60
+Revises: c7e3b9a0f412
+Create Date: 2026-10-19 13:20:51.447018
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e19f5d3b8a60'
+down_revision: Union[str, None] = 'c7e3b9a0f412'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'shard_directory',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('shard', sa.String(), nullable=False),
+        sa.PrimaryKeyConstraint('user_id'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('shard_directory')
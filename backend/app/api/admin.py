@@ -0,0 +1,89 @@
+import tracemalloc
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+
+from app.api.deps import require_admin
+from app.core import admission, profiling
+from app.core.bulkheads import bulkhead
+from app.db import session as db_session
+from app.db import slow_queries
+from app.db.session import get_user_db
+from app.services import duplicates
+
+# operational endpoints; every route needs an admin token
+router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(require_admin)])
+
+def profiling_enabled() -> None:
+    if not profiling.PROFILING_ENABLED:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profiling is disabled")
+
+@router.get("/metrics")
+@bulkhead("admin")
+def metrics():
+    return {"admission": admission.metrics.snapshot()}
+
+@router.get("/slow-queries")
+@bulkhead("admin")
+def list_slow_queries(limit: int = Query(20, ge=1, le=500)):
+    """Slowest statement fingerprints by total time, with their captured plans."""
+    return {"queries": slow_queries.slow_log.top(limit), "dropped": slow_queries.slow_log.dropped}
+
+@router.delete("/slow-queries", status_code=status.HTTP_204_NO_CONTENT)
+@bulkhead("admin")
+def clear_slow_queries():
+    slow_queries.slow_log.clear()
+
+@router.get("/profiles", dependencies=[Depends(profiling_enabled)])
+@bulkhead("admin")
+def list_profiles():
+    return [{"id": report_id, "path": report["path"], "elapsed_ms": report["elapsed_ms"]}
+            for report_id, report in reversed(profiling.reports.items())]
+
+@router.get("/profiles/{profile_id}", dependencies=[Depends(profiling_enabled)])
+@bulkhead("admin")
+def get_profile(profile_id: int):
+    report = profiling.reports.get(profile_id)
+    if report is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+    return report
+
+@router.post("/memory/snapshots", status_code=status.HTTP_201_CREATED, dependencies=[Depends(profiling_enabled)])
+@bulkhead("admin")
+def take_memory_snapshot():
+    """Start tracemalloc if needed and keep a snapshot of the heap."""
+    snapshot_id, snapshot = profiling.take_snapshot()
+    current, peak = tracemalloc.get_traced_memory()
+    return {"id": snapshot_id, "traces": len(snapshot.traces), "traced_bytes": current, "peak_bytes": peak}
+
+@router.get("/memory/diff", dependencies=[Depends(profiling_enabled)])
+@bulkhead("admin")
+def memory_diff(
+    base: int, target: Optional[int] = Query(None, description="Defaults to a fresh snapshot"),
+    group_by: Literal["lineno", "filename", "traceback"] = "lineno",
+    limit: int = Query(25, ge=1, le=500),
+):
+    """Allocation growth from snapshot `base` to `target`, largest first."""
+    if base not in profiling.snapshots or (target is not None and target not in profiling.snapshots):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Snapshot not found")
+    # read base first: a fresh target snapshot may evict it when the store is full
+    base_snapshot = profiling.snapshots[base]
+    target_id, snapshot = (target, profiling.snapshots[target]) if target is not None else profiling.take_snapshot()
+    return {"base": base, "target": target_id,
+            "stats": profiling.diff(base_snapshot, snapshot, group_by, limit)}
+
+@router.delete("/memory", status_code=status.HTTP_204_NO_CONTENT, dependencies=[Depends(profiling_enabled)])
+@bulkhead("admin")
+def stop_memory_tracing():
+    profiling.stop_tracing()
+
+@router.post("/duplicates/scan")
+@bulkhead("admin")
+def scan_duplicates(user_id: Optional[int] = None, db: Session = Depends(get_user_db)):
+    """Bulk duplicate pass: re-key and re-link one user's interviews, or everyone's on every shard."""
+    shards = db_session.shard_router
+    if user_id is not None or shards is None:
+        return duplicates.scan(db, user_id)
+    parts = shards.scatter(duplicates.scan).values()
+    return {"users": sum(part["users"] for part in parts), "links_changed": sum(part["links_changed"] for part in parts)}
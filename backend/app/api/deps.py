@@ -1,7 +1,68 @@
+from typing import Optional, Sequence
+
+from fastapi import Depends, Header, HTTPException, Query, status
+from sqlalchemy.orm import Session
+
+from app.core import security
+from app.db.session import get_db
 from app.schemas.common import PaginationParams
 
+# cap on ids per multi-get request; the service chunks the IN (...) list further
+MAX_IDS_PER_REQUEST = 1000
+
 def pagination_params(
-    limit: int,
-    offset: int
+    limit: int = Query(50, ge=1, le=100),
+    offset: int = Query(0, ge=0)
 ) -> PaginationParams:
-    return PaginationParams(limit=limit, offset=offset)
\ No newline at end of file
+    return PaginationParams(limit=limit, offset=offset)
+
+def id_list(
+    ids: Optional[str] = Query(None, description="Comma-separated ids, e.g. 1,2,3")
+) -> Optional[list[int]]:
+    if ids is None:
+        return None
+    try:
+        parsed = [int(part) for part in ids.split(",") if part.strip()]
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="ids must be comma-separated integers")
+    if not parsed:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="ids must not be empty")
+    if len(parsed) > MAX_IDS_PER_REQUEST:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=f"at most {MAX_IDS_PER_REQUEST} ids per request")
+    return parsed
+
+def sparse_fields(allowed: Sequence[str]):
+    """Dependency for ?fields=a,b: the requested subset of `allowed`, id always first."""
+    def parse(
+        fields: Optional[str] = Query(None, description=f"Comma-separated subset of: {', '.join(allowed)}")
+    ) -> Optional[list[str]]:
+        if fields is None:
+            return None
+        requested = {part.strip() for part in fields.split(",") if part.strip()}
+        unknown = requested - set(allowed)
+        if unknown:
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=f"unknown fields: {', '.join(sorted(unknown))}")
+        return ["id"] + [field for field in allowed if field in requested and field != "id"]
+    return parse
+
+def current_user_id(
+    authorization: Optional[str] = Header(None),
+    db: Session = Depends(get_db),
+) -> Optional[int]:
+    # None when no token was sent and AUTH_REQUIRED is off (legacy clients)
+    return security.user_id_from_authorization(db, authorization)
+
+def require_admin(authorization: Optional[str] = Header(None)) -> dict:
+    """Claims of a token carrying `admin: true`; guards operational endpoints."""
+    claims = security.claims_from_authorization(authorization)
+    if claims.get("admin") is not True:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin token required")
+    return claims
+
+def resolve_user_scope(auth_user_id: Optional[int], requested: Optional[int]) -> Optional[int]:
+    """The user a request acts for: the token's user, which a client-supplied id must match."""
+    if auth_user_id is None:
+        return requested
+    if requested is not None and requested != auth_user_id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Cannot act on another user's interviews")
+    return auth_user_id
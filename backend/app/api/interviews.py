@@ -1,65 +1,199 @@
-from typing import List, Optional
+from typing import List, Optional, Union
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 
-from app.db.session import get_db
+from app.db import session as db_session
+from app.db.session import get_interview_db, get_user_db
 from app.schemas import (
     InterviewCreate, 
     InterviewRead, 
     InterviewUpdate,
+    InterviewBatchRead,
+    InterviewBatchUpdate,
+    InterviewBatchUpdateResult,
+    InterviewChanges,
+    InterviewPartialRead,
+    InterviewType,
+    SimilarInterview,
     ErrorResponse
 )
 from app.services import interviews as interview_service
+from app.services import similar
 from app.schemas.common import PaginationParams
-from app.api.deps import pagination_params
+from app.core.bulkheads import bulkhead
+from app.api.deps import current_user_id, id_list, pagination_params, resolve_user_scope, sparse_fields
 
 router = APIRouter(prefix="/interviews", tags=["interviews"])
 
+interview_fields = sparse_fields(interview_service.READ_FIELDS)
+
+# auth_user_id is None for unauthenticated legacy clients (AUTH_REQUIRED=false);
+# otherwise every route is scoped to the token's user
+
 @router.post(
     "", 
     response_model=InterviewRead, 
     status_code=status.HTTP_201_CREATED,
-    responses={404: {"model": ErrorResponse}}
+    responses={401: {"model": ErrorResponse}, 403: {"model": ErrorResponse}, 404: {"model": ErrorResponse}}
 )
-def create_interview(payload: InterviewCreate, db: Session = Depends(get_db)):
-    # TODO: get user_id from auth token
-    # for now, user_id will be passed in the payload
+@bulkhead("writes")
+def create_interview(
+    payload: InterviewCreate,
+    db: Session = Depends(get_user_db),
+    auth_user_id: Optional[int] = Depends(current_user_id)
+):
+    resolve_user_scope(auth_user_id, payload.user_id)
     return interview_service.create_interview(db, payload)
 
+# declared before /{interview_id} so "changes" is not parsed as an id
+@router.get(
+    "/changes",
+    response_model=InterviewChanges,
+    responses={401: {"model": ErrorResponse}, 403: {"model": ErrorResponse}, 410: {"model": ErrorResponse}}
+)
+@bulkhead("exports")
+def list_interview_changes(
+    db: Session = Depends(get_user_db),
+    user_id: Optional[int] = Query(None, description="Defaults to the token's user"),
+    since: int = Query(0, ge=0, description="Cursor from the previous call; 0 for a full sync"),
+    limit: int = Query(500, ge=1, le=1000),
+    auth_user_id: Optional[int] = Depends(current_user_id)
+):
+    user_id = resolve_user_scope(auth_user_id, user_id)
+    if user_id is None:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="user_id is required")
+    items, cursor, has_more = interview_service.list_changes(db, user_id, since, limit)
+    return InterviewChanges(items=items, cursor=cursor, has_more=has_more)
+
 @router.get(
     "/{interview_id}", 
-    response_model=InterviewRead,
-    responses={404: {"model": ErrorResponse}}
+    response_model=InterviewPartialRead,
+    response_model_exclude_unset=True,
+    responses={401: {"model": ErrorResponse}, 404: {"model": ErrorResponse}}
 )
-def get_interview(interview_id: int, db: Session = Depends(get_db)):
-    return interview_service.get_interview(db, interview_id)
+@bulkhead("reads")
+def get_interview(
+    interview_id: int,
+    db: Session = Depends(get_interview_db),
+    fields: Optional[list[str]] = Depends(interview_fields),
+    auth_user_id: Optional[int] = Depends(current_user_id)
+):
+    # every field unless ?fields= narrows it
+    return interview_service.get_interview(db, interview_id, auth_user_id, include_archived=True, fields=fields)
+
+@router.get(
+    "/{interview_id}/similar",
+    response_model=List[SimilarInterview],
+    responses={401: {"model": ErrorResponse}, 403: {"model": ErrorResponse}, 404: {"model": ErrorResponse},
+               503: {"model": ErrorResponse}}
+)
+@bulkhead("reads")
+def list_similar_interviews(
+    interview_id: int,
+    db: Session = Depends(get_interview_db),
+    user_id: Optional[int] = Query(None, description="Only this user's interviews; default everyone's"),
+    type: Optional[InterviewType] = Query(None, description="Only interviews of this type"),
+    limit: int = Query(10, ge=1, le=50),
+    auth_user_id: Optional[int] = Depends(current_user_id)
+):
+    interview = interview_service.get_interview(db, interview_id, auth_user_id, include_archived=True)
+    if user_id is not None:
+        user_id = resolve_user_scope(auth_user_id, user_id)
+    # over-fetch: hits deleted since the last sync and the interview's own duplicates are dropped
+    hits = similar.find_similar(db, interview, 2 * limit, user_id, type)
+    ids = [hit_id for hit_id, _ in hits]
+    shards = db_session.shard_router
+    if shards is None:
+        rows = interview_service.get_interviews(db, ids, include_archived=True)[0]
+    else:
+        parts = shards.scatter(lambda s: interview_service.get_interviews(s, ids, include_archived=True)[0])
+        rows = [i for part in parts.values() for i in part]
+    return similar.rank(interview, hits, rows, auth_user_id, limit)
 
 @router.get(
     "", 
-    response_model=List[InterviewRead],
-    responses={404: {"model": ErrorResponse}}
+    response_model=Union[List[InterviewPartialRead], InterviewBatchRead],
+    response_model_exclude_unset=True,
+    responses={401: {"model": ErrorResponse}, 403: {"model": ErrorResponse}, 404: {"model": ErrorResponse}}
 )
+@bulkhead("reads")
 def list_interviews(
-    db: Session = Depends(get_db),
-    user_id: int = Query(..., description="Interviews for this user ID"), # TODO: get user_id from auth token
-    pagination: PaginationParams = Depends(pagination_params)
+    db: Session = Depends(get_user_db),
+    user_id: Optional[int] = Query(None, description="Interviews for this user ID; defaults to the token's user"),
+    ids: Optional[list[int]] = Depends(id_list),
+    pagination: PaginationParams = Depends(pagination_params),
+    include_archived: bool = Query(False, description="Also list interviews moved to cold storage"),
+    fields: Optional[list[str]] = Depends(interview_fields),
+    auth_user_id: Optional[int] = Depends(current_user_id)
 ):
-    return interview_service.list_interviews(db, user_id, pagination.limit, pagination.offset)
+    # ?ids=1,2,3 hydrates many interviews in one round trip, every field unless ?fields= narrows it
+    if ids is not None:
+        fields = fields or interview_service.READ_FIELDS
+        shards = db_session.shard_router
+        if shards is None:
+            items, missing = interview_service.get_interviews(db, ids, auth_user_id, fields)
+        else:
+            parts = shards.scatter(lambda s: interview_service.get_interviews(s, ids, auth_user_id, fields)[0])
+            found = {i.id: i for part in parts.values() for i in part}
+            items = [found[i] for i in dict.fromkeys(ids) if i in found]
+            missing = [i for i in dict.fromkeys(ids) if i not in found]
+        return InterviewBatchRead(items=items, missing=missing)
+    user_id = resolve_user_scope(auth_user_id, user_id)
+    if user_id is None:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="user_id or ids is required")
+    # lists leave out details unless ?fields= asks for it
+    fields = fields or interview_service.LIST_FIELDS
+    return interview_service.list_interviews(db, user_id, pagination.limit, pagination.offset, include_archived, fields)
+
+@router.patch(
+    ":batch",
+    response_model=InterviewBatchUpdateResult,
+    responses={401: {"model": ErrorResponse}, 403: {"model": ErrorResponse}}
+)
+@bulkhead("writes")
+def batch_update_interviews(
+    payload: InterviewBatchUpdate,
+    db: Session = Depends(get_user_db),
+    auth_user_id: Optional[int] = Depends(current_user_id)
+):
+    if payload.filter is not None:
+        resolve_user_scope(auth_user_id, payload.filter.user_id)
+    shards = db_session.shard_router
+    if shards is None or payload.filter is not None:
+        updated, missing = interview_service.batch_update_interviews(db, payload, auth_user_id)
+    else:
+        # items may live on several shards: one transaction per shard
+        parts = shards.scatter(lambda s: interview_service.batch_update_interviews(s, payload, auth_user_id)[0])
+        updated = sorted(i for part in parts.values() for i in part)
+        found = set(updated)
+        missing = [item.id for item in payload.items if item.id not in found]
+    return InterviewBatchUpdateResult(updated=updated, missing=missing)
 
 @router.patch(
     "/{interview_id}", 
     response_model=InterviewRead,
-    responses={404: {"model": ErrorResponse}}
+    responses={401: {"model": ErrorResponse}, 404: {"model": ErrorResponse}}
 )
-def update_interview(interview_id: int, payload: InterviewUpdate, db: Session = Depends(get_db)):
-    return interview_service.update_interview(db, interview_id, payload)
+@bulkhead("writes")
+def update_interview(
+    interview_id: int,
+    payload: InterviewUpdate,
+    db: Session = Depends(get_interview_db),
+    auth_user_id: Optional[int] = Depends(current_user_id)
+):
+    return interview_service.update_interview(db, interview_id, payload, auth_user_id)
 
 @router.delete(
     "/{interview_id}", 
     status_code=status.HTTP_204_NO_CONTENT,
-    responses={404: {"model": ErrorResponse}}
+    responses={401: {"model": ErrorResponse}, 404: {"model": ErrorResponse}}
 )
-def delete_interview(interview_id: int, db: Session = Depends(get_db)):
-    interview_service.delete_interview(db, interview_id)
-    return None
\ No newline at end of file
+@bulkhead("writes")
+def delete_interview(
+    interview_id: int,
+    db: Session = Depends(get_interview_db),
+    auth_user_id: Optional[int] = Depends(current_user_id)
+):
+    interview_service.delete_interview(db, interview_id, auth_user_id)
+    return None
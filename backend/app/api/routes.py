@@ -1,4 +1,5 @@
 from fastapi import APIRouter
+from app.api.admin import router as admin_router
 from app.api.interviews import router as interviews_router
 from app.api.users import router as users_router
 
@@ -10,4 +11,5 @@ def v1_health():
     return {"status": "ok", "scope": "v1"}
 
 router.include_router(interviews_router)
-router.include_router(users_router)
\ No newline at end of file
+router.include_router(users_router)
+router.include_router(admin_router)
\ No newline at end of file
@@ -1,41 +1,119 @@
-from typing import List, Optional
-from fastapi import APIRouter, Depends, Query, status
+from typing import List, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from app.db.session import get_db
-from app.schemas import UserCreate, UserUpdate, UserRead, ErrorResponse
+from app.db import session as db_session
+from app.db.session import get_db, get_user_db
+from app.db.shards import EmailTaken
+from app.schemas import UserCreate, UserUpdate, UserRead, UserBatchRead, UserDashboard, ErrorResponse
+from app.core.bulkheads import bulkhead
+from app.api.deps import current_user_id, id_list, resolve_user_scope
 from app.services import users as svc
+from app.services import events
 
 router = APIRouter(prefix="/users", tags=["users"])
 
 @router.post("", response_model=UserRead, status_code=status.HTTP_201_CREATED,
              responses={409: {"model": ErrorResponse}})
+@bulkhead("writes")
 def create_user(payload: UserCreate, db: Session = Depends(get_db)):
-    return svc.create_user(db, payload)
+    shards = db_session.shard_router
+    if shards is None:
+        return svc.create_user(db, payload)
+    # sharded: the directory hands out the id and claims the email across shards in one step
+    try:
+        user_id, shard = shards.place_new_user(payload.email)
+    except EmailTaken:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="User already exists")
+    with shards.session(shard) as shard_db:
+        try:
+            return svc.create_user(shard_db, payload, user_id=user_id)
+        except Exception:
+            shards.claim_email(user_id, None)
+            raise
 
 @router.get("/{user_id}", response_model=UserRead,
             responses={404: {"model": ErrorResponse}})
-def get_user(user_id: int, db: Session = Depends(get_db)):
+@bulkhead("reads")
+def get_user(user_id: int, db: Session = Depends(get_user_db)):
     return svc.get_user(db, user_id)
 
-@router.get("", response_model=List[UserRead])
+@router.get("/{user_id}/dashboard", response_model=UserDashboard,
+            responses={401: {"model": ErrorResponse}, 403: {"model": ErrorResponse}, 404: {"model": ErrorResponse}})
+@bulkhead("reads")
+def get_dashboard(
+    user_id: int,
+    upcoming: int = Query(5, ge=0, le=50, description="How many upcoming interviews"),
+    recent: int = Query(5, ge=0, le=50, description="How many past interviews"),
+    db: Session = Depends(get_user_db),
+    auth_user_id: Optional[int] = Depends(current_user_id),
+):
+    # the home screen in one round trip
+    resolve_user_scope(auth_user_id, user_id)
+    return svc.get_dashboard(db, user_id, upcoming, recent)
+
+@router.get("", response_model=Union[List[UserRead], UserBatchRead])
+@bulkhead("exports")
 def list_users(
-    email: Optional[str] = Query(None, description="Filter by exact email"),
+    email: Optional[str] = Query(None, description="Filter by email (case-insensitive)"),
+    exact_email: bool = Query(False, description="Match email case-sensitively"),
+    ids: Optional[list[int]] = Depends(id_list),
     limit: int = Query(50, ge=1, le=200),
     offset: int = Query(0, ge=0),
     db: Session = Depends(get_db),
 ):
-    q = db.query(svc.models.User)  # reuse model via service module
-    if email:
-        q = q.filter(svc.models.User.email == email)
-    return q.order_by(svc.models.User.id.desc()).offset(offset).limit(limit).all()
+    shards = db_session.shard_router
+    if ids is not None:
+        if shards is None:
+            items, missing = svc.get_users(db, ids)
+        else:
+            found = {u.id: u for part in shards.scatter(lambda s: svc.get_users(s, ids)[0]).values() for u in part}
+            items = [found[i] for i in dict.fromkeys(ids) if i in found]
+            missing = [i for i in dict.fromkeys(ids) if i not in found]
+        return UserBatchRead(items=items, missing=missing)
+    if shards is None:
+        return svc.list_users(db, email, exact_email, limit, offset)
+    # scatter-gather: each shard returns its first offset+limit rows, merged newest first
+    parts = shards.scatter(lambda s: svc.list_users(s, email, exact_email, offset + limit, 0))
+    merged = sorted((u for part in parts.values() for u in part), key=lambda u: u.id, reverse=True)
+    return merged[offset:offset + limit]
+
+@router.get("/{user_id}/events", response_class=StreamingResponse,
+            responses={200: {"content": {"text/event-stream": {}}}, 403: {"model": ErrorResponse}})
+async def user_events(user_id: int, auth_user_id: Optional[int] = Depends(current_user_id)):
+    # live interview changes as Server-Sent Events; heartbeats keep proxies from timing out
+    resolve_user_scope(auth_user_id, user_id)
+    sub = events.hub.subscribe(events.user_channel(user_id))
+    return StreamingResponse(
+        events.event_stream(sub), media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 @router.patch("/{user_id}", response_model=UserRead,
               responses={404: {"model": ErrorResponse}, 409: {"model": ErrorResponse}})
-def update_user(user_id: int, payload: UserUpdate, db: Session = Depends(get_db)):
-    return svc.update_user(db, user_id, payload)
+@bulkhead("writes")
+def update_user(user_id: int, payload: UserUpdate, db: Session = Depends(get_user_db)):
+    shards = db_session.shard_router
+    if shards is None or "email" not in payload.model_fields_set:
+        return svc.update_user(db, user_id, payload)
+    # sharded: claim the new email in the directory first, and give it back if the update fails
+    previous = svc.get_user(db, user_id).email
+    try:
+        shards.claim_email(user_id, payload.email)
+    except EmailTaken:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Email already exists")
+    try:
+        return svc.update_user(db, user_id, payload)
+    except Exception:
+        shards.claim_email(user_id, previous)
+        raise
     
 @router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT,
                responses={404: {"model": ErrorResponse}})
-def delete_user(user_id: int, db: Session = Depends(get_db)):
+@bulkhead("writes")
+def delete_user(user_id: int, db: Session = Depends(get_user_db)):
     svc.delete_user(db, user_id)
-    return None
\ No newline at end of file
+    if db_session.shard_router is not None:
+        # a deleted account's email can sign up again
+        db_session.shard_router.claim_email(user_id, None)
+    return None
@@ -0,0 +1,30 @@
+"""In-flight request tracking, used to find quiet periods for background work."""
+
+_in_flight = 0
+
+
+def in_flight() -> int:
+    return _in_flight
+
+
+def _long_lived(path: str) -> bool:
+    # SSE streams stay open for as long as a client is subscribed; counting them would never leave a quiet period
+    return path.endswith("/events")
+
+
+class ActivityMiddleware:
+    """Pure ASGI middleware counting HTTP requests currently being served."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        global _in_flight
+        if scope["type"] != "http" or _long_lived(scope["path"]):
+            return await self.app(scope, receive, send)
+        # only ever mutated on the event loop thread, so no lock is needed
+        _in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _in_flight -= 1
@@ -0,0 +1,150 @@
+"""Admission control: per-client rate limits and global load shedding.
+
+Opt in with RATE_LIMIT_ENABLED=true. Each client, identified by the token's
+user (`uid`/`sub`) or else the client IP, gets two token buckets. One is
+for reads (GET/HEAD) and one is for writes, so a polling loop cannot use up
+its own writes or anyone else's budget. An empty bucket answers 429 with
+Retry-After.
+
+Independently, once more than ADMISSION_MAX_IN_FLIGHT requests are being
+served (each holding a DB session for most of its life), new requests are
+shed with 503 + Retry-After instead of queueing behind the pool, which
+keeps latency flat for the requests already admitted.
+
+Counters are kept in `metrics` and exposed at GET /api/v1/admin/metrics.
+"""
+import math
+import os
+import time
+from collections import Counter
+from typing import Callable, Optional
+
+from fastapi import HTTPException
+
+from app.core.cache import TTLCache
+from app.core.security import verify_token
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "false").lower() == "true"
+READ_RATE = float(os.getenv("RATE_LIMIT_READ_RATE", "20"))    # tokens per second
+READ_BURST = float(os.getenv("RATE_LIMIT_READ_BURST", "40"))
+WRITE_RATE = float(os.getenv("RATE_LIMIT_WRITE_RATE", "5"))
+WRITE_BURST = float(os.getenv("RATE_LIMIT_WRITE_BURST", "10"))
+MAX_IN_FLIGHT = int(os.getenv("ADMISSION_MAX_IN_FLIGHT", "64"))
+BUCKET_IDLE_TTL = 600 # idle clients' buckets are dropped (and start full again)
+
+READ_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+def _exempt(path: str) -> bool:
+    # health checks must always answer; SSE streams are long-lived and mostly idle
+    return path == "/health" or path.endswith("/events")
+
+
+class TokenBucket:
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate: float, burst: float, now: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = now
+
+    def take(self, now: float) -> float:
+        """Spend one token; returns 0 on success, else seconds until one is available."""
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def refund(self) -> None:
+        """Give back a token taken for a request that was not admitted after all."""
+        self.tokens = min(self.burst, self.tokens + 1)
+
+
+class Metrics:
+    def __init__(self):
+        self.counts: Counter = Counter()
+        self.in_flight = 0
+
+    def snapshot(self) -> dict:
+        return {"in_flight": self.in_flight, **self.counts}
+
+
+metrics = Metrics()
+
+
+def client_identity(scope) -> str:
+    authorization = dict(scope["headers"]).get(b"authorization")
+    if authorization:
+        scheme, _, token = authorization.decode().partition(" ")
+        if scheme.lower() == "bearer" and token:
+            try:
+                claims = verify_token(token.strip())
+                return f"user:{claims.get('uid') or claims.get('sub')}"
+            except HTTPException:
+                pass # the route rejects it; limit by address meanwhile
+    client = scope.get("client")
+    return f"ip:{client[0] if client else 'unknown'}"
+
+
+class AdmissionMiddleware:
+    """Pure ASGI middleware applying rate limits and the in-flight ceiling."""
+
+    def __init__(self, app, read_rate: float = READ_RATE, read_burst: float = READ_BURST,
+                 write_rate: float = WRITE_RATE, write_burst: float = WRITE_BURST,
+                 max_in_flight: int = MAX_IN_FLIGHT, clock: Callable[[], float] = time.monotonic):
+        self.app = app
+        self.limits = {"read": (read_rate, read_burst), "write": (write_rate, write_burst)}
+        self.max_in_flight = max_in_flight
+        self.clock = clock
+        self._buckets = TTLCache(maxsize=100_000, ttl=BUCKET_IDLE_TTL, clock=clock)
+
+    def _wait(self, identity: str, kind: str) -> float:
+        now = self.clock()
+        bucket: Optional[TokenBucket] = self._buckets.get((identity, kind))
+        if bucket is None:
+            bucket = TokenBucket(*self.limits[kind], now)
+        wait = bucket.take(now)
+        self._buckets.set((identity, kind), bucket) # refreshes the idle TTL
+        return wait
+
+    def _refund(self, identity: str, kind: str) -> None:
+        bucket: Optional[TokenBucket] = self._buckets.get((identity, kind))
+        if bucket is not None:
+            bucket.refund()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or _exempt(scope["path"]):
+            return await self.app(scope, receive, send)
+
+        kind = "read" if scope["method"] in READ_METHODS else "write"
+        identity = client_identity(scope)
+        wait = self._wait(identity, kind)
+        if wait:
+            metrics.counts[f"throttled_{kind}"] += 1
+            return await _reject(send, 429, "Rate limit exceeded", math.ceil(wait))
+        # only touched on the event loop thread, so no lock is needed
+        if metrics.in_flight >= self.max_in_flight:
+            metrics.counts["shed_overload"] += 1
+            # shedding is the server's fault: the client keeps its budget for the retry
+            self._refund(identity, kind)
+            return await _reject(send, 503, "Server is overloaded, retry shortly", 1)
+
+        metrics.counts[f"admitted_{kind}"] += 1
+        metrics.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            metrics.in_flight -= 1
+
+
+async def _reject(send, status_code: int, detail: str, retry_after: int) -> None:
+    body = f'{{"detail": "{detail}"}}'.encode()
+    await send({"type": "http.response.start", "status": status_code, "headers": [
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(body)).encode()),
+        (b"retry-after", str(retry_after).encode()),
+    ]})
+    await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,122 @@
+"""Per-route-group bulkheads and request deadlines for sync handlers.
+
+Sync route functions normally all share AnyIO's default thread pool, so a
+backlog of slow scans can starve cheap lookups. A route decorated with
+@bulkhead("reads") instead runs under its group's own capacity limit
+(BULKHEAD_LIMITS, e.g. "reads:16,writes:8,exports:4,admin:2"). A full
+group makes only its own requests wait.
+
+Each group also has a deadline (REQUEST_TIMEOUTS, seconds, 0 = none) that
+follows the request into the database. SQLite statements are interrupted
+by a progress handler, and Postgres statements get a matching
+`statement_timeout`. Work for a request nobody is waiting for therefore
+stops at the deadline, and the request fails with 504.
+"""
+import asyncio
+import contextvars
+import inspect
+import os
+import time
+import weakref
+from functools import partial, wraps
+from typing import Callable, Optional
+
+import anyio
+from sqlalchemy import Engine, event
+
+from app.core import profiling
+
+
+def _parse(spec: str, cast) -> dict:
+    entries = (entry.partition(":") for entry in spec.split(",") if entry.strip())
+    return {name.strip(): cast(value) for name, _, value in entries}
+
+
+BULKHEAD_LIMITS = _parse(os.getenv("BULKHEAD_LIMITS", "reads:16,writes:8,exports:4,admin:2"), int)
+REQUEST_TIMEOUTS = _parse(os.getenv("REQUEST_TIMEOUTS", "reads:5,writes:10,exports:30,admin:30"), float)
+DEFAULT_LIMIT = 8
+# sqlite calls the progress handler every N virtual machine instructions
+PROGRESS_INTERVAL = 1000
+
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("deadline", default=None)
+_limiters: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, anyio.CapacityLimiter]]" = \
+    weakref.WeakKeyDictionary()
+
+
+class DeadlineExceeded(Exception):
+    """The request ran past its group's deadline (answered with 504)."""
+
+
+def remaining() -> Optional[float]:
+    """Seconds left before the current request's deadline, or None without one."""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def _limiter(group: str) -> anyio.CapacityLimiter:
+    # limiters belong to an event loop, so they are created on first use in each
+    limiters = _limiters.setdefault(asyncio.get_running_loop(), {})
+    limiter = limiters.get(group)
+    if limiter is None:
+        limiter = limiters[group] = anyio.CapacityLimiter(BULKHEAD_LIMITS.get(group, DEFAULT_LIMIT))
+    return limiter
+
+
+def _run_with_deadline(timeout: Optional[float], fn: Callable, *args, **kwargs):
+    # timeout counts from when the handler starts, after waiting for capacity
+    token = _deadline.set(time.monotonic() + timeout if timeout else None)
+    try:
+        return profiling.call(fn, *args, **kwargs)
+    finally:
+        _deadline.reset(token)
+
+
+def bulkhead(group: str):
+    """Run a sync route function in `group`'s bulkhead, under its deadline."""
+    def decorate(fn: Callable) -> Callable:
+        if inspect.iscoroutinefunction(fn):
+            raise TypeError("bulkhead() is for sync route functions")
+
+        @wraps(fn) # keeps the signature FastAPI reads parameters from
+        async def wrapper(*args, **kwargs):
+            timeout = REQUEST_TIMEOUTS.get(group) or None
+            return await anyio.to_thread.run_sync(
+                partial(_run_with_deadline, timeout, fn, *args, **kwargs), limiter=_limiter(group)
+            )
+        return wrapper
+    return decorate
+
+
+def install_deadline_hooks(engine: Engine) -> None:
+    """Make `engine`'s statements honour the current request's deadline."""
+    sqlite = engine.dialect.name == "sqlite"
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        left = remaining()
+        if left is None:
+            return
+        if left <= 0:
+            raise DeadlineExceeded("request deadline exceeded")
+        if sqlite:
+            deadline = _deadline.get()
+            conn.connection.driver_connection.set_progress_handler(
+                lambda: time.monotonic() > deadline, PROGRESS_INTERVAL)
+        elif engine.dialect.name == "postgresql":
+            cursor.execute(f"SET LOCAL statement_timeout = {max(int(left * 1000), 1)}")
+
+    if sqlite:
+        @event.listens_for(engine, "after_cursor_execute")
+        def _after(conn, cursor, statement, parameters, context, executemany):
+            if _deadline.get() is not None:
+                conn.connection.driver_connection.set_progress_handler(None, 0)
+
+    @event.listens_for(engine, "handle_error")
+    def _on_error(context):
+        # a statement interrupted at the deadline is a timeout, not a database fault
+        left = remaining()
+        if left is None or left > 0 or context.sqlalchemy_exception is None:
+            return None
+        if sqlite and context.connection is not None:
+            context.connection.connection.driver_connection.set_progress_handler(None, 0)
+        return DeadlineExceeded("request deadline exceeded")
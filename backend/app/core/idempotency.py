@@ -0,0 +1,208 @@
+"""Idempotency-Key support for POST requests.
+
+A POST carrying an `Idempotency-Key` header is executed at most once per
+caller and key within IDEMPOTENCY_TTL. The caller is the verified token's
+user, or the client address for requests without one. Its response
+(status, headers, body) is stored in `idempotency_keys`, and retries are
+answered from there without reaching the route. Reusing a key with a
+different request is rejected with 422.
+
+Concurrent requests with the same key are serialized by a per-key lock in
+this worker, and by a pending row across workers: a retry that arrives while
+another worker is still executing the first attempt gets 409 with
+Retry-After. A pending row left behind by a crashed worker is taken over
+after IDEMPOTENCY_PENDING_TIMEOUT. 5xx responses are not stored, so the
+request can be retried.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import weakref
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from fastapi import HTTPException
+from sqlalchemy import and_, delete, or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core.security import verify_token
+from app.db import models
+from app.db.session import session_scope
+
+IDEMPOTENCY_TTL = timedelta(seconds=float(os.getenv("IDEMPOTENCY_TTL", "86400")))
+PENDING_TIMEOUT = timedelta(seconds=float(os.getenv("IDEMPOTENCY_PENDING_TIMEOUT", "60")))
+HEADER = b"idempotency-key"
+MAX_KEY_LENGTH = 255
+IDEMPOTENT_METHODS = {"POST"}
+
+
+def _fingerprint(scope, body: bytes) -> str:
+    digest = hashlib.sha256()
+    for part in (scope["method"].encode(), scope["path"].encode(), scope.get("query_string", b""), body):
+        digest.update(part)
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _caller(scope, headers: dict[bytes, bytes]) -> str:
+    # keys are per caller, and stable across token refreshes
+    authorization = headers.get(b"authorization", b"").decode()
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() == "bearer" and token:
+        try:
+            claims = verify_token(token.strip())
+            return str(claims.get("uid") or claims.get("sub"))
+        except HTTPException:
+            pass # rejected by the route anyway
+    # no verified caller (signups, AUTH_REQUIRED=false): scope by client address, so
+    # anonymous clients never replay each other's responses
+    client = scope.get("client")
+    return f"anon:{client[0] if client else ''}"
+
+
+def claim(db: Session, key: str, fingerprint: str) -> Optional[models.IdempotencyKey]:
+    """The stored entry for `key`, or None once this request owns the key."""
+    now = datetime.now(timezone.utc)
+    table = models.IdempotencyKey
+    db.execute(delete(table).where(table.key == key, or_(
+        table.expires_at <= now,
+        and_(table.status_code.is_(None), table.created_at <= now - PENDING_TIMEOUT),
+    )))
+    existing = db.execute(select(table).where(table.key == key)).scalar()
+    if existing is None:
+        db.add(table(key=key, fingerprint=fingerprint, created_at=now, expires_at=now + IDEMPOTENCY_TTL))
+        try:
+            db.commit()
+            return None
+        except IntegrityError: # another worker claimed it first
+            db.rollback()
+            existing = db.execute(select(table).where(table.key == key)).scalar()
+            if existing is None: # ...and already released it
+                return claim(db, key, fingerprint)
+    db.expunge(existing)
+    db.commit()
+    return existing
+
+
+def store(db: Session, key: str, status_code: int, headers: list, body: bytes) -> None:
+    entry = db.get(models.IdempotencyKey, key)
+    if entry is not None:
+        entry.status_code = status_code
+        entry.headers = headers
+        entry.body = body
+        db.commit()
+
+
+def release(db: Session, key: str) -> None:
+    db.execute(delete(models.IdempotencyKey).where(models.IdempotencyKey.key == key))
+    db.commit()
+
+
+def purge_expired(db: Session, batch_size: int) -> int:
+    """Delete up to `batch_size` expired entries; returns rows deleted."""
+    table = models.IdempotencyKey
+    keys = db.execute(
+        select(table.key).where(table.expires_at <= datetime.now(timezone.utc)).limit(batch_size)
+    ).scalars().all()
+    if keys:
+        db.execute(delete(table).where(table.key.in_(keys)))
+        db.commit()
+    return len(keys)
+
+
+class IdempotencyMiddleware:
+    """Pure ASGI middleware answering retried POSTs from the stored response."""
+
+    def __init__(self, app):
+        self.app = app
+        self._locks: weakref.WeakValueDictionary[str, asyncio.Lock] = weakref.WeakValueDictionary()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in IDEMPOTENT_METHODS:
+            return await self.app(scope, receive, send)
+        headers = dict(scope["headers"])
+        client_key = headers.get(HEADER)
+        if client_key is None:
+            return await self.app(scope, receive, send)
+        if not client_key or len(client_key) > MAX_KEY_LENGTH:
+            return await _send_json(send, 400, {"detail": f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} characters"})
+
+        body = await _read_body(receive)
+        fingerprint = _fingerprint(scope, body)
+        key = hashlib.sha256(_caller(scope, headers).encode() + b"\0" + client_key).hexdigest()
+        app = scope.get("app")
+
+        lock = self._locks.get(key)
+        if lock is None:
+            lock = self._locks[key] = asyncio.Lock()
+        async with lock:
+            with session_scope(app) as db:
+                existing = await run_in_threadpool(claim, db, key, fingerprint)
+            if existing is not None:
+                if existing.fingerprint != fingerprint:
+                    return await _send_json(send, 422, {"detail": "Idempotency-Key was used with a different request"})
+                if existing.status_code is None:
+                    return await _send_json(send, 409, {"detail": "A request with this Idempotency-Key is in progress"},
+                                            [(b"retry-after", b"1")])
+                return await _replay(send, existing)
+
+            response = {"status": 500, "headers": [], "body": b""}
+
+            async def capture(message):
+                if message["type"] == "http.response.start":
+                    response["status"] = message["status"]
+                    response["headers"] = message.get("headers", [])
+                elif message["type"] == "http.response.body":
+                    response["body"] += message.get("body", b"")
+                await send(message)
+
+            try:
+                await self.app(scope, _replay_body(body, receive), capture)
+            except BaseException:
+                with session_scope(app) as db:
+                    await run_in_threadpool(release, db, key)
+                raise
+            with session_scope(app) as db:
+                if response["status"] >= 500:
+                    await run_in_threadpool(release, db, key)
+                else:
+                    stored_headers = [[k.decode("latin-1"), v.decode("latin-1")] for k, v in response["headers"]]
+                    await run_in_threadpool(store, db, key, response["status"], stored_headers, response["body"])
+
+
+async def _read_body(receive) -> bytes:
+    chunks = []
+    while True:
+        message = await receive()
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body"):
+            return b"".join(chunks)
+
+
+def _replay_body(body: bytes, receive):
+    sent = False
+
+    async def wrapped():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return await receive()
+    return wrapped
+
+
+async def _replay(send, entry: models.IdempotencyKey) -> None:
+    headers = [(k.encode("latin-1"), v.encode("latin-1")) for k, v in entry.headers or []]
+    headers.append((b"idempotent-replayed", b"true"))
+    await send({"type": "http.response.start", "status": entry.status_code, "headers": headers})
+    await send({"type": "http.response.body", "body": entry.body or b""})
+
+
+async def _send_json(send, status_code: int, payload: dict, extra_headers: Optional[list] = None) -> None:
+    body = json.dumps(payload).encode()
+    headers = [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+    await send({"type": "http.response.start", "status": status_code, "headers": headers + (extra_headers or [])})
+    await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,59 @@
+import threading
+from typing import Callable
+
+from loguru import logger
+
+
+class PeriodicJob:
+    """Runs `step` in a daemon thread, in small throttled batches.
+
+    Every `interval` seconds the job calls `step()` repeatedly, sleeping
+    `pause` seconds between calls, until it returns a falsy value (nothing
+    left to do). Whenever `is_busy()` reports foreground load the job backs
+    off until the next interval instead of competing for the database.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        step: Callable[[], int],
+        interval: float,
+        pause: float = 0.1,
+        is_busy: Callable[[], bool] = lambda: False,
+    ):
+        self.name = name
+        self.step = step
+        self.interval = interval
+        self.pause = pause
+        self.is_busy = is_busy
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout)
+
+    def run_once(self) -> int:
+        """Drain work until done, stopped or busy; returns the work done."""
+        total = 0
+        while not self._stop.is_set() and not self.is_busy():
+            try:
+                done = self.step()
+            except Exception:
+                logger.exception("{} step failed", self.name)
+                break
+            if not done:
+                break
+            total += done
+            self._stop.wait(self.pause)
+        return total
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            done = self.run_once()
+            if done:
+                logger.info("{} processed {} rows", self.name, done)
@@ -0,0 +1,192 @@
+"""On-demand request profiling and tracemalloc snapshots, for admins.
+
+Opt in with PROFILING_ENABLED=true. While disabled, no middleware is
+installed and the admin endpoints answer 404, so nothing runs per request.
+
+Profiling one request: send it with an admin token and `x-profile: 1`
+(or `?profile=1`). It runs under cProfile, both on the event loop, where
+request validation, response serialization and JSON rendering happen, and
+in the worker thread running the route (see bulkheads). The response carries
+`x-profile-id`. The stored report (GET /api/v1/admin/profiles/{id}) shows
+the call tree and self time split between SQLAlchemy, the database driver,
+Pydantic and JSON encoding. Only one request per worker is profiled at a
+time. The event-loop part also counts whatever other requests the loop
+served meanwhile, so profile under light load.
+
+Memory: POST /api/v1/admin/memory/snapshots starts tracemalloc (on first
+use) and stores a snapshot. GET /api/v1/admin/memory/diff compares two
+snapshots, or one against the current heap. DELETE /api/v1/admin/memory
+stops tracing and so its overhead.
+"""
+import contextvars
+import cProfile
+import io
+import itertools
+import os
+import pstats
+import time
+import tracemalloc
+from collections import OrderedDict
+from typing import Callable, Optional
+from urllib.parse import parse_qs
+
+from fastapi import HTTPException
+
+from app.core import security
+
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+PROFILE_HEADER = "x-profile"
+MAX_PROFILES = int(os.getenv("PROFILING_MAX_PROFILES", "20"))
+MAX_SNAPSHOTS = int(os.getenv("PROFILING_MAX_SNAPSHOTS", "5"))
+TRACEMALLOC_FRAMES = int(os.getenv("PROFILING_TRACEMALLOC_FRAMES", "10"))
+
+# self time is attributed to the first category whose marker appears in "file:function"
+CATEGORIES = (
+    ("sqlalchemy", ("sqlalchemy",)),
+    ("database driver", ("sqlite3", "psycopg")),
+    ("pydantic", ("pydantic",)),
+    ("json encoding", ("json", "encoders.py")),
+)
+
+_profiles: contextvars.ContextVar[Optional[list]] = contextvars.ContextVar("profiles", default=None)
+_busy = False # one profiled request at a time; only touched on the event loop
+_report_ids = itertools.count(1)
+_snapshot_ids = itertools.count(1)
+reports: "OrderedDict[int, dict]" = OrderedDict()
+snapshots: "OrderedDict[int, tracemalloc.Snapshot]" = OrderedDict()
+
+
+def call(fn: Callable, *args, **kwargs):
+    """Run `fn`, under its own profiler when the current request is being profiled."""
+    profiles = _profiles.get()
+    if profiles is None:
+        return fn(*args, **kwargs)
+    profile = cProfile.Profile()
+    try:
+        profile.enable()
+    except ValueError: # Python 3.12+: the request's profiler already covers every thread
+        return fn(*args, **kwargs)
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        profile.disable()
+        profiles.append(profile)
+
+
+def _category(key: tuple) -> str:
+    filename, _, function = key
+    where = f"{filename}:{function}"
+    for name, markers in CATEGORIES:
+        if any(marker in where for marker in markers):
+            return name
+    return "other"
+
+
+def build_report(profiles: list, path: str, elapsed: float) -> dict:
+    stats = pstats.Stats(profiles[0])
+    for profile in profiles[1:]:
+        stats.add(profile)
+    split = {name: 0.0 for name, _ in CATEGORIES}
+    split["other"] = 0.0
+    for key, (_, _, tottime, _, _) in stats.stats.items():
+        split[_category(key)] += tottime
+    top = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:30]
+    text = io.StringIO()
+    stats.stream = text
+    stats.sort_stats("cumulative").print_callees(25)
+    return {
+        "path": path,
+        "elapsed_ms": round(elapsed * 1000, 3),
+        "self_time_ms": {name: round(seconds * 1000, 3) for name, seconds in split.items()},
+        "top": [
+            {"function": pstats.func_std_string(key), "calls": calls, "self_ms": round(tottime * 1000, 3),
+             "cumulative_ms": round(cumtime * 1000, 3)}
+            for key, (_, calls, tottime, cumtime, _) in top
+        ],
+        "call_tree": text.getvalue(),
+    }
+
+
+def _is_admin(scope) -> bool:
+    headers = dict(scope["headers"])
+    try:
+        claims = security.claims_from_authorization(headers.get(b"authorization", b"").decode("latin-1"))
+    except HTTPException:
+        return False
+    return claims.get("admin") is True
+
+
+def _wants_profile(scope) -> bool:
+    if dict(scope["headers"]).get(PROFILE_HEADER.encode()) == b"1":
+        return True
+    return parse_qs(scope.get("query_string", b"").decode("latin-1")).get("profile") == ["1"]
+
+
+class ProfilingMiddleware:
+    """Pure ASGI middleware profiling requests that ask for it with an admin token."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        global _busy
+        if scope["type"] != "http" or not _wants_profile(scope) or not _is_admin(scope):
+            return await self.app(scope, receive, send)
+        if _busy:
+            async def send_busy(message):
+                if message["type"] == "http.response.start":
+                    message["headers"] = [*message.get("headers", []), (b"x-profile", b"busy")]
+                await send(message)
+            return await self.app(scope, receive, send_busy)
+
+        _busy = True
+        profiles = []
+        token = _profiles.set(profiles)
+        report_id = next(_report_ids)
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", []), (b"x-profile-id", str(report_id).encode())]
+            await send(message)
+
+        profile = cProfile.Profile()
+        started = time.perf_counter()
+        profile.enable()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            profile.disable()
+            elapsed = time.perf_counter() - started
+            _profiles.reset(token)
+            _busy = False
+            reports[report_id] = build_report([profile, *profiles], scope["path"], elapsed)
+            while len(reports) > MAX_PROFILES:
+                reports.popitem(last=False)
+
+
+def take_snapshot() -> tuple[int, tracemalloc.Snapshot]:
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(TRACEMALLOC_FRAMES)
+    snapshot = tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    ))
+    snapshot_id = next(_snapshot_ids)
+    snapshots[snapshot_id] = snapshot
+    while len(snapshots) > MAX_SNAPSHOTS:
+        snapshots.popitem(last=False)
+    return snapshot_id, snapshot
+
+
+def diff(base: tracemalloc.Snapshot, target: tracemalloc.Snapshot, group_by: str, limit: int) -> list[dict]:
+    stats = target.compare_to(base, group_by)
+    return [
+        {"where": stat.traceback.format(limit=3 if group_by == "traceback" else 1),
+         "size_diff": stat.size_diff, "count_diff": stat.count_diff, "size": stat.size, "count": stat.count}
+        for stat in stats[:limit]
+    ]
+
+
+def stop_tracing() -> None:
+    snapshots.clear()
+    tracemalloc.stop()
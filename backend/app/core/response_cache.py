@@ -0,0 +1,132 @@
+"""Versioned per-user cache of encoded list responses.
+
+Opt in with RESPONSE_CACHE_ENABLED=true. Successful GETs of the list routes
+in CACHED_PATHS are stored as the exact bytes sent to the client, keyed by
+(path, user, normalized query string, user's data version). A hit is
+answered straight from memory: no database access, no serialization.
+
+Every committed interview write bumps its user's version, so invalidation is
+O(1) and pages of the old version simply stop being looked up and age out
+of the bounded LRU. Versions live in a VersionStore. The default
+LocalVersionStore is per process; with several workers, install a shared
+store (e.g. Redis INCR) with `set_version_store` so a write on one worker
+invalidates pages cached on the others.
+
+Requests pinned to the primary for read-your-writes (see app.db.routing)
+bypass the cache entirely.
+"""
+import os
+import threading
+from typing import Optional, Protocol
+from urllib.parse import parse_qsl, urlencode
+
+from fastapi import HTTPException
+
+from app.core.cache import TTLCache
+from app.core.security import AUTH_REQUIRED, verify_token
+from app.db.routing import pinned_to_primary
+
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "false").lower() == "true"
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "10000"))
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "60"))
+CACHED_PATHS = {"/api/v1/interviews"}
+# multi-get responses span many users, so no single version covers them
+UNCACHED_PARAMS = {"ids"}
+
+
+class VersionStore(Protocol):
+    """Per-user data versions shared by everything that caches that user's pages."""
+
+    def get(self, user_id: int) -> int: ...
+
+    def bump(self, user_id: int) -> None: ...
+
+
+class LocalVersionStore:
+    def __init__(self):
+        self._versions: dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int) -> int:
+        return self._versions.get(user_id, 0)
+
+    def bump(self, user_id: int) -> None:
+        with self._lock:
+            self._versions[user_id] = self._versions.get(user_id, 0) + 1
+
+
+versions: VersionStore = LocalVersionStore()
+pages = TTLCache(maxsize=RESPONSE_CACHE_SIZE, ttl=RESPONSE_CACHE_TTL)
+
+
+def set_version_store(store: VersionStore) -> None:
+    global versions
+    versions = store
+
+
+def bump_user_version(user_id: int) -> None:
+    # called after every committed write to one of the user's interviews
+    versions.bump(user_id)
+
+
+def _cache_user(scope, params: list[tuple[str, str]]) -> Optional[int]:
+    """The user whose data the page shows, or None if the request is not cacheable."""
+    if any(name in UNCACHED_PARAMS for name, _ in params):
+        return None
+    authorization = dict(scope["headers"]).get(b"authorization")
+    if authorization:
+        scheme, _, token = authorization.decode().partition(" ")
+        if scheme.lower() != "bearer":
+            return None
+        try:
+            uid = verify_token(token.strip()).get("uid")
+        except HTTPException:
+            return None
+        return int(uid) if uid is not None else None # google_sub tokens would need a DB lookup
+    if AUTH_REQUIRED:
+        return None
+    user_id = dict(params).get("user_id")
+    return int(user_id) if user_id and user_id.isdigit() else None
+
+
+class ResponseCacheMiddleware:
+    """Pure ASGI middleware serving cached list pages as pre-encoded bytes."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET" or scope["path"] not in CACHED_PATHS:
+            return await self.app(scope, receive, send)
+        if pinned_to_primary():
+            # a client that just wrote reads its own writes: neither serve nor fill pages meanwhile
+            return await self.app(scope, receive, send)
+        params = parse_qsl(scope.get("query_string", b"").decode(), keep_blank_values=True)
+        user_id = _cache_user(scope, params)
+        if user_id is None:
+            return await self.app(scope, receive, send)
+
+        key = (scope["path"], user_id, urlencode(sorted(params)), versions.get(user_id))
+        cached = pages.get(key)
+        if cached is not None:
+            status, headers, body = cached
+            await send({"type": "http.response.start", "status": status,
+                        "headers": headers + [(b"x-cache", b"hit")]})
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        response = {"status": None, "headers": [], "body": b""}
+
+        async def capture(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                response["headers"] = [(k, v) for k, v in message.get("headers", []) if k != b"set-cookie"]
+            elif message["type"] == "http.response.body":
+                response["body"] += message.get("body", b"")
+            await send(message)
+
+        await self.app(scope, receive, capture)
+        # stored under the version read before the query ran: a write racing
+        # with this request bumps the version, so the page is never served
+        if response["status"] == 200:
+            pages.set(key, (response["status"], response["headers"], response["body"]))
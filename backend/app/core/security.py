@@ -0,0 +1,193 @@
+"""Stateless bearer-token auth (HS256 JWTs verified against local keys).
+
+Steady-state requests cost no database round trips: verified claims are
+cached until the token expires, the key set is re-read only when its cache
+entry lapses, and google_sub -> user.id lookups go through a bounded cache.
+Tokens that carry a `uid` claim never touch the database at all.
+
+Keys come from AUTH_HMAC_KEYS ("kid1:secret1,kid2:secret2") or, for rotation
+without a restart, a JSON object {"kid": "secret"} at AUTH_KEYS_FILE.
+"""
+import base64
+import hashlib
+import hmac
+import json
+import os
+import time
+from typing import Any, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache
+from app.db import models
+from app.db import session as db_session
+
+AUTH_REQUIRED = os.getenv("AUTH_REQUIRED", "false").lower() == "true"
+AUTH_ISSUER = os.getenv("AUTH_ISSUER")
+AUTH_AUDIENCE = os.getenv("AUTH_AUDIENCE")
+KEYSET_TTL = float(os.getenv("AUTH_KEYSET_TTL", "300"))
+CLAIMS_TTL = float(os.getenv("AUTH_CLAIMS_TTL", "300"))
+LEEWAY = 30 # seconds of clock skew tolerated on exp/nbf
+
+_claims_cache = TTLCache(maxsize=int(os.getenv("AUTH_CLAIMS_CACHE_SIZE", "10000")))
+_keyset_cache = TTLCache(maxsize=1)
+_user_id_cache = TTLCache(maxsize=int(os.getenv("AUTH_USER_CACHE_SIZE", "10000")),
+                          ttl=float(os.getenv("AUTH_USER_CACHE_TTL", "600")))
+
+
+def _unauthorized(detail: str) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=detail,
+                         headers={"WWW-Authenticate": "Bearer"})
+
+
+def _b64decode(segment: str) -> bytes:
+    return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+
+
+def _b64encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def _load_keys() -> dict[str, bytes]:
+    path = os.getenv("AUTH_KEYS_FILE")
+    if path:
+        with open(path) as f:
+            return {kid: secret.encode() for kid, secret in json.load(f).items()}
+    keys = {}
+    for entry in filter(None, os.getenv("AUTH_HMAC_KEYS", "").split(",")):
+        kid, _, secret = entry.partition(":")
+        keys[kid.strip()] = secret.strip().encode()
+    return keys
+
+
+def get_keys() -> dict[str, bytes]:
+    keys = _keyset_cache.get("keys")
+    if keys is None:
+        keys = _load_keys()
+        _keyset_cache.set("keys", keys, ttl=KEYSET_TTL)
+    return keys
+
+
+def issue_token(claims: dict[str, Any], kid: Optional[str] = None, ttl: int = 3600) -> str:
+    """Sign `claims` with the key `kid` (default: first configured key)."""
+    keys = get_keys()
+    if not keys:
+        raise RuntimeError("no signing keys configured")
+    kid = kid or next(iter(keys))
+    now = int(time.time())
+    payload = {"iat": now, "exp": now + ttl, **claims}
+    signing_input = ".".join([
+        _b64encode(json.dumps({"alg": "HS256", "typ": "JWT", "kid": kid}).encode()),
+        _b64encode(json.dumps(payload, separators=(",", ":")).encode()),
+    ])
+    signature = hmac.new(keys[kid], signing_input.encode(), hashlib.sha256).digest()
+    return f"{signing_input}.{_b64encode(signature)}"
+
+
+def verify_token(token: str) -> dict[str, Any]:
+    cached = _claims_cache.get(token)
+    if cached is not None:
+        return cached
+
+    try:
+        header_b64, payload_b64, signature_b64 = token.split(".")
+        header = json.loads(_b64decode(header_b64))
+        claims = json.loads(_b64decode(payload_b64))
+        signature = _b64decode(signature_b64)
+    except ValueError:
+        raise _unauthorized("Malformed token")
+    if not isinstance(header, dict) or not isinstance(claims, dict) or not isinstance(header.get("kid", ""), str):
+        raise _unauthorized("Malformed token")
+    if header.get("alg") != "HS256":
+        raise _unauthorized("Unsupported token algorithm")
+
+    keys = get_keys()
+    candidates = [keys[header["kid"]]] if header.get("kid") in keys else list(keys.values())
+    expected = [hmac.new(k, f"{header_b64}.{payload_b64}".encode(), hashlib.sha256).digest() for k in candidates]
+    if not any(hmac.compare_digest(signature, e) for e in expected):
+        raise _unauthorized("Invalid token signature")
+
+    if not _valid_claim_types(claims):
+        raise _unauthorized("Invalid token claims")
+    now = time.time()
+    exp = claims.get("exp")
+    if exp is None or exp + LEEWAY < now:
+        raise _unauthorized("Token expired")
+    if claims.get("nbf", 0) - LEEWAY > now:
+        raise _unauthorized("Token not yet valid")
+    if AUTH_ISSUER and claims.get("iss") != AUTH_ISSUER:
+        raise _unauthorized("Invalid token issuer")
+    if AUTH_AUDIENCE and AUTH_AUDIENCE not in _as_list(claims.get("aud")):
+        raise _unauthorized("Invalid token audience")
+
+    _claims_cache.set(token, claims, ttl=min(CLAIMS_TTL, exp - now))
+    return claims
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _valid_claim_types(claims: dict[str, Any]) -> bool:
+    # claims are read as these types below and in resolve_user_id; anything else is a bad token, not a 500
+    if not _is_number(claims.get("exp", 0)) or not _is_number(claims.get("nbf", 0)):
+        return False
+    if "uid" in claims and (not isinstance(claims["uid"], int) or isinstance(claims["uid"], bool)):
+        return False
+    return isinstance(claims.get("sub", ""), str)
+
+
+def _as_list(value) -> list:
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def _user_id_for_sub(db: Session, sub: str) -> Optional[int]:
+    def lookup(session: Session) -> Optional[int]:
+        return (session.query(models.User.id)
+                .filter(models.User.google_sub == sub, models.User.deleted_at.is_(None))
+                .scalar())
+    if db_session.shard_router is None:
+        return lookup(db)
+    # users live on their shard, not in the directory `db` points at
+    hits = [user_id for user_id in db_session.shard_router.scatter(lookup).values() if user_id is not None]
+    return hits[0] if hits else None
+
+
+def resolve_user_id(db: Session, claims: dict[str, Any]) -> int:
+    """Map verified claims to users.id; only a google_sub cache miss hits the DB."""
+    if "uid" in claims:
+        return int(claims["uid"])
+    sub = claims.get("sub")
+    if not sub:
+        raise _unauthorized("Token has no subject")
+    user_id = _user_id_cache.get(sub)
+    if user_id is None:
+        user_id = _user_id_for_sub(db, sub)
+        if user_id is None:
+            raise _unauthorized("Unknown user")
+        _user_id_cache.set(sub, user_id)
+    return user_id
+
+
+def forget_google_sub(sub: Optional[str]) -> None:
+    # called when a user's google_sub changes or the user goes away
+    if sub:
+        _user_id_cache.pop(sub)
+
+
+def claims_from_authorization(authorization: Optional[str]) -> dict[str, Any]:
+    if not authorization:
+        raise _unauthorized("Not authenticated")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        raise _unauthorized("Expected a Bearer token")
+    return verify_token(token.strip())
+
+
+def user_id_from_authorization(db: Session, authorization: Optional[str]) -> Optional[int]:
+    if not authorization and not AUTH_REQUIRED:
+        return None
+    return resolve_user_id(db, claims_from_authorization(authorization))
@@ -0,0 +1,199 @@
+"""Online backfills of large tables in small, resumable, self-throttling chunks.
+
+A Backfill names a table, the rows that still need work (`where`) and an
+`apply` function that fixes one chunk of them. The runner walks the table in
+primary-key order (keyset pagination, never OFFSET), applies one chunk per
+short transaction and records its position in `backfill_checkpoints` in the
+same transaction, so an interrupted run resumes exactly where it stopped.
+
+Between chunks it sleeps for the configured pause plus as long as the chunk
+took, yielding the database to API traffic. The chunk size adapts to keep
+each transaction near `target_latency`: it halves when chunks run slow and
+grows while they are fast.
+
+CLI:
+    python -m app.db.backfill status
+    python -m app.db.backfill run users.email_lower --batch-size 1000
+    python -m app.db.backfill reset users.email_lower
+
+From an Alembic migration, commit chunk by chunk outside the migration's
+transaction:
+    with op.get_context().autocommit_block():
+        BackfillRunner(op.get_bind(), BACKFILLS["users.email_lower"]).run()
+"""
+import argparse
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timezone
+from typing import Callable, Iterator, Optional, Union
+
+from loguru import logger
+from sqlalchemy import Connection, Engine, Table, bindparam, delete, insert, select, update
+from sqlalchemy.sql import ColumnElement
+
+from app.db import models
+
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_SLEEP = 0.05
+DEFAULT_TARGET_LATENCY = 0.2
+REPORT_EVERY = 5.0 # seconds between progress lines
+
+checkpoints = models.BackfillCheckpoint.__table__
+
+
+class Backfill:
+    def __init__(self, name: str, table: Table, apply: Callable[[Connection, list], None],
+                 columns: tuple = (), where: Optional[ColumnElement] = None):
+        self.name = name
+        self.table = table
+        self.apply = apply # fixes one chunk of rows (id + `columns`)
+        self.columns = columns
+        self.where = where
+
+
+BACKFILLS: dict[str, Backfill] = {}
+
+
+def register(backfill: Backfill) -> Backfill:
+    BACKFILLS[backfill.name] = backfill
+    return backfill
+
+
+class BackfillRunner:
+    def __init__(self, bind: Union[Engine, Connection], backfill: Backfill,
+                 batch_size: int = DEFAULT_BATCH_SIZE, sleep: float = DEFAULT_SLEEP,
+                 target_latency: float = DEFAULT_TARGET_LATENCY,
+                 min_batch: int = 50, max_batch: int = 20_000,
+                 clock: Callable[[], float] = time.monotonic, pause: Callable[[float], None] = time.sleep):
+        self.bind = bind
+        self.backfill = backfill
+        self.batch_size = batch_size
+        self.sleep = sleep
+        self.target_latency = target_latency
+        self.min_batch = min_batch
+        self.max_batch = max_batch
+        self.clock = clock
+        self.pause = pause
+
+    @contextmanager
+    def _transaction(self) -> Iterator[Connection]:
+        if isinstance(self.bind, Engine):
+            with self.bind.begin() as conn:
+                yield conn
+        elif self.bind.in_transaction():
+            # inside a migration's own transaction: no intermediate commits possible
+            yield self.bind
+        else:
+            with self.bind.begin():
+                yield self.bind
+
+    def adjust(self, elapsed: float) -> None:
+        """Resize the next chunk from how long the last one took."""
+        if elapsed > self.target_latency:
+            self.batch_size = max(self.min_batch, self.batch_size // 2)
+        elif elapsed < self.target_latency / 2:
+            self.batch_size = min(self.max_batch, int(self.batch_size * 1.5) + 1)
+
+    def _checkpoint(self, conn: Connection) -> tuple[int, int]:
+        row = conn.execute(select(checkpoints.c.last_id, checkpoints.c.rows_done)
+                           .where(checkpoints.c.name == self.backfill.name)).first()
+        if row is None:
+            conn.execute(insert(checkpoints).values(name=self.backfill.name, last_id=0, rows_done=0))
+            return 0, 0
+        return row.last_id, row.rows_done
+
+    def run(self, max_chunks: Optional[int] = None) -> int:
+        """Process chunks until done (or `max_chunks`); returns rows processed by this call."""
+        backfill, table = self.backfill, self.backfill.table
+        processed = chunks = 0
+        last_report = self.clock()
+        while max_chunks is None or chunks < max_chunks:
+            started = self.clock()
+            with self._transaction() as conn:
+                last_id, rows_done = self._checkpoint(conn)
+                query = (select(table.c.id, *backfill.columns)
+                         .where(table.c.id > last_id)
+                         .order_by(table.c.id)
+                         .limit(self.batch_size))
+                if backfill.where is not None:
+                    query = query.where(backfill.where)
+                rows = conn.execute(query).all()
+                now = datetime.now(timezone.utc)
+                if not rows:
+                    conn.execute(update(checkpoints).where(checkpoints.c.name == backfill.name)
+                                 .values(completed_at=now, updated_at=now))
+                    break
+                backfill.apply(conn, rows)
+                last_id, rows_done = rows[-1].id, rows_done + len(rows)
+                conn.execute(update(checkpoints).where(checkpoints.c.name == backfill.name)
+                             .values(last_id=last_id, rows_done=rows_done, updated_at=now))
+            elapsed = self.clock() - started
+            processed += len(rows)
+            chunks += 1
+            self.adjust(elapsed)
+            if self.clock() - last_report >= REPORT_EVERY:
+                last_report = self.clock()
+                logger.info("backfill {}: {} rows done, at id {}, chunk {} rows in {:.3f}s",
+                            backfill.name, rows_done, last_id, len(rows), elapsed)
+            # yield at least as long as the chunk held the database
+            self.pause(self.sleep + elapsed)
+        logger.info("backfill {}: processed {} rows in {} chunks", backfill.name, processed, chunks)
+        return processed
+
+
+def status(bind: Union[Engine, Connection]) -> list[dict]:
+    with (bind.connect() if isinstance(bind, Engine) else nullcontext(bind)) as conn:
+        return [dict(row._mapping) for row in conn.execute(select(checkpoints).order_by(checkpoints.c.name))]
+
+
+def reset(bind: Engine, name: str) -> None:
+    with bind.begin() as conn:
+        conn.execute(delete(checkpoints).where(checkpoints.c.name == name))
+
+
+# registered backfills
+
+_users = models.User.__table__
+
+
+def _lower_emails(conn: Connection, rows: list) -> None:
+    # Python's lower() matches the @validates hook; SQL lower() is ASCII-only on SQLite
+    conn.execute(
+        update(_users).where(_users.c.id == bindparam("_id")).values(email_lower=bindparam("_lower")),
+        [{"_id": row.id, "_lower": row.email.lower()} for row in rows],
+    )
+
+
+register(Backfill("users.email_lower", _users, _lower_emails,
+                  columns=(_users.c.email,), where=_users.c.email_lower.is_(None)))
+
+
+def main(argv=None) -> None:
+    from app.db.session import engine
+
+    parser = argparse.ArgumentParser(description="Online backfills")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run = commands.add_parser("run", help="run (or resume) a backfill")
+    run.add_argument("name", choices=sorted(BACKFILLS))
+    run.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    run.add_argument("--sleep", type=float, default=DEFAULT_SLEEP)
+    run.add_argument("--target-latency", type=float, default=DEFAULT_TARGET_LATENCY)
+    reset_cmd = commands.add_parser("reset", help="forget a backfill's checkpoint")
+    reset_cmd.add_argument("name")
+    commands.add_parser("status", help="print checkpoints")
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        runner = BackfillRunner(engine, BACKFILLS[args.name], batch_size=args.batch_size,
+                                sleep=args.sleep, target_latency=args.target_latency)
+        runner.run()
+    elif args.command == "reset":
+        reset(engine, args.name)
+    else:
+        for row in status(engine):
+            state = "done" if row["completed_at"] else "in progress"
+            print(f"{row['name']}: {state}, {row['rows_done']} rows, at id {row['last_id']}")
+
+
+if __name__ == "__main__":
+    main()
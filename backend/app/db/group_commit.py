@@ -0,0 +1,147 @@
+"""Group commit: many concurrent single-row writes, one transaction.
+
+Opt in with GROUP_COMMIT_ENABLED=true. Service functions decorated with
+@grouped then no longer commit on their own: each call is queued, and a
+flusher thread per database runs up to GROUP_COMMIT_MAX_BATCH queued calls,
+or whatever arrives within GROUP_COMMIT_MAX_DELAY seconds of the first,
+in one transaction.
+
+Every call runs under its own SAVEPOINT, so one failing call (a 404, a
+constraint violation) is rolled back alone and its exception is re-raised
+in its caller. The others still commit. Side effects registered with
+`after_commit` only run once the batch has really committed.
+"""
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from functools import wraps
+from typing import Callable, Optional, TypeVar
+
+from sqlalchemy import Engine
+from sqlalchemy.orm import Session
+
+T = TypeVar("T")
+
+GROUP_COMMIT_ENABLED = os.getenv("GROUP_COMMIT_ENABLED", "false").lower() == "true"
+GROUP_COMMIT_MAX_BATCH = int(os.getenv("GROUP_COMMIT_MAX_BATCH", "64"))
+# latency budget: how long the first queued call may wait for company
+GROUP_COMMIT_MAX_DELAY = float(os.getenv("GROUP_COMMIT_MAX_DELAY", "0.002"))
+
+
+class GroupSession(Session):
+    """Session handed to grouped calls: commit() only flushes, the batch commits once."""
+
+    def commit(self) -> None:
+        self.flush()
+
+
+def after_commit(db: Session, hook: Callable[[], None]) -> None:
+    """Run `hook` once `db`'s writes are committed (now, unless inside a group commit)."""
+    hooks = db.info.get("after_commit")
+    if hooks is None:
+        hook()
+    else:
+        hooks.append(hook)
+
+
+class GroupCommitter:
+    def __init__(self, max_batch: int = GROUP_COMMIT_MAX_BATCH, max_delay: float = GROUP_COMMIT_MAX_DELAY):
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._queues: dict[Engine, queue.Queue] = {}
+        self._threads: list[threading.Thread] = []
+        self._lock = threading.Lock()
+
+    def submit(self, db: Session, fn: Callable[[Session], T]) -> T:
+        """Run `fn(session)` in the next batch for `db`'s database; blocks until it committed."""
+        future: Future = Future()
+        self._queue_for(db.get_bind()).put((fn, future))
+        return future.result()
+
+    def _queue_for(self, engine: Engine) -> queue.Queue:
+        with self._lock:
+            q = self._queues.get(engine)
+            if q is None:
+                # started lazily, so forked workers each get their own flusher
+                q = self._queues[engine] = queue.Queue()
+                thread = threading.Thread(target=self._run, args=(engine, q), name="group-commit", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+            return q
+
+    def close(self) -> None:
+        with self._lock:
+            for q in self._queues.values():
+                q.put(None)
+            self._queues.clear()
+            threads, self._threads = self._threads, []
+        for thread in threads:
+            thread.join(timeout=5)
+
+    def _run(self, engine: Engine, q: queue.Queue) -> None:
+        while True:
+            first = q.get()
+            if first is None:
+                return
+            batch = [first]
+            deadline = time.monotonic() + self.max_delay
+            stop = False
+            while len(batch) < self.max_batch:
+                try:
+                    item = q.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            self._flush(engine, batch)
+            if stop:
+                return
+
+    def _flush(self, engine: Engine, batch: list[tuple[Callable[[Session], T], Future]]) -> None:
+        done = []
+        with GroupSession(bind=engine, autoflush=False, expire_on_commit=False) as db:
+            try:
+                if engine.dialect.name == "sqlite":
+                    # pysqlite does not BEGIN before a SAVEPOINT, so the first RELEASE would commit
+                    db.connection().exec_driver_sql("BEGIN IMMEDIATE")
+                for fn, future in batch:
+                    db.info["after_commit"] = hooks = []
+                    try:
+                        with db.begin_nested():
+                            result = fn(db)
+                    except Exception as exc:
+                        future.set_exception(exc)
+                        continue
+                    done.append((future, result, hooks))
+                Session.commit(db)
+            except Exception as exc:
+                db.rollback()
+                for future, _, _ in done:
+                    future.set_exception(exc)
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+                return
+            # results stay readable (expire_on_commit=False) after the session closes
+            db.expunge_all()
+        for future, result, hooks in done:
+            for hook in hooks:
+                hook()
+            future.set_result(result)
+
+
+committer: Optional[GroupCommitter] = GroupCommitter() if GROUP_COMMIT_ENABLED else None
+
+
+def grouped(fn: Callable[..., T]) -> Callable[..., T]:
+    """Send `fn(db, ...)` through the group committer when group commit is enabled."""
+    @wraps(fn)
+    def wrapper(db: Session, *args, **kwargs) -> T:
+        if committer is None or isinstance(db, GroupSession):
+            return fn(db, *args, **kwargs)
+        return committer.submit(db, lambda session: fn(session, *args, **kwargs))
+    return wrapper
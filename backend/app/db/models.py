@@ -1,25 +1,144 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON, Index, LargeBinary, text
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
 from app.db.base import Base
+from app.db.types import CodedEnum, PackedJSON
+
+# on-disk codes of the schema Literals; append-only, never renumber
+INTERVIEW_TYPE_CODES = {"phone": 1, "behavioural": 2, "coding": 3, "design": 4}
+INTERVIEW_SOURCE_CODES = {"gmail": 1, "gcal": 2}
 
 class User(Base):
     __tablename__ = "users"
     id = Column(Integer, primary_key=True, index=True)
-    email = Column(String, unique=True, index=True, nullable=False)
-    google_sub = Column(String, unique=True, index=True, nullable=True)
+    email = Column(String, index=True, nullable=False)
+    # normalized copy of email for case-insensitive lookups and uniqueness
+    email_lower = Column(String, nullable=True)
+    google_sub = Column(String, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    deleted_at = Column(DateTime(timezone=True), nullable=True) # tombstone, purged by the compactor
     interviews = relationship("Interview", back_populates="user")
 
+    # uniqueness only applies to live rows so a deleted account's email can sign up again
+    __table_args__ = (
+        Index("uq_users_email_lower_live", "email_lower", unique=True,
+              sqlite_where=text("deleted_at IS NULL"), postgresql_where=text("deleted_at IS NULL")),
+        Index("uq_users_google_sub_live", "google_sub", unique=True,
+              sqlite_where=text("deleted_at IS NULL"), postgresql_where=text("deleted_at IS NULL")),
+        Index("ix_users_deleted_at", "deleted_at",
+              sqlite_where=text("deleted_at IS NOT NULL"), postgresql_where=text("deleted_at IS NOT NULL")),
+    )
+
+    @validates("email")
+    def _sync_email_lower(self, key, email):
+        self.email_lower = email.lower() if email is not None else None
+        return email
+
 class Interview(Base):
     __tablename__ = "interviews"
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     company = Column(String, nullable=True)
     role = Column(String, nullable=True)
-    type = Column(String, nullable=True)   # phone | behavioural | coding | design
-    source = Column(String, nullable=True) # gmail | gcal
+    type = Column(CodedEnum(INTERVIEW_TYPE_CODES), nullable=True)     # phone | behavioural | coding | design
+    source = Column(CodedEnum(INTERVIEW_SOURCE_CODES), nullable=True) # gmail | gcal
     starts_at = Column(DateTime(timezone=True), nullable=True)
-    details = Column(JSON, nullable=True)
+    details = Column(PackedJSON, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    deleted_at = Column(DateTime(timezone=True), nullable=True) # tombstone, purged by the compactor
+    change_seq = Column(Integer, nullable=True) # bumped by every write, drives the change feed
+    dedupe_key = Column(String, nullable=True) # normalized company|starts_at bucket (see services.duplicates)
+    duplicate_of = Column(Integer, nullable=True) # canonical interview this one duplicates
     user = relationship("User", back_populates="interviews")
+
+    __table_args__ = (
+        # serves list_interviews (user_id filter, newest first) over live rows only
+        Index("ix_interviews_user_live", "user_id", "id",
+              sqlite_where=text("deleted_at IS NULL"), postgresql_where=text("deleted_at IS NULL")),
+        Index("ix_interviews_user_change_seq", "user_id", "change_seq"),
+        # the similar-interview index tails the change feed across all users
+        Index("ix_interviews_change_seq", "change_seq"),
+        Index("ix_interviews_deleted_at", "deleted_at",
+              sqlite_where=text("deleted_at IS NOT NULL"), postgresql_where=text("deleted_at IS NOT NULL")),
+        # upcoming-interview windows for the reminder scheduler
+        Index("ix_interviews_starts_at_live", "starts_at",
+              sqlite_where=text("deleted_at IS NULL"), postgresql_where=text("deleted_at IS NULL")),
+        # the user dashboard: next/last interviews and per-type counts
+        Index("ix_interviews_user_starts_at_live", "user_id", "starts_at",
+              sqlite_where=text("deleted_at IS NULL"), postgresql_where=text("deleted_at IS NULL")),
+        Index("ix_interviews_user_type_live", "user_id", "type",
+              sqlite_where=text("deleted_at IS NULL"), postgresql_where=text("deleted_at IS NULL")),
+        # duplicate candidates: same user and blocking key
+        Index("ix_interviews_user_dedupe_live", "user_id", "dedupe_key",
+              sqlite_where=text("deleted_at IS NULL"), postgresql_where=text("deleted_at IS NULL")),
+        # never hand out an id again once its row was archived or purged (SQLite reuses max(id) + 1 otherwise)
+        {"sqlite_autoincrement": True},
+    )
+
+class InterviewArchive(Base):
+    """Cold storage for interviews long in the past (moved here by the archiver).
+
+    The plain columns are the manifest used to locate rows; the full row lives
+    in `payload` as zlib-compressed JSON.
+    """
+    __tablename__ = "interview_archive"
+    id = Column(Integer, primary_key=True) # the id the row had in interviews
+    user_id = Column(Integer, nullable=False)
+    starts_at = Column(DateTime(timezone=True), nullable=True)
+    archived_at = Column(DateTime(timezone=True), server_default=func.now())
+    payload = Column(LargeBinary, nullable=False)
+
+    __table_args__ = (
+        Index("ix_interview_archive_user_id", "user_id", "id"),
+    )
+
+class IdempotencyKey(Base):
+    """Stored responses for Idempotency-Key replays (see app.core.idempotency)."""
+    __tablename__ = "idempotency_keys"
+    key = Column(String, primary_key=True) # sha256 of caller + client-supplied key
+    fingerprint = Column(String, nullable=False) # sha256 of the original request
+    status_code = Column(Integer, nullable=True) # NULL while the first request is in flight
+    headers = Column(JSON, nullable=True)
+    body = Column(LargeBinary, nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+
+class BackfillCheckpoint(Base):
+    """Resume point of each online backfill (see app.db.backfill)."""
+    __tablename__ = "backfill_checkpoints"
+    name = Column(String, primary_key=True)
+    last_id = Column(Integer, nullable=False, default=0)
+    rows_done = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), nullable=True)
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+
+class Sequence(Base):
+    """Named monotonic counters (e.g. the interview change sequence)."""
+    __tablename__ = "sequences"
+    name = Column(String, primary_key=True)
+    value = Column(Integer, nullable=False, default=0)
+
+class ShardDirectory(Base):
+    """Which shard holds each user; only used when SHARD_URLS is configured.
+
+    email_lower claims the user's email across all shards (NULL once the user is deleted).
+    """
+    __tablename__ = "shard_directory"
+    user_id = Column(Integer, primary_key=True)
+    shard = Column(String, nullable=False)
+    email_lower = Column(String, nullable=True)
+
+    __table_args__ = (
+        Index("uq_shard_directory_email_lower", "email_lower", unique=True),
+    )
+
+class ReminderSent(Base):
+    """Reminders already delivered, so restarts and other workers never resend (see app.services.reminders).
+
+    starts_at is part of the key: a rescheduled interview gets fresh reminders.
+    """
+    __tablename__ = "reminders_sent"
+    interview_id = Column(Integer, primary_key=True)
+    lead_minutes = Column(Integer, primary_key=True)
+    starts_at = Column(DateTime(timezone=True), primary_key=True)
+    sent_at = Column(DateTime(timezone=True), nullable=False)
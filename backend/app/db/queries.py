@@ -0,0 +1,34 @@
+from typing import Iterable, Sequence, TypeVar
+
+from sqlalchemy.orm import Query
+
+T = TypeVar("T")
+
+# keep IN (...) lists under SQLite's host-parameter limit (999 on older builds)
+IN_CLAUSE_CHUNK_SIZE = 500
+
+def live(model):
+    # soft-deleted rows carry a deleted_at tombstone until the compactor purges them
+    return model.deleted_at.is_(None)
+
+def chunked(items: Sequence[T], size: int) -> Iterable[Sequence[T]]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+def fetch_by_ids(
+    query: Query, model, ids: Sequence[int], chunk_size: int | None = None
+) -> tuple[list, list[int]]:
+    """Resolve `ids` with WHERE id IN (...) queries, one per chunk.
+
+    Returns (rows in the requested order, ids that were not found). Duplicate
+    ids are collapsed to their first occurrence.
+    """
+    chunk_size = chunk_size or IN_CLAUSE_CHUNK_SIZE
+    wanted = list(dict.fromkeys(ids))
+    found = {}
+    for chunk in chunked(wanted, chunk_size):
+        for row in query.filter(model.id.in_(chunk)):
+            found[row.id] = row
+    rows = [found[i] for i in wanted if i in found]
+    missing = [i for i in wanted if i not in found]
+    return rows, missing
@@ -0,0 +1,163 @@
+"""Read-replica routing with read-your-writes consistency.
+
+Enabled by DATABASE_REPLICA_URLS (comma-separated). Sessions then route
+plain SELECTs of safe (GET/HEAD) requests to a healthy replica and
+everything else to the primary:
+
+- any INSERT/UPDATE/DELETE or flush pins the rest of the session to the primary;
+- non-GET requests are pinned to the primary for their whole duration;
+- after a successful write the client gets a `rw_pin` cookie (and an
+  X-Read-Your-Writes header) holding a deadline; GETs presenting either one
+  before the deadline read from the primary, so a client always sees its
+  own writes even while replicas lag by up to REPLICA_STALENESS_WINDOW.
+
+A replica that raises a connection-level error is ejected for
+REPLICA_EJECT_COOLDOWN seconds and probed with SELECT 1 before it serves
+again.
+"""
+import contextvars
+import itertools
+import os
+import threading
+import time
+from http.cookies import SimpleCookie
+from typing import Optional
+
+from sqlalchemy import Engine, create_engine, event, text
+from sqlalchemy.orm import Session
+
+STALENESS_WINDOW = float(os.getenv("REPLICA_STALENESS_WINDOW", "5"))
+EJECT_COOLDOWN = float(os.getenv("REPLICA_EJECT_COOLDOWN", "30"))
+PIN_COOKIE = "rw_pin"
+PIN_HEADER = "x-read-your-writes"
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+_pin_primary: contextvars.ContextVar[bool] = contextvars.ContextVar("pin_primary", default=False)
+
+
+class ReplicaSet:
+    def __init__(self, urls: list[str], cooldown: float = EJECT_COOLDOWN, engine_kwargs: Optional[dict] = None):
+        self.cooldown = cooldown
+        self.engines: list[Engine] = []
+        for url in urls:
+            connect_args = {"check_same_thread": False} if url.startswith("sqlite") else {}
+            engine = create_engine(url, future=True, connect_args=connect_args, **(engine_kwargs or {}))
+            event.listen(engine, "handle_error", self._on_error)
+            self.engines.append(engine)
+        self._ejected_until: dict[Engine, float] = {}
+        self._cycle = itertools.cycle(self.engines)
+        self._lock = threading.Lock()
+
+    def _on_error(self, context) -> None:
+        # only connection-level failures count against a replica, not bad queries
+        if context.is_disconnect or context.connection is None:
+            self.eject(context.engine)
+
+    def eject(self, engine: Engine) -> None:
+        with self._lock:
+            self._ejected_until[engine] = time.monotonic() + self.cooldown
+
+    def healthy(self) -> list[Engine]:
+        return [e for e in self.engines if e not in self._ejected_until]
+
+    def _probe(self, engine: Engine) -> bool:
+        try:
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+        except Exception:
+            self.eject(engine)
+            return False
+        with self._lock:
+            self._ejected_until.pop(engine, None)
+        return True
+
+    def pick(self) -> Optional[Engine]:
+        """Next healthy replica (round robin), or None to fall back to the primary."""
+        for _ in range(len(self.engines)):
+            with self._lock:
+                engine = next(self._cycle)
+                ejected_until = self._ejected_until.get(engine)
+            if ejected_until is None:
+                return engine
+            if ejected_until <= time.monotonic() and self._probe(engine):
+                return engine
+        return None
+
+    def dispose(self, close: bool = True) -> None:
+        for engine in self.engines:
+            engine.dispose(close=close)
+
+
+class RoutingSession(Session):
+    """Session whose reads may go to a replica; bind with sessionmaker(class_=..., replicas=...)."""
+
+    def __init__(self, *args, replicas: Optional[ReplicaSet] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.replicas = replicas
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        primary = super().get_bind(mapper=mapper, clause=clause, **kwargs)
+        if self.replicas is None or self.info.get("pinned") or _pin_primary.get():
+            return primary
+        if self._flushing or (clause is not None and (clause.is_dml or getattr(clause, "_for_update_arg", None))):
+            # once this session writes, its later reads must see the write
+            self.info["pinned"] = True
+            return primary
+        return self.replicas.pick() or primary
+
+    def close(self) -> None:
+        self.info.pop("pinned", None)
+        super().close()
+
+
+def pinned_to_primary() -> bool:
+    """Whether the current request must read from the primary (a write, or a client that just wrote)."""
+    return _pin_primary.get()
+
+
+class ReadYourWritesMiddleware:
+    """Pins writes and a client's reads shortly after its writes to the primary."""
+
+    def __init__(self, app, window: float = STALENESS_WINDOW):
+        self.app = app
+        self.window = window
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        write = scope["method"] not in SAFE_METHODS
+        pinned = write or self._pin_deadline(scope) > time.time()
+        token = _pin_primary.set(pinned)
+
+        async def send_wrapper(message):
+            if write and message["type"] == "http.response.start" and message["status"] < 400:
+                deadline = f"{time.time() + self.window:.3f}"
+                headers = list(message.get("headers", []))
+                headers.append((b"set-cookie", f"{PIN_COOKIE}={deadline}; Max-Age={int(self.window) + 1}; Path=/; HttpOnly".encode()))
+                headers.append((PIN_HEADER.encode(), deadline.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _pin_primary.reset(token)
+
+    @staticmethod
+    def _pin_deadline(scope) -> float:
+        for name, value in scope["headers"]:
+            if name == PIN_HEADER.encode():
+                return _as_float(value.decode())
+            if name == b"cookie":
+                morsel = SimpleCookie(value.decode()).get(PIN_COOKIE)
+                if morsel is not None:
+                    return _as_float(morsel.value)
+        return 0.0
+
+
+def _as_float(value: str) -> float:
+    try:
+        return float(value)
+    except ValueError:
+        return 0.0
@@ -0,0 +1,43 @@
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.db import models
+
+INTERVIEW_CHANGES = "interview_changes"
+# highest change_seq whose tombstone has been purged; older cursors must resync
+INTERVIEW_CHANGES_PURGED = "interview_changes_purged"
+
+
+def next_value(db: Session, name: str, increment: int = 1) -> int:
+    """Increment and return the counter inside the caller's transaction.
+
+    The UPDATE takes the row's write lock, so concurrent writers are handed
+    strictly increasing values in commit order.
+    """
+    stmt = (update(models.Sequence)
+            .where(models.Sequence.name == name)
+            .values(value=models.Sequence.value + increment)
+            .returning(models.Sequence.value))
+    value = db.execute(stmt).scalar()
+    if value is None:
+        try:
+            with db.begin_nested():
+                db.execute(insert(models.Sequence).values(name=name, value=increment))
+            value = increment
+        except IntegrityError: # another writer created it first
+            value = db.execute(stmt).scalar()
+    return value
+
+
+def current_value(db: Session, name: str) -> int:
+    return db.execute(select(models.Sequence.value).where(models.Sequence.name == name)).scalar() or 0
+
+
+def advance_to(db: Session, name: str, value: int) -> None:
+    """Raise the counter to at least `value` (never lowers it)."""
+    stmt = (update(models.Sequence)
+            .where(models.Sequence.name == name, models.Sequence.value < value)
+            .values(value=value))
+    if db.execute(stmt).rowcount == 0 and db.get(models.Sequence, name) is None:
+        db.execute(insert(models.Sequence).values(name=name, value=value))
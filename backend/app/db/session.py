@@ -1,27 +1,162 @@
 import os
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
 from dotenv import load_dotenv
+from fastapi import Depends, HTTPException, Request, status
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from starlette.concurrency import run_in_threadpool
+
+from app.core.bulkheads import install_deadline_hooks
+from app.db.slow_queries import install_slow_query_log
 
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./dev.db")
 
+# per-process pool sizing, set by app.server so that all workers together
+# stay under the database's connection budget
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+
 connect_args = {}
 if DATABASE_URL.startswith("sqlite"):
     connect_args = {"check_same_thread": False}
 
+pool_args = {"pool_pre_ping": True}
+if ":memory:" not in DATABASE_URL: # in-memory sqlite uses a singleton pool
+    pool_args.update(pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW)
+
+def instrument_engine(engine) -> None:
+    """Request deadlines and the slow-query log, on every engine the app uses."""
+    install_deadline_hooks(engine)
+    install_slow_query_log(engine)
+
 engine = create_engine(
-    DATABASE_URL, echo=False, future=True, connect_args=connect_args
+    DATABASE_URL, echo=False, future=True, connect_args=connect_args, **pool_args
 )
+instrument_engine(engine)
 
-SessionLocal = sessionmaker(
-    autocommit=False, autoflush=False, bind=engine
-)
+# read replicas: safe requests read from a replica unless the client just wrote
+# (see app.db.routing)
+DATABASE_REPLICA_URLS = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+replica_set = None
+if DATABASE_REPLICA_URLS:
+    from app.db.routing import ReplicaSet, RoutingSession
+    replica_set = ReplicaSet(DATABASE_REPLICA_URLS, engine_kwargs=pool_args)
+    for replica in replica_set.engines:
+        instrument_engine(replica)
+    SessionLocal = sessionmaker(
+        class_=RoutingSession, autocommit=False, autoflush=False, bind=engine, replicas=replica_set
+    )
+else:
+    SessionLocal = sessionmaker(
+        autocommit=False, autoflush=False, bind=engine
+    )
+
+# user-sharded mode: DATABASE_URL becomes the global directory (see app.db.shards)
+SHARD_URLS = [url.strip() for url in os.getenv("SHARD_URLS", "").split(",") if url.strip()]
+shard_router = None
+if SHARD_URLS:
+    from app.db.shards import ShardRouter
+    shard_router = ShardRouter(SHARD_URLS, directory=SessionLocal)
+    for shard_engine in shard_router.engines.values():
+        instrument_engine(shard_engine)
 
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+@contextmanager
+def session_scope(app=None) -> Iterator[Session]:
+    """A get_db session for code outside a route (e.g. middleware).
+
+    Honours `app.dependency_overrides`, so it sees the same database as routes.
+    """
+    factory = app.dependency_overrides.get(get_db, get_db) if app is not None else get_db
+    sessions = factory()
+    try:
+        yield next(sessions)
+    finally:
+        sessions.close()
+
+async def _request_user_id(request: Request, db: Session) -> Optional[int]:
+    # the user a request acts on: path, query, token (uid, or google_sub via the shards), then JSON body
+    value = request.path_params.get("user_id") or request.query_params.get("user_id")
+    if value is None and request.headers.get("authorization"):
+        from app.core.security import resolve_user_id, verify_token
+        scheme, _, token = request.headers["authorization"].partition(" ")
+        if scheme.lower() == "bearer" and token:
+            claims = verify_token(token.strip())
+            value = claims.get("uid")
+            if value is None and claims.get("sub"):
+                value = await run_in_threadpool(resolve_user_id, db, claims)
+    if value is None and request.headers.get("content-type", "").startswith("application/json"):
+        try:
+            body = await request.json()
+        except ValueError:
+            body = None
+        if isinstance(body, dict):
+            value = body.get("user_id")
+            if value is None and isinstance(body.get("filter"), dict):
+                value = body["filter"].get("user_id")
+    try:
+        return int(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+async def get_user_db(request: Request, db: Session = Depends(get_db)):
+    """Session on the shard of the user the request acts on.
+
+    Without sharding (or when the request names no user) this is get_db's
+    session, so unsharded deployments behave exactly as before.
+    """
+    user_id = await _request_user_id(request, db) if shard_router is not None else None
+    if user_id is None:
+        yield db
+        return
+    shard = await run_in_threadpool(shard_router.shard_for_user, user_id)
+    shard_db = shard_router.session(shard)
+    try:
+        yield shard_db
+    except HTTPException as exc:
+        if exc.status_code == status.HTTP_404_NOT_FOUND: # the user may have moved since it was cached
+            shard_router.forget_user(user_id)
+        raise
+    finally:
+        shard_db.close()
+
+async def get_interview_db(interview_id: int, db: Session = Depends(get_db)):
+    """Session on the shard holding `interview_id` (located by a cached primary-key probe)."""
+    if shard_router is None:
+        yield db
+        return
+    shard = await run_in_threadpool(shard_router.shard_for_interview, interview_id)
+    if shard is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Interview not found")
+    shard_db = shard_router.session(shard)
+    try:
+        yield shard_db
+    except HTTPException as exc:
+        if exc.status_code == status.HTTP_404_NOT_FOUND:
+            shard_router.forget_interview(interview_id)
+        raise
+    finally:
+        shard_db.close()
+
+def dispose_engines() -> None:
+    """Drop pooled connections inherited from a parent process.
+
+    Called in a worker right after fork: connections opened by the master
+    (e.g. while preloading the app) must never be shared with a child.
+    close=False leaves the parent's sockets alone and only forgets them here.
+    """
+    engine.dispose(close=False)
+    if replica_set is not None:
+        replica_set.dispose(close=False)
+    if shard_router is not None:
+        shard_router.dispose(close=False)
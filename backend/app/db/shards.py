@@ -0,0 +1,281 @@
+"""User-sharded storage across several databases (e.g. one SQLite file per shard).
+
+Enabled by SHARD_URLS="sqlite:///./shard0.db,sqlite:///./shard1.db". Shards
+are named shard0..shardN-1 in that order.
+
+- Placement: a new user is placed on a shard by a consistent-hash ring over
+  the user id; adding a shard only moves new placements, never existing users.
+- Directory: the main DATABASE_URL database is the global directory. It
+  records each user's shard (shard_directory) and hands out globally unique
+  ids for users and interviews in blocks, so ids never collide across shards.
+  It also owns email uniqueness: each directory row claims its user's email
+  under a unique index, so two shards can never hold the same live email.
+- Routing: user-scoped requests get a session on the user's shard; interview
+  ids are located by probing shards by primary key (cached); admin listings
+  scatter to every shard and merge.
+- Rebalancing: `python -m app.db.shards move --user-id 7 --to shard1` copies
+  a user's rows to another shard, flips the directory entry and removes the
+  source rows while holding the source shard's write lock. The move runs in
+  its own process: API workers notice it once their cached placement expires
+  (SHARD_CACHE_TTL), or sooner, when a lookup on the old shard misses.
+"""
+import argparse
+import bisect
+import hashlib
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, TypeVar
+
+from sqlalchemy import create_engine, delete, event, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.cache import TTLCache
+from app.db import models, sequences
+
+T = TypeVar("T")
+
+VNODES = 64
+ID_BLOCK_SIZE = 100
+# placements cached per worker; a user moved by another process is routed to the old shard for at most this long
+SHARD_CACHE_TTL = float(os.getenv("SHARD_CACHE_TTL", "30"))
+
+
+class EmailTaken(Exception):
+    """Another user already claims this email in the directory."""
+
+
+class HashRing:
+    def __init__(self, names: list[str], vnodes: int = VNODES):
+        self._points = sorted(
+            (self._hash(f"{name}#{i}"), name) for name in names for i in range(vnodes)
+        )
+        self._keys = [point for point, _ in self._points]
+
+    @staticmethod
+    def _hash(value: str) -> int:
+        return int.from_bytes(hashlib.md5(value.encode()).digest()[:8], "big")
+
+    def shard_for(self, key: int) -> str:
+        index = bisect.bisect(self._keys, self._hash(str(key))) % len(self._keys)
+        return self._points[index][1]
+
+
+class IdAllocator:
+    """Globally unique ids from the directory, reserved ID_BLOCK_SIZE at a time."""
+
+    def __init__(self, directory: sessionmaker, block_size: int = ID_BLOCK_SIZE):
+        self.directory = directory
+        self.block_size = block_size
+        self._blocks: dict[str, tuple[int, int]] = {}
+        self._lock = threading.Lock()
+
+    def next_id(self, table: str) -> int:
+        with self._lock:
+            current, end = self._blocks.get(table, (0, 0))
+            if current >= end:
+                with self.directory() as db:
+                    end = sequences.next_value(db, f"ids:{table}", self.block_size)
+                    db.commit()
+                current = end - self.block_size
+            current += 1
+            self._blocks[table] = (current, end)
+            return current
+
+
+class ShardRouter:
+    def __init__(self, urls: list[str], directory: sessionmaker, engine_kwargs: Optional[dict] = None):
+        self.names = [f"shard{i}" for i in range(len(urls))]
+        engine_kwargs = engine_kwargs or {}
+        self.engines = {}
+        for name, url in zip(self.names, urls):
+            connect_args = {"check_same_thread": False} if url.startswith("sqlite") else {}
+            self.engines[name] = create_engine(url, future=True, connect_args=connect_args, **engine_kwargs)
+        self.sessionmakers = {
+            name: sessionmaker(autocommit=False, autoflush=False, bind=engine)
+            for name, engine in self.engines.items()
+        }
+        for factory in self.sessionmakers.values():
+            event.listen(factory, "before_flush", self._assign_ids)
+        self.directory = directory
+        self.ring = HashRing(self.names)
+        self.ids = IdAllocator(directory)
+        self._placements = TTLCache(maxsize=100_000, ttl=SHARD_CACHE_TTL)
+        self._interview_shards = TTLCache(maxsize=100_000, ttl=SHARD_CACHE_TTL)
+        self._pool = ThreadPoolExecutor(max_workers=len(self.names), thread_name_prefix="shard-scatter")
+
+    def _assign_ids(self, session: Session, flush_context, instances) -> None:
+        for obj in session.new:
+            if isinstance(obj, (models.User, models.Interview)) and obj.id is None:
+                obj.id = self.ids.next_id(obj.__tablename__)
+
+    # placement
+
+    def shard_for_user(self, user_id: int) -> str:
+        shard = self._placements.get(user_id)
+        if shard is None:
+            with self.directory() as db:
+                shard = db.execute(
+                    select(models.ShardDirectory.shard).where(models.ShardDirectory.user_id == user_id)
+                ).scalar()
+            # users missing from the directory (not created yet) follow the ring
+            shard = shard or self.ring.shard_for(user_id)
+            self._placements.set(user_id, shard)
+        return shard
+
+    def forget_user(self, user_id: int) -> None:
+        # a lookup on the cached shard missed: re-read the directory next time
+        self._placements.pop(user_id)
+
+    def forget_interview(self, interview_id: int) -> None:
+        self._interview_shards.pop(interview_id)
+
+    def place_new_user(self, email: str) -> tuple[int, str]:
+        """Allocate an id for a new user and record its shard and email claim in the directory."""
+        user_id = self.ids.next_id(models.User.__tablename__)
+        shard = self.ring.shard_for(user_id)
+        with self.directory() as db:
+            try:
+                db.execute(insert(models.ShardDirectory).values(user_id=user_id, shard=shard,
+                                                                email_lower=email.lower()))
+                db.commit()
+            except IntegrityError:
+                db.rollback()
+                raise EmailTaken(email) from None
+        self._placements.set(user_id, shard)
+        return user_id, shard
+
+    def claim_email(self, user_id: int, email: Optional[str]) -> None:
+        """Point the user's directory claim at `email` (None releases it)."""
+        with self.directory() as db:
+            try:
+                db.execute(update(models.ShardDirectory).where(models.ShardDirectory.user_id == user_id)
+                           .values(email_lower=email.lower() if email else None))
+                db.commit()
+            except IntegrityError:
+                db.rollback()
+                raise EmailTaken(email) from None
+
+    # sessions
+
+    def session(self, shard: str) -> Session:
+        return self.sessionmakers[shard]()
+
+    def session_for_user(self, user_id: int) -> Session:
+        return self.session(self.shard_for_user(user_id))
+
+    def shard_for_interview(self, interview_id: int) -> Optional[str]:
+        shard = self._interview_shards.get(interview_id)
+        if shard is None:
+            def probe(db: Session) -> bool:
+                return (db.get(models.Interview, interview_id) is not None
+                        or db.get(models.InterviewArchive, interview_id) is not None)
+            hits = [name for name, found in self.scatter(probe).items() if found]
+            if not hits:
+                return None
+            shard = hits[0]
+            self._interview_shards.set(interview_id, shard)
+        return shard
+
+    def scatter(self, fn: Callable[[Session], T]) -> dict[str, T]:
+        """Run `fn` against every shard in parallel; returns results by shard name."""
+        def run(name: str) -> T:
+            with self.session(name) as db:
+                return fn(db)
+        return dict(zip(self.names, self._pool.map(run, self.names)))
+
+    def dispose(self, close: bool = True) -> None:
+        for engine in self.engines.values():
+            engine.dispose(close=close)
+
+    # rebalancing
+
+    def move_user(self, user_id: int, target: str) -> int:
+        """Move a user and their interviews, archived ones included, to `target`; returns rows moved.
+
+        The source shard's write lock is held from the copy until the source
+        rows are deleted, so no write to this user can slip in between.
+        """
+        source = self.shard_for_user(user_id)
+        if source == target:
+            return 0
+        with self.session(source) as src, self.session(target) as dst:
+            # a no-op write takes the source shard's write lock for the whole move
+            src.execute(update(models.User).where(models.User.id == user_id).values(id=models.User.id))
+            users = src.execute(select(models.User.__table__).where(models.User.id == user_id)).mappings().all()
+            interviews = src.execute(
+                select(models.Interview.__table__).where(models.Interview.user_id == user_id)
+            ).mappings().all()
+            archived = src.execute(
+                select(models.InterviewArchive.__table__).where(models.InterviewArchive.user_id == user_id)
+            ).mappings().all()
+
+            # re-stamp moved rows past both shards' sequences so feed cursors stay valid
+            horizon = max(sequences.current_value(src, sequences.INTERVIEW_CHANGES),
+                          sequences.current_value(dst, sequences.INTERVIEW_CHANGES))
+            sequences.advance_to(dst, sequences.INTERVIEW_CHANGES, horizon)
+            change_seq = sequences.next_value(dst, sequences.INTERVIEW_CHANGES)
+            if users:
+                dst.execute(insert(models.User.__table__), [dict(row) for row in users])
+            if interviews:
+                dst.execute(insert(models.Interview.__table__),
+                            [{**row, "change_seq": change_seq} for row in interviews])
+            if archived:
+                dst.execute(insert(models.InterviewArchive.__table__), [dict(row) for row in archived])
+            dst.commit()
+
+            with self.directory() as db:
+                moved = db.execute(update(models.ShardDirectory)
+                                   .where(models.ShardDirectory.user_id == user_id)
+                                   .values(shard=target)).rowcount
+                if not moved:
+                    db.execute(insert(models.ShardDirectory).values(user_id=user_id, shard=target))
+                db.commit()
+            self._placements.set(user_id, target)
+            for row in [*interviews, *archived]:
+                self._interview_shards.pop(row["id"])
+
+            src.execute(delete(models.InterviewArchive).where(models.InterviewArchive.user_id == user_id))
+            src.execute(delete(models.Interview).where(models.Interview.user_id == user_id))
+            src.execute(delete(models.User).where(models.User.id == user_id))
+            src.commit()
+        return len(users) + len(interviews) + len(archived)
+
+
+def main(argv=None) -> None:
+    from app.db.session import shard_router
+
+    parser = argparse.ArgumentParser(description="Shard maintenance")
+    commands = parser.add_subparsers(dest="command", required=True)
+    move = commands.add_parser("move", help="move one user's rows to another shard")
+    move.add_argument("--user-id", type=int, required=True)
+    move.add_argument("--to", required=True)
+    commands.add_parser("status", help="print row counts per shard")
+    commands.add_parser("claim-emails", help="record live users' emails in the directory (once, after upgrading)")
+    args = parser.parse_args(argv)
+
+    if shard_router is None:
+        raise SystemExit("SHARD_URLS is not configured")
+    if args.command == "move":
+        if args.to not in shard_router.names:
+            raise SystemExit(f"unknown shard {args.to}; expected one of {shard_router.names}")
+        moved = shard_router.move_user(args.user_id, args.to)
+        print(f"moved {moved} rows of user {args.user_id} to {args.to}")
+    elif args.command == "claim-emails":
+        parts = shard_router.scatter(lambda db: db.execute(
+            select(models.User.id, models.User.email).where(models.User.deleted_at.is_(None))).all())
+        for rows in parts.values():
+            for user_id, email in rows:
+                shard_router.claim_email(user_id, email)
+        print(f"claimed {sum(len(rows) for rows in parts.values())} emails")
+    else:
+        counts = shard_router.scatter(lambda db: (
+            db.query(models.User).count(), db.query(models.Interview).count()
+        ))
+        for name, (users, interviews) in counts.items():
+            print(f"{name}: {users} users, {interviews} interviews")
+
+
+if __name__ == "__main__":
+    main()
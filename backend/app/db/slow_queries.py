@@ -0,0 +1,162 @@
+"""Slow-query log with automatic EXPLAIN capture.
+
+Every statement slower than SLOW_QUERY_THRESHOLD_MS is aggregated by its
+fingerprint: the SQL with literals and IN-lists collapsed, so
+`id IN (?, ?, ?)` and `id IN (?)` count as one query. Each entry keeps its
+count, total and max duration, the routes that issued it and sample
+parameters. Parameters are redacted unless SLOW_QUERY_LOG_PARAMS=true.
+A negative threshold turns the log off.
+
+The first time a fingerprint is slow, its plan is captured with
+EXPLAIN QUERY PLAN (SQLite) or EXPLAIN (Postgres), and plans that scan a
+whole table are flagged.
+
+The aggregate is served at GET /api/v1/admin/slow-queries and logged every
+SLOW_QUERY_SUMMARY_INTERVAL seconds.
+"""
+import contextvars
+import os
+import re
+import threading
+import time
+from typing import Optional
+
+from loguru import logger
+from sqlalchemy import Engine, event
+
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "200"))
+SLOW_QUERY_LOG_PARAMS = os.getenv("SLOW_QUERY_LOG_PARAMS", "false").lower() == "true"
+SLOW_QUERY_SUMMARY_INTERVAL = float(os.getenv("SLOW_QUERY_SUMMARY_INTERVAL", "300"))
+MAX_FINGERPRINTS = 500
+MAX_ROUTES = 10
+
+_request_scope: contextvars.ContextVar[Optional[dict]] = contextvars.ContextVar("request_scope", default=None)
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDERS = re.compile(r"\((?:\s*(?:\?|%s|%\(\w+\)s|:\w+)\s*,?)+\)")
+_SPACE = re.compile(r"\s+")
+_FULL_SCAN = re.compile(r"^\s*SCAN (?!CONSTANT ROW)|Seq Scan")
+
+
+def fingerprint(statement: str) -> str:
+    sql = _STRING.sub("?", statement)
+    sql = _NUMBER.sub("?", sql)
+    sql = _PLACEHOLDERS.sub("(...)", sql)
+    return _SPACE.sub(" ", sql).strip()
+
+
+class SlowQueryLog:
+    def __init__(self, max_fingerprints: int = MAX_FINGERPRINTS):
+        self.max_fingerprints = max_fingerprints
+        self.entries: dict[str, dict] = {}
+        self.dropped = 0 # slow statements not recorded because the log was full
+        self._lock = threading.Lock()
+
+    def record(self, statement: str, parameters, duration_ms: float, route: Optional[str]) -> Optional[dict]:
+        """Add one slow execution; returns the entry when its plan still needs capturing."""
+        key = fingerprint(statement)
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                if len(self.entries) >= self.max_fingerprints:
+                    self.dropped += 1
+                    return None
+                entry = self.entries[key] = {
+                    "fingerprint": key, "count": 0, "total_ms": 0.0, "max_ms": 0.0,
+                    "routes": {}, "params": None, "plan": None, "full_scan": None,
+                }
+            entry["count"] += 1
+            entry["total_ms"] += duration_ms
+            entry["max_ms"] = max(entry["max_ms"], duration_ms)
+            entry["last_seen"] = time.time()
+            if route and (route in entry["routes"] or len(entry["routes"]) < MAX_ROUTES):
+                entry["routes"][route] = entry["routes"].get(route, 0) + 1
+            entry["params"] = repr(parameters)[:500] if SLOW_QUERY_LOG_PARAMS else "<redacted>"
+            return entry if entry["plan"] is None else None
+
+    def top(self, limit: int = 20) -> list[dict]:
+        with self._lock:
+            entries = sorted(self.entries.values(), key=lambda e: e["total_ms"], reverse=True)
+            return [{**e, "routes": dict(e["routes"])} for e in entries[:limit]]
+
+    def clear(self) -> None:
+        with self._lock:
+            self.entries.clear()
+            self.dropped = 0
+
+
+slow_log = SlowQueryLog()
+
+
+def _route() -> Optional[str]:
+    scope = _request_scope.get()
+    if scope is None:
+        return None
+    route = scope.get("route") # set by the router once the request matched
+    return f"{scope['method']} {getattr(route, 'path', scope['path'])}"
+
+
+def _explain(conn, statement: str, parameters) -> list[str]:
+    # a raw DBAPI cursor, so the EXPLAIN is neither timed nor logged itself
+    prefix = "EXPLAIN QUERY PLAN " if conn.dialect.name == "sqlite" else "EXPLAIN "
+    cursor = conn.connection.driver_connection.cursor()
+    try:
+        cursor.execute(prefix + statement, parameters)
+        rows = cursor.fetchall()
+    finally:
+        cursor.close()
+    # sqlite rows are (id, parent, notused, detail); postgres rows are one line of text
+    return [str(row[-1]) for row in rows]
+
+
+def install_slow_query_log(engine: Engine) -> None:
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _finish(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_started"].pop()
+        duration_ms = (time.perf_counter() - started) * 1000
+        if SLOW_QUERY_THRESHOLD_MS < 0 or duration_ms < SLOW_QUERY_THRESHOLD_MS:
+            return
+        entry = slow_log.record(statement, parameters, duration_ms, _route())
+        if entry is not None and not executemany and statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            try:
+                plan = _explain(conn, statement, parameters)
+            except Exception as exc:
+                plan = [f"EXPLAIN failed: {exc}"]
+            entry["plan"] = plan
+            entry["full_scan"] = any(_FULL_SCAN.search(line) for line in plan)
+
+    @event.listens_for(engine, "handle_error")
+    def _failed(context):
+        if context.connection is not None:
+            stack = context.connection.info.get("query_started")
+            if stack:
+                stack.pop()
+
+
+class QueryOriginMiddleware:
+    """Pure ASGI middleware remembering which route issued the current statements."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        token = _request_scope.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _request_scope.reset(token)
+
+
+def log_summary(limit: int = 5) -> int:
+    for entry in slow_log.top(limit):
+        logger.warning("slow query x{} total {:.0f}ms max {:.0f}ms{}: {}",
+                       entry["count"], entry["total_ms"], entry["max_ms"],
+                       " [full scan]" if entry["full_scan"] else "", entry["fingerprint"])
+    return 0 # one pass per interval
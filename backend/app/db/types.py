@@ -0,0 +1,99 @@
+"""Compact column encodings.
+
+CodedEnum stores a short enumerated string as a small integer. It takes
+2 bytes on Postgres and a 1-byte integer on SQLite, where the text it
+replaces took one byte per character. The mapping is explicit and
+append-only, because the codes are what's on disk.
+
+PackedJSON stores a JSON document as bytes. It uses msgpack when that is
+installed and JSON text otherwise, and zlib-compresses documents larger
+than DETAILS_COMPRESS_THRESHOLD. The first byte records the format, so any
+row can be read back whatever the current settings are.
+"""
+import json
+import os
+import zlib
+from typing import Any, Mapping, Optional
+
+from sqlalchemy import LargeBinary, SmallInteger
+from sqlalchemy.types import TypeDecorator
+
+try:
+    import msgpack
+except ImportError: # optional: JSON text is the fallback encoding
+    msgpack = None
+
+DETAILS_COMPRESS_THRESHOLD = int(os.getenv("DETAILS_COMPRESS_THRESHOLD", "256"))
+DETAILS_USE_MSGPACK = os.getenv("DETAILS_USE_MSGPACK", "true").lower() == "true"
+
+# format byte of a PackedJSON value
+_JSON, _JSON_ZLIB, _MSGPACK, _MSGPACK_ZLIB = b"j", b"J", b"m", b"M"
+
+
+class CodedEnum(TypeDecorator):
+    impl = SmallInteger
+    cache_ok = True
+
+    def __init__(self, codes: Mapping[str, int]):
+        super().__init__()
+        self.codes = tuple(codes.items()) # hashable, for the statement cache
+        self._encode = dict(codes)
+        self._decode = {code: value for value, code in codes.items()}
+
+    def process_bind_param(self, value: Optional[str], dialect) -> Optional[int]:
+        if value is None:
+            return None
+        try:
+            return self._encode[value]
+        except KeyError:
+            raise ValueError(f"{value!r} is not one of {sorted(self._encode)}") from None
+
+    def process_literal_param(self, value, dialect) -> str:
+        return "NULL" if value is None else str(self.process_bind_param(value, dialect))
+
+    def process_result_value(self, value: Optional[int], dialect) -> Optional[str]:
+        return None if value is None else self._decode[value]
+
+    @property
+    def python_type(self):
+        return str
+
+
+def pack(document: Any) -> bytes:
+    if msgpack is not None and DETAILS_USE_MSGPACK:
+        raw, plain, compressed = msgpack.packb(document, use_bin_type=True), _MSGPACK, _MSGPACK_ZLIB
+    else:
+        raw, plain, compressed = json.dumps(document, separators=(",", ":")).encode(), _JSON, _JSON_ZLIB
+    if len(raw) > DETAILS_COMPRESS_THRESHOLD:
+        packed = zlib.compress(raw)
+        if len(packed) < len(raw):
+            return compressed + packed
+    return plain + raw
+
+
+def unpack(data: bytes) -> Any:
+    kind, body = data[:1], data[1:]
+    if kind in (_JSON_ZLIB, _MSGPACK_ZLIB):
+        body = zlib.decompress(body)
+    if kind in (_JSON, _JSON_ZLIB):
+        return json.loads(body)
+    if kind in (_MSGPACK, _MSGPACK_ZLIB):
+        if msgpack is None:
+            raise RuntimeError("msgpack-encoded column value, but msgpack is not installed")
+        return msgpack.unpackb(body, raw=False)
+    raise ValueError(f"unknown PackedJSON format {kind!r}")
+
+
+class PackedJSON(TypeDecorator):
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value: Any, dialect) -> Optional[bytes]:
+        return None if value is None else pack(value)
+
+    def process_result_value(self, value: Optional[bytes], dialect) -> Any:
+        return None if value is None else unpack(value)
+
+    @property
+    def python_type(self):
+        return dict
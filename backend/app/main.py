@@ -1,6 +1,24 @@
-from fastapi import FastAPI
+import os
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.routes import router as api_router
+from app.core.activity import ActivityMiddleware
+from app.core.bulkheads import DeadlineExceeded
+from app.core.jobs import PeriodicJob
+from app.core.admission import RATE_LIMIT_ENABLED, AdmissionMiddleware
+from app.core.idempotency import IdempotencyMiddleware
+from app.core.profiling import PROFILING_ENABLED, ProfilingMiddleware
+from app.core.response_cache import RESPONSE_CACHE_ENABLED, ResponseCacheMiddleware
+from app.db.routing import ReadYourWritesMiddleware
+from app.db.session import SessionLocal, replica_set, shard_router
+from app.db.slow_queries import SLOW_QUERY_SUMMARY_INTERVAL, QueryOriginMiddleware, log_summary
+from app.services.archive import make_archiver
+from app.services.compaction import make_compactor
+from app.services.reminders import REMINDERS_ENABLED, make_reminder_job
+from app.services.similar import MAIN as SIMILAR_MAIN, SIMILAR_ENABLED, make_similar_job
 
 # from app.db.session import engine
 # from app.db.base import Base
@@ -11,7 +29,36 @@ from app.api.routes import router as api_router
 #     Base.metadata.create_all(bind=engine)
 #     print("Database tables created")
 
-app = FastAPI(title="Interview Prep AI Backend", version="0.1.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    jobs = []
+    # sharded: users and interviews live on the shards, so their upkeep runs once per shard
+    shards = shard_router.sessionmakers if shard_router is not None else {}
+    if os.getenv("COMPACTOR_ENABLED", "true").lower() == "true":
+        # the directory keeps idempotency keys (and any pre-sharding rows) either way
+        jobs.append(make_compactor(SessionLocal))
+        jobs += [make_compactor(factory, shard=name) for name, factory in shards.items()]
+    if os.getenv("ARCHIVER_ENABLED", "true").lower() == "true":
+        if shards:
+            jobs += [make_archiver(factory, shard=name) for name, factory in shards.items()]
+        else:
+            jobs.append(make_archiver(SessionLocal))
+    if REMINDERS_ENABLED:
+        if shards:
+            jobs += [make_reminder_job(factory, shard=name) for name, factory in shards.items()]
+        else:
+            jobs.append(make_reminder_job(SessionLocal))
+    if SIMILAR_ENABLED:
+        jobs.append(make_similar_job(shards or {SIMILAR_MAIN: SessionLocal}))
+    if SLOW_QUERY_SUMMARY_INTERVAL > 0:
+        jobs.append(PeriodicJob("slow-query-summary", log_summary, interval=SLOW_QUERY_SUMMARY_INTERVAL))
+    for job in jobs:
+        job.start()
+    yield
+    for job in jobs:
+        job.stop()
+
+app = FastAPI(title="Interview Prep AI Backend", version="0.1.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -20,6 +67,22 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(QueryOriginMiddleware)
+if PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+app.add_middleware(ActivityMiddleware)
+app.add_middleware(IdempotencyMiddleware)
+if RESPONSE_CACHE_ENABLED:
+    app.add_middleware(ResponseCacheMiddleware)
+if replica_set is not None:
+    app.add_middleware(ReadYourWritesMiddleware)
+# outermost: rejected requests cost no further work
+if RATE_LIMIT_ENABLED:
+    app.add_middleware(AdmissionMiddleware)
+
+@app.exception_handler(DeadlineExceeded)
+async def deadline_exceeded(request: Request, exc: DeadlineExceeded):
+    return JSONResponse(status_code=504, content={"detail": "Request timed out"})
 
 @app.get("/health")
 def health():
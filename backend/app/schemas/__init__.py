@@ -1,3 +1,7 @@
-from .interview import InterviewCreate, InterviewRead, InterviewUpdate
+from .interview import (
+    InterviewCreate, InterviewRead, InterviewUpdate, InterviewBatchRead, InterviewPartialRead,
+    InterviewBatchUpdate, InterviewBatchUpdateResult, InterviewChanges, InterviewType, InterviewSource,
+    InterviewSummary, SimilarInterview
+)
 from .common import ErrorResponse
-from .user import UserCreate, UserRead, UserUpdate
\ No newline at end of file
+from .user import UserCreate, UserRead, UserUpdate, UserBatchRead, UserDashboard
\ No newline at end of file
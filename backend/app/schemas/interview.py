@@ -1,15 +1,19 @@
 from __future__ import annotations
 from datetime import datetime, timezone
 from typing import Any, Literal, Optional
-from pydantic import BaseModel, Field, ConfigDict, field_validator
+from pydantic import BaseModel, Field, ConfigDict, field_validator, model_validator
+
+# stored as small integers (see models.INTERVIEW_TYPE_CODES / INTERVIEW_SOURCE_CODES)
+InterviewType = Literal["phone", "behavioural", "coding", "design"]
+InterviewSource = Literal["gmail", "gcal"]
 
 # reuse across create/update/read
 class InterviewBase(BaseModel):
     company: Optional[str] = Field(None, max_length=100)
     role: Optional[str] = Field(None, max_length=100)
     # can add more types later
-    type: Optional[Literal["phone", "behavioural", "coding", "design"]] = None
-    source: Optional[Literal["gmail", "gcal"]] = None
+    type: Optional[InterviewType] = None
+    source: Optional[InterviewSource] = None
     starts_at: Optional[datetime] = None
     details: Optional[dict[str, Any]] = None
 
@@ -38,4 +42,101 @@ class InterviewUpdate(InterviewBase):
 class InterviewRead(InterviewBase):
     id: int
     user_id: int
-    created_at: Optional[datetime] = None
\ No newline at end of file
+    created_at: Optional[datetime] = None
+    duplicate_of: Optional[int] = None # set when this interview looks like another one (e.g. invite + calendar event)
+
+# GET /interviews?fields=company,starts_at: only the requested columns are present
+# (id always); served with response_model_exclude_unset so absent fields are omitted
+class InterviewPartialRead(BaseModel):
+    id: int
+    user_id: Optional[int] = None
+    company: Optional[str] = None
+    role: Optional[str] = None
+    type: Optional[str] = None
+    source: Optional[str] = None
+    starts_at: Optional[datetime] = None
+    details: Optional[dict[str, Any]] = None
+    created_at: Optional[datetime] = None
+    duplicate_of: Optional[int] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+    ensure_timezone = field_validator("starts_at")(InterviewBase.ensure_timezone.__func__)
+
+# list-sized interview without the details blob (e.g. the user dashboard)
+class InterviewSummary(BaseModel):
+    id: int
+    user_id: int
+    company: Optional[str] = None
+    role: Optional[str] = None
+    type: Optional[InterviewType] = None
+    source: Optional[InterviewSource] = None
+    starts_at: Optional[datetime] = None
+    created_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+    ensure_timezone = field_validator("starts_at")(InterviewBase.ensure_timezone.__func__)
+
+# GET /interviews/{id}/similar: other users' matches come without id and user_id
+class SimilarInterview(BaseModel):
+    score: float
+    id: Optional[int] = None
+    user_id: Optional[int] = None
+    company: Optional[str] = None
+    role: Optional[str] = None
+    type: Optional[InterviewType] = None
+    starts_at: Optional[datetime] = None
+
+    ensure_timezone = field_validator("starts_at")(InterviewBase.ensure_timezone.__func__)
+
+# GET /interviews/changes: deleted_at set means the interview was deleted
+class InterviewChangeRead(InterviewRead):
+    change_seq: int
+    deleted_at: Optional[datetime] = None
+
+class InterviewChanges(BaseModel):
+    items: list[InterviewChangeRead]
+    cursor: int # pass as ?since= on the next call
+    has_more: bool
+
+# GET /interviews?ids=1,2,3
+class InterviewBatchRead(BaseModel):
+    items: list[InterviewPartialRead]
+    missing: list[int]
+
+# PATCH /interviews:batch, filter mode: every matching interview gets the patch
+class InterviewFilter(BaseModel):
+    user_id: int # required so a batch can never touch the whole table
+    company: Optional[str] = None
+    type: Optional[InterviewType] = None
+    source: Optional[InterviewSource] = None
+
+class InterviewBatchItem(BaseModel):
+    id: int
+    patch: InterviewUpdate
+
+# either items=[{id, patch}, ...] or filter + patch
+class InterviewBatchUpdate(BaseModel):
+    items: Optional[list[InterviewBatchItem]] = Field(None, min_length=1, max_length=1000)
+    filter: Optional[InterviewFilter] = None
+    patch: Optional[InterviewUpdate] = None
+
+    @model_validator(mode="after")
+    def check_mode(self) -> "InterviewBatchUpdate":
+        if (self.items is None) == (self.filter is None):
+            raise ValueError("provide either items or filter")
+        if self.filter is not None and not (self.patch and self.patch.model_fields_set):
+            raise ValueError("filter requires a non-empty patch")
+        if self.items is not None:
+            if self.patch is not None:
+                raise ValueError("patch is only used with filter")
+            if any(not item.patch.model_fields_set for item in self.items):
+                raise ValueError("item patches must not be empty")
+            if len({item.id for item in self.items}) != len(self.items):
+                raise ValueError("duplicate ids in items")
+        return self
+
+class InterviewBatchUpdateResult(BaseModel):
+    updated: list[int]
+    missing: list[int]
@@ -1,6 +1,8 @@
 from pydantic import BaseModel, EmailStr, Field, ConfigDict
 from typing import Optional
 
+from .interview import InterviewSummary
+
 class UserBase(BaseModel):
     email: EmailStr = Field(..., max_length=255)
     google_sub: Optional[str] = Field(None, max_length=128) # globally unique identifier for user in Google's system
@@ -18,3 +20,15 @@ class UserUpdate(UserBase):
     google_sub: Optional[str] = Field(None, max_length=128)
 
     model_config = ConfigDict(from_attributes=True)
+
+class UserBatchRead(BaseModel):
+    items: list[UserRead]
+    missing: list[int]
+
+# GET /users/{id}/dashboard: everything the home screen shows, in one response
+class UserDashboard(BaseModel):
+    user: UserRead
+    upcoming: list[InterviewSummary] # soonest first
+    recent: list[InterviewSummary] # already started, latest first
+    counts_by_type: dict[str, int] # live interviews with a type
+    total: int # all live interviews, typed or not
@@ -0,0 +1,114 @@
+"""Production entry point: gunicorn master with uvicorn workers.
+
+    python -m app.server --bind 0.0.0.0:8000 --db-max-connections 100
+
+The app is imported once in the master (preload) so workers share its pages
+copy-on-write; every worker then drops the engine's inherited connections in
+the post-fork hook and opens its own, sized so that
+workers * (pool_size + max_overflow) stays under the database budget.
+"""
+import argparse
+import os
+from dataclasses import dataclass
+
+from gunicorn.app.base import BaseApplication
+
+
+def available_cpus() -> int:
+    # respect cgroup/affinity limits (containers) rather than the host's cores
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def compute_workers(cpus: int, max_workers: int | None = None) -> int:
+    # sync handlers spend most of their time waiting on the DB, so oversubscribe
+    workers = 2 * cpus + 1
+    if max_workers is not None:
+        workers = min(workers, max_workers)
+    return max(1, workers)
+
+
+@dataclass(frozen=True)
+class PoolSizing:
+    pool_size: int
+    max_overflow: int
+
+    @property
+    def per_worker(self) -> int:
+        return self.pool_size + self.max_overflow
+
+
+def size_pools(workers: int, max_connections: int, reserved: int = 5) -> PoolSizing:
+    """Split the DB connection budget evenly across workers.
+
+    `reserved` connections are kept back for migrations, admin shells and the
+    master process. Roughly a quarter of each worker's share is overflow so
+    idle workers don't pin their whole allowance.
+    """
+    budget = max_connections - reserved
+    per_worker = budget // workers
+    if per_worker < 1:
+        raise ValueError(
+            f"{workers} workers cannot share {budget} connections; "
+            "lower --workers or raise --db-max-connections"
+        )
+    max_overflow = per_worker // 4
+    return PoolSizing(pool_size=per_worker - max_overflow, max_overflow=max_overflow)
+
+
+def post_fork(server, worker) -> None:
+    from app.db.session import dispose_engines
+    dispose_engines()
+
+
+class Server(BaseApplication):
+    def __init__(self, options: dict):
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        from app.main import app
+        return app
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run the API under gunicorn/uvicorn workers")
+    parser.add_argument("--bind", default=os.getenv("BIND", "0.0.0.0:8000"))
+    parser.add_argument("--workers", type=int, default=None,
+                        help="defaults to 2 * available cores + 1")
+    parser.add_argument("--max-workers", type=int, default=None)
+    parser.add_argument("--db-max-connections", type=int,
+                        default=int(os.getenv("DB_MAX_CONNECTIONS", "100")))
+    parser.add_argument("--db-reserved-connections", type=int, default=5)
+    parser.add_argument("--timeout", type=int, default=30)
+    parser.add_argument("--no-preload", action="store_true")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    workers = args.workers or compute_workers(available_cpus(), args.max_workers)
+    sizing = size_pools(workers, args.db_max_connections, args.db_reserved_connections)
+
+    # must be set before app.db.session is imported (preload happens in load())
+    os.environ["DB_POOL_SIZE"] = str(sizing.pool_size)
+    os.environ["DB_MAX_OVERFLOW"] = str(sizing.max_overflow)
+
+    Server({
+        "bind": args.bind,
+        "workers": workers,
+        "worker_class": "uvicorn.workers.UvicornWorker",
+        "preload_app": not args.no_preload,
+        "post_fork": post_fork,
+        "timeout": args.timeout,
+    }).run()
+
+
+if __name__ == "__main__":
+    main()
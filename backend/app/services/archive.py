@@ -0,0 +1,134 @@
+"""Cold-storage archival of interviews that are long in the past.
+
+A background job moves live interviews whose starts_at is older than
+ARCHIVE_AFTER_DAYS out of the hot `interviews` table into
+`interview_archive`, one batch per transaction, so the hot table and its
+indexes stay sized to recent history. Archived interviews remain readable:
+get_interview falls back to the archive, and listings merge it in with
+include_archived. They are read-only apart from DELETE, which removes the
+archived row outright; other writes only see the hot table. Archived rows of
+a deleted user read as missing until the compactor purges them.
+"""
+import json
+import os
+import zlib
+from datetime import datetime, timedelta, timezone
+from typing import Any, Mapping, Optional, Sequence
+
+from sqlalchemy import delete, exists, insert, select
+from sqlalchemy.orm import Session
+
+from app.core import response_cache
+from app.core.activity import in_flight
+from app.core.jobs import PeriodicJob
+from app.db import models
+from app.db.queries import IN_CLAUSE_CHUNK_SIZE, chunked, live
+
+ARCHIVE_AFTER = timedelta(days=float(os.getenv("ARCHIVE_AFTER_DAYS", "180")))
+ARCHIVER_INTERVAL = float(os.getenv("ARCHIVER_INTERVAL", "3600"))
+ARCHIVER_BATCH_SIZE = int(os.getenv("ARCHIVER_BATCH_SIZE", "500"))
+ARCHIVER_PAUSE = float(os.getenv("ARCHIVER_PAUSE", "0.1"))
+ARCHIVER_MAX_IN_FLIGHT = int(os.getenv("ARCHIVER_MAX_IN_FLIGHT", "2"))
+
+_DATETIME_FIELDS = ("starts_at", "created_at", "deleted_at")
+
+
+def encode_row(row: Mapping[str, Any]) -> bytes:
+    data = {k: v.isoformat() if isinstance(v, datetime) else v for k, v in row.items()}
+    return zlib.compress(json.dumps(data, separators=(",", ":")).encode())
+
+
+def decode_row(payload: bytes) -> dict[str, Any]:
+    data = json.loads(zlib.decompress(payload))
+    for field in _DATETIME_FIELDS:
+        if data.get(field):
+            data[field] = datetime.fromisoformat(data[field])
+    return data
+
+
+def _to_interview(payload: bytes) -> models.Interview:
+    # transient object, never added to a session: reads as an Interview, is never flushed
+    return models.Interview(**decode_row(payload))
+
+
+def archive_interviews(db: Session, batch_size: int = ARCHIVER_BATCH_SIZE,
+                       older_than: timedelta = ARCHIVE_AFTER) -> int:
+    """Move up to `batch_size` old live interviews to the archive; returns rows moved."""
+    cutoff = datetime.now(timezone.utc) - older_than
+    table = models.Interview.__table__
+    rows = db.execute(
+        select(table)
+        .where(models.Interview.starts_at < cutoff, live(models.Interview))
+        .order_by(models.Interview.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    ).mappings().all()
+    if not rows:
+        return 0
+    db.execute(insert(models.InterviewArchive), [
+        {"id": row["id"], "user_id": row["user_id"], "starts_at": row["starts_at"], "payload": encode_row(row)}
+        for row in rows
+    ])
+    db.execute(delete(models.Interview)
+               .where(models.Interview.id.in_([row["id"] for row in rows]))
+               .execution_options(synchronize_session=False))
+    db.commit()
+    # archived rows drop out of default listings
+    for user_id in {row["user_id"] for row in rows}:
+        response_cache.bump_user_version(user_id)
+    return len(rows)
+
+
+def _owner_not_deleted():
+    # the hot rows of a deleted user are tombstoned with it; archived rows are hidden through the owner instead
+    return ~exists().where(models.User.id == models.InterviewArchive.user_id, models.User.deleted_at.is_not(None))
+
+
+def get_archived(db: Session, interview_id: int, user_id: Optional[int] = None) -> Optional[models.Interview]:
+    q = select(models.InterviewArchive.payload).where(models.InterviewArchive.id == interview_id, _owner_not_deleted())
+    if user_id is not None:
+        q = q.where(models.InterviewArchive.user_id == user_id)
+    payload = db.execute(q).scalar()
+    return _to_interview(payload) if payload is not None else None
+
+
+def get_archived_many(db: Session, interview_ids: Sequence[int], user_id: Optional[int] = None) -> list[models.Interview]:
+    found = []
+    for chunk in chunked(list(interview_ids), IN_CLAUSE_CHUNK_SIZE):
+        q = select(models.InterviewArchive.payload).where(models.InterviewArchive.id.in_(chunk), _owner_not_deleted())
+        if user_id is not None:
+            q = q.where(models.InterviewArchive.user_id == user_id)
+        found += [_to_interview(payload) for payload in db.execute(q).scalars()]
+    return found
+
+
+def list_archived(db: Session, user_id: int, limit: int) -> list[models.Interview]:
+    """A user's newest `limit` archived interviews, newest first."""
+    payloads = db.execute(
+        select(models.InterviewArchive.payload)
+        .where(models.InterviewArchive.user_id == user_id, _owner_not_deleted())
+        .order_by(models.InterviewArchive.id.desc())
+        .limit(limit)
+    ).scalars()
+    return [_to_interview(payload) for payload in payloads]
+
+
+def delete_archived(db: Session, interview_id: int, user_id: Optional[int] = None) -> Optional[int]:
+    """Hard-delete one archived interview in the caller's transaction; returns its owner, or None if missing."""
+    stmt = delete(models.InterviewArchive).where(models.InterviewArchive.id == interview_id, _owner_not_deleted())
+    if user_id is not None:
+        stmt = stmt.where(models.InterviewArchive.user_id == user_id)
+    stmt = stmt.returning(models.InterviewArchive.user_id).execution_options(synchronize_session=False)
+    return db.execute(stmt).scalar()
+
+
+def make_archiver(session_factory, shard: Optional[str] = None) -> PeriodicJob:
+    def step() -> int:
+        with session_factory() as db:
+            return archive_interviews(db)
+
+    return PeriodicJob(
+        f"interview-archiver:{shard}" if shard else "interview-archiver", step,
+        interval=ARCHIVER_INTERVAL, pause=ARCHIVER_PAUSE,
+        is_busy=lambda: in_flight() > ARCHIVER_MAX_IN_FLIGHT,
+    )
@@ -0,0 +1,82 @@
+"""Physical purge of soft-deleted rows.
+
+Deletes only write a `deleted_at` tombstone; this compactor removes the rows
+later, a small batch per transaction, and only while the API is quiet.
+Archived interviews have no tombstone of their own: they go once their
+owner's tombstone has expired. It also clears expired Idempotency-Key entries.
+"""
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import delete, exists, select
+from sqlalchemy.orm import Session
+
+from app.core import idempotency
+from app.core.activity import in_flight
+from app.core.jobs import PeriodicJob
+from app.db import models, sequences
+
+COMPACTOR_INTERVAL = float(os.getenv("COMPACTOR_INTERVAL", "60"))
+COMPACTOR_BATCH_SIZE = int(os.getenv("COMPACTOR_BATCH_SIZE", "200"))
+COMPACTOR_PAUSE = float(os.getenv("COMPACTOR_PAUSE", "0.1"))
+# background purges yield whenever more requests than this are in flight
+COMPACTOR_MAX_IN_FLIGHT = int(os.getenv("COMPACTOR_MAX_IN_FLIGHT", "2"))
+# tombstones younger than this are kept around
+TOMBSTONE_RETENTION = timedelta(seconds=float(os.getenv("TOMBSTONE_RETENTION", "3600")))
+
+# interviews (hot, then archived) first so purged users never leave dangling rows behind
+PURGE_ORDER = (models.Interview, models.InterviewArchive, models.User)
+
+
+def purge_tombstones(db: Session, model, batch_size: int = COMPACTOR_BATCH_SIZE,
+                     retention: timedelta = TOMBSTONE_RETENTION) -> int:
+    """Hard-delete up to `batch_size` expired tombstones of `model`; returns rows purged."""
+    cutoff = datetime.now(timezone.utc) - retention
+    if model is models.InterviewArchive:
+        return _purge_archived(db, batch_size, cutoff)
+    tracks_changes = hasattr(model, "change_seq")
+    columns = [model.id, model.change_seq] if tracks_changes else [model.id]
+    q = select(*columns).where(model.deleted_at.is_not(None), model.deleted_at <= cutoff)
+    if model is models.User:
+        # a user goes only once none of their interview rows, tombstones included, is left
+        q = q.where(~exists().where(models.Interview.user_id == models.User.id),
+                    ~exists().where(models.InterviewArchive.user_id == models.User.id))
+    rows = db.execute(q.limit(batch_size)).all()
+    if not rows:
+        return 0
+    ids = [row.id for row in rows]
+    db.execute(delete(model).where(model.id.in_(ids)).execution_options(synchronize_session=False))
+    if tracks_changes:
+        # change-feed cursors older than a purged tombstone can no longer see that delete
+        sequences.advance_to(db, sequences.INTERVIEW_CHANGES_PURGED, max(row.change_seq or 0 for row in rows))
+    db.commit()
+    return len(ids)
+
+
+def _purge_archived(db: Session, batch_size: int, cutoff: datetime) -> int:
+    # archived rows of users whose tombstone has expired
+    a, u = models.InterviewArchive, models.User
+    owner_gone = exists().where(u.id == a.user_id, u.deleted_at.is_not(None), u.deleted_at <= cutoff)
+    ids = db.execute(select(a.id).where(owner_gone).limit(batch_size)).scalars().all()
+    if not ids:
+        return 0
+    db.execute(delete(a).where(a.id.in_(ids)).execution_options(synchronize_session=False))
+    db.commit()
+    return len(ids)
+
+
+def make_compactor(session_factory, shard: Optional[str] = None) -> PeriodicJob:
+    def step() -> int:
+        with session_factory() as db:
+            for model in PURGE_ORDER:
+                purged = purge_tombstones(db, model)
+                if purged:
+                    return purged
+            return idempotency.purge_expired(db, COMPACTOR_BATCH_SIZE)
+
+    return PeriodicJob(
+        f"tombstone-compactor:{shard}" if shard else "tombstone-compactor", step,
+        interval=COMPACTOR_INTERVAL, pause=COMPACTOR_PAUSE,
+        is_busy=lambda: in_flight() > COMPACTOR_MAX_IN_FLIGHT,
+    )
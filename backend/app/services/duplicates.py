@@ -0,0 +1,202 @@
+"""Duplicate-interview detection with blocking keys.
+
+Imports from gmail and gcal often describe one interview twice, with
+slightly different company and role strings. Comparing every pair of a
+user's interviews would be O(n²). Instead every interview gets a blocking
+key: its normalized company (case, punctuation and legal suffixes
+dropped) plus its starts_at bucket of DUPLICATE_WINDOW. The key is stored in
+`interviews.dedupe_key` under an index.
+
+Only interviews in the same or an adjacent bucket with the same company are
+compared, using difflib similarity of company and role. Two interviews can
+never match if they start more than DUPLICATE_WINDOW apart or have
+different types. A match is linked, not deleted: `duplicate_of` points at
+the cluster's canonical (oldest) interview.
+
+Creates, updates and batch updates check inline with one indexed lookup
+per changed interview. The bulk pass (`scan`) re-keys and re-links a
+user's interviews in one sorted sweep, fixing rows written before the
+columns existed:
+    python -m app.services.duplicates [--user-id 42]
+"""
+import argparse
+import os
+import re
+from collections import defaultdict, deque
+from datetime import datetime, timedelta, timezone
+from difflib import SequenceMatcher
+from typing import Optional
+
+from loguru import logger
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.orm import Session
+
+from app.core import response_cache
+from app.db import models, sequences
+from app.db.queries import live
+
+DUPLICATE_WINDOW = timedelta(minutes=float(os.getenv("DUPLICATE_WINDOW_MINUTES", "15")))
+DUPLICATE_THRESHOLD = float(os.getenv("DUPLICATE_THRESHOLD", "0.75"))
+
+_NON_WORD = re.compile(r"[^\w\s]")
+_SUFFIXES = {"inc", "incorporated", "llc", "ltd", "limited", "corp", "corporation", "co", "company",
+             "gmbh", "plc", "the"}
+
+
+def normalize(value: Optional[str]) -> str:
+    words = _NON_WORD.sub(" ", (value or "").lower()).split()
+    return " ".join(word for word in words if word not in _SUFFIXES)
+
+
+def _utc(value: datetime) -> datetime:
+    # sqlite hands back naive datetimes; everything is stored in UTC
+    return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+
+
+def _bucket(starts_at: datetime) -> int:
+    return int(_utc(starts_at).timestamp() // DUPLICATE_WINDOW.total_seconds())
+
+
+def blocking_key(company: Optional[str], starts_at: Optional[datetime]) -> Optional[str]:
+    """`company|bucket`, or None when the interview can't be matched."""
+    name = normalize(company)
+    if not name or starts_at is None:
+        return None
+    return f"{name}|{_bucket(starts_at)}"
+
+
+def _neighbour_keys(company: str, starts_at: datetime) -> list[str]:
+    # duplicates up to one window apart may straddle a bucket boundary
+    name, bucket = normalize(company), _bucket(starts_at)
+    return [f"{name}|{bucket + offset}" for offset in (-1, 0, 1)]
+
+
+def similarity(a, b) -> float:
+    """0..1 likeness of two interviews (objects with company, role, type, starts_at)."""
+    if a.type is not None and b.type is not None and a.type != b.type:
+        return 0.0
+    if a.starts_at is None or b.starts_at is None:
+        return 0.0
+    if abs(_utc(a.starts_at) - _utc(b.starts_at)) > DUPLICATE_WINDOW:
+        return 0.0
+    left = f"{normalize(a.company)} {normalize(a.role)}".strip()
+    right = f"{normalize(b.company)} {normalize(b.role)}".strip()
+    matcher = SequenceMatcher(None, left, right)
+    # quick_ratio is a cheap upper bound of ratio
+    if matcher.quick_ratio() < DUPLICATE_THRESHOLD:
+        return 0.0
+    return matcher.ratio()
+
+
+def link_duplicate(db: Session, interview: models.Interview) -> None:
+    """Set `interview`'s dedupe_key and duplicate_of from one indexed candidate lookup."""
+    interview.dedupe_key = blocking_key(interview.company, interview.starts_at)
+    interview.duplicate_of = None
+    if interview.dedupe_key is None:
+        return
+    i = models.Interview
+    q = select(i.id, i.company, i.role, i.type, i.starts_at, i.duplicate_of).where(
+        i.user_id == interview.user_id, i.dedupe_key.in_(_neighbour_keys(interview.company, interview.starts_at)),
+        live(i),
+    )
+    if interview.id is not None:
+        q = q.where(i.id != interview.id)
+    best, best_score = None, DUPLICATE_THRESHOLD
+    for candidate in db.execute(q):
+        score = similarity(interview, candidate)
+        if score >= best_score:
+            best, best_score = candidate, score
+    if best is not None:
+        canonical = best.duplicate_of or best.id
+        if canonical != interview.id: # never link a canonical to its own duplicate
+            interview.duplicate_of = canonical
+
+
+def _find(parent: dict, node: int) -> int:
+    while parent[node] != node:
+        parent[node] = parent[parent[node]]
+        node = parent[node]
+    return node
+
+
+def scan_user(db: Session, user_id: int) -> int:
+    """Re-key and re-link one user's interviews; returns how many links changed."""
+    i = models.Interview
+    rows = db.execute(
+        select(i.id, i.company, i.role, i.type, i.starts_at, i.dedupe_key, i.duplicate_of)
+        .where(i.user_id == user_id, live(i), i.starts_at.is_not(None))
+        .order_by(i.starts_at) # served by ix_interviews_user_starts_at_live
+    ).all()
+
+    # sweep in time order: each interview is compared only with its company's interviews of the last window
+    recent: dict[str, deque] = defaultdict(deque)
+    parent = {row.id: row.id for row in rows}
+    for row in rows:
+        name = normalize(row.company)
+        if not name:
+            continue
+        window = recent[name]
+        while window and _utc(row.starts_at) - _utc(window[0].starts_at) > DUPLICATE_WINDOW:
+            window.popleft()
+        for other in window:
+            if similarity(row, other) >= DUPLICATE_THRESHOLD:
+                a, b = _find(parent, row.id), _find(parent, other.id)
+                parent[max(a, b)] = min(a, b) # the oldest interview stays canonical
+        window.append(row)
+
+    keys, links = [], []
+    for row in rows:
+        key = blocking_key(row.company, row.starts_at)
+        canonical = _find(parent, row.id)
+        duplicate_of = canonical if canonical != row.id else None
+        if key != row.dedupe_key:
+            keys.append({"_id": row.id, "_key": key})
+        if duplicate_of != row.duplicate_of:
+            links.append({"_id": row.id, "_duplicate_of": duplicate_of})
+    table = i.__table__
+    if keys:
+        db.execute(update(table).where(table.c.id == bindparam("_id")).values(dedupe_key=bindparam("_key")), keys)
+    if links:
+        # a new link is a visible change: it goes out on the change feed
+        change_seq = sequences.next_value(db, sequences.INTERVIEW_CHANGES)
+        db.execute(update(table).where(table.c.id == bindparam("_id"))
+                   .values(duplicate_of=bindparam("_duplicate_of"), change_seq=change_seq), links)
+    db.commit()
+    if links:
+        response_cache.bump_user_version(user_id)
+    return len(links)
+
+
+def scan(db: Session, user_id: Optional[int] = None) -> dict:
+    """Bulk pass over one user, or every user with live interviews."""
+    if user_id is not None:
+        user_ids = [user_id]
+    else:
+        i = models.Interview
+        user_ids = db.execute(select(i.user_id).where(live(i)).distinct().order_by(i.user_id)).scalars().all()
+    changed = 0
+    for uid in user_ids:
+        changed += scan_user(db, uid)
+    logger.info("duplicate scan: {} users, {} links changed", len(user_ids), changed)
+    return {"users": len(user_ids), "links_changed": changed}
+
+
+def main(argv=None) -> None:
+    from app.db.session import SessionLocal, shard_router
+
+    parser = argparse.ArgumentParser(description="Link duplicate interviews")
+    parser.add_argument("--user-id", type=int, help="only this user (default: everyone)")
+    args = parser.parse_args(argv)
+    if shard_router is None:
+        with SessionLocal() as db:
+            print(scan(db, args.user_id))
+    elif args.user_id is not None:
+        with shard_router.session(shard_router.shard_for_user(args.user_id)) as db:
+            print(scan(db, args.user_id))
+    else:
+        for name, result in shard_router.scatter(scan).items():
+            print(name, result)
+
+
+if __name__ == "__main__":
+    main()
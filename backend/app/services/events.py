@@ -0,0 +1,150 @@
+"""In-process pub/sub for live interview updates (served as SSE).
+
+Service code publishes on a channel ("user:<id>") through the configured
+Broadcaster. The default LocalBroadcaster hands messages straight to this
+worker's EventHub; a multi-worker backend (Redis, Postgres LISTEN/NOTIFY...)
+implements the same interface by relaying messages between processes and
+calling `hub.deliver` on each of them.
+
+Each subscriber owns a small bounded queue. A subscriber that falls behind
+is dropped rather than buffered without limit; its client reconnects and
+catches up through GET /interviews/changes.
+"""
+import asyncio
+import json
+import os
+import threading
+from collections import deque
+from typing import AsyncIterator, Optional, Protocol
+
+SUBSCRIBER_QUEUE_SIZE = int(os.getenv("EVENTS_QUEUE_SIZE", "64"))
+HEARTBEAT_INTERVAL = float(os.getenv("EVENTS_HEARTBEAT_INTERVAL", "15"))
+
+
+class Subscription:
+    # __slots__ keeps an idle connection down to a few hundred bytes
+    __slots__ = ("channel", "dropped", "_queue", "_maxsize", "_ready", "_loop")
+
+    def __init__(self, channel: str, loop: asyncio.AbstractEventLoop, maxsize: int):
+        self.channel = channel
+        self.dropped = False
+        self._queue: deque = deque()
+        self._maxsize = maxsize
+        self._ready = asyncio.Event()
+        self._loop = loop
+
+    def _put(self, message: dict) -> None:
+        # runs on the subscriber's event loop
+        if len(self._queue) >= self._maxsize:
+            self.dropped = True
+            self._queue.clear()
+        else:
+            self._queue.append(message)
+        self._ready.set()
+
+    async def get(self, timeout: float) -> Optional[dict]:
+        """Next message, or None if nothing arrived within `timeout` or the subscriber was dropped."""
+        if not self._queue and not self.dropped:
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        if self.dropped or not self._queue:
+            self._ready.clear()
+            return None
+        message = self._queue.popleft()
+        if not self._queue:
+            self._ready.clear()
+        return message
+
+
+class EventHub:
+    """Fans messages out to this worker's subscribers; safe to call from any thread."""
+
+    def __init__(self, queue_size: int = SUBSCRIBER_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._channels: dict[str, set[Subscription]] = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, channel: str) -> Subscription:
+        sub = Subscription(channel, asyncio.get_running_loop(), self.queue_size)
+        with self._lock:
+            self._channels.setdefault(channel, set()).add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            subs = self._channels.get(sub.channel)
+            if subs is not None:
+                subs.discard(sub)
+                if not subs:
+                    del self._channels[sub.channel]
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return sum(len(subs) for subs in self._channels.values())
+
+    def deliver(self, channel: str, message: dict) -> None:
+        with self._lock:
+            subs = list(self._channels.get(channel, ()))
+        for sub in subs:
+            try:
+                sub._loop.call_soon_threadsafe(sub._put, message)
+            except RuntimeError: # loop already closed
+                self.unsubscribe(sub)
+
+
+class Broadcaster(Protocol):
+    """Transport between publishers and every worker's EventHub."""
+
+    def publish(self, channel: str, message: dict) -> None: ...
+
+
+class LocalBroadcaster:
+    """Single-process stand-in: delivers directly to the local hub."""
+
+    def __init__(self, hub: EventHub):
+        self.hub = hub
+
+    def publish(self, channel: str, message: dict) -> None:
+        self.hub.deliver(channel, message)
+
+
+hub = EventHub()
+broadcaster: Broadcaster = LocalBroadcaster(hub)
+
+
+def set_broadcaster(backend: Broadcaster) -> None:
+    global broadcaster
+    broadcaster = backend
+
+
+def user_channel(user_id: int) -> str:
+    return f"user:{user_id}"
+
+
+def publish_interview_change(op: str, user_id: int, interview_id: int, change_seq: Optional[int]) -> None:
+    broadcaster.publish(user_channel(user_id), {
+        "type": f"interview.{op}",
+        "id": interview_id,
+        "user_id": user_id,
+        "change_seq": change_seq,
+    })
+
+
+async def event_stream(sub: Subscription, heartbeat: float = HEARTBEAT_INTERVAL) -> AsyncIterator[str]:
+    """Render a subscription as text/event-stream frames until it is dropped or closed."""
+    try:
+        yield "retry: 5000\n\n"
+        while True:
+            message = await sub.get(timeout=heartbeat)
+            if sub.dropped:
+                yield "event: dropped\ndata: {}\n\n"
+                return
+            if message is None:
+                yield ": keep-alive\n\n"
+                continue
+            event_id = f"id: {message['change_seq']}\n" if message.get("change_seq") is not None else ""
+            yield f"{event_id}event: {message['type']}\ndata: {json.dumps(message)}\n\n"
+    finally:
+        hub.unsubscribe(sub)
@@ -1,33 +1,105 @@
-from typing import Optional
+import json
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Optional, Sequence
+from sqlalchemy import select, update
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 
-from app.db import models
-from app.schemas import InterviewCreate, InterviewUpdate
+from app.core import response_cache
+from app.db import models, sequences
+from app.db.group_commit import after_commit, grouped
+from app.db.queries import IN_CLAUSE_CHUNK_SIZE, chunked, fetch_by_ids, live
+from app.schemas import InterviewCreate, InterviewUpdate, InterviewBatchUpdate
+from app.services import archive, duplicates, events, reminders
 
+# columns a GET can project with ?fields=; list queries skip the (possibly large) details blob by default
+READ_FIELDS = ("id", "user_id", "company", "role", "type", "source", "starts_at", "details", "created_at",
+               "duplicate_of")
+LIST_FIELDS = tuple(field for field in READ_FIELDS if field != "details")
+# fields that can make or break a duplicate link
+DUPLICATE_FIELDS = {"company", "role", "type", "starts_at"}
+
+def _select(db: Session, fields: Optional[Sequence[str]]):
+    # whole ORM objects, or only the requested columns as lightweight rows
+    if fields is None:
+        return db.query(models.Interview)
+    return db.query(*(getattr(models.Interview, field) for field in fields))
+
+def _project(interview: models.Interview, fields: Optional[Sequence[str]]):
+    if fields is None:
+        return interview
+    return SimpleNamespace(**{field: getattr(interview, field) for field in fields})
+
+def _next_change_seq(db: Session) -> int:
+    return sequences.next_value(db, sequences.INTERVIEW_CHANGES)
+
+def _after_commit(db: Session, op: str, user_id: int, interview_id: int, change_seq: Optional[int]) -> None:
+    # side effects of a committed write: stale cached pages, live push to subscribers, rescheduled reminders
+    def hook() -> None:
+        response_cache.bump_user_version(user_id)
+        events.publish_interview_change(op, user_id, interview_id, change_seq)
+        reminders.interview_changed(interview_id)
+    after_commit(db, hook)
+
+@grouped
 def create_interview(db: Session, data: InterviewCreate) -> models.Interview:
     interview = models.Interview(**data.model_dump()) # .model_dump: Pydantic model to dict. **: construct new ORM object from dict
+    duplicates.link_duplicate(db, interview)
+    interview.change_seq = _next_change_seq(db)
     db.add(interview)
     db.commit() # write to DB
     db.refresh(interview)
+    _after_commit(db, "created", interview.user_id, interview.id, interview.change_seq)
     return interview
 
-def get_interview(db: Session, interview_id: int) -> models.Interview:
-    interview = db.query(models.Interview).filter(models.Interview.id == interview_id).first()
+def get_interview(
+        db: Session, interview_id: int, user_id: Optional[int] = None, include_archived: bool = False,
+        fields: Optional[Sequence[str]] = None
+) -> models.Interview:
+    # user_id scopes the lookup to one owner; other users' interviews look missing
+    q = _select(db, fields).filter(models.Interview.id == interview_id, live(models.Interview))
+    if user_id is not None:
+        q = q.filter(models.Interview.user_id == user_id)
+    interview = q.first()
+    if not interview and include_archived:
+        # archived rows are read-only, so only read paths fall back to the archive
+        archived = archive.get_archived(db, interview_id, user_id)
+        interview = _project(archived, fields) if archived else None
     if not interview:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Interview not found")
     return interview
 
+def get_interviews(
+        db: Session, interview_ids: list[int], user_id: Optional[int] = None,
+        fields: Optional[Sequence[str]] = LIST_FIELDS, include_archived: bool = False
+) -> tuple[list[models.Interview], list[int]]:
+    # (found interviews in requested order, missing ids)
+    q = _select(db, fields).filter(live(models.Interview))
+    if user_id is not None:
+        q = q.filter(models.Interview.user_id == user_id)
+    rows, missing = fetch_by_ids(q, models.Interview, interview_ids)
+    if missing and include_archived:
+        found = {i.id: i for i in rows}
+        found.update((i.id, _project(i, fields)) for i in archive.get_archived_many(db, missing, user_id))
+        rows = [found[i] for i in dict.fromkeys(interview_ids) if i in found]
+        missing = [i for i in missing if i not in found]
+    return rows, missing
+
 def list_interviews(
-        db: Session, user_id: int, limit: int, offset: int
+        db: Session, user_id: int, limit: int, offset: int, include_archived: bool = False,
+        fields: Optional[Sequence[str]] = LIST_FIELDS
 ) -> list[models.Interview]:
-    return (db.query(models.Interview)
-            .filter(models.Interview.user_id == user_id)
-            .order_by(models.Interview.id.desc()) # newest first
-            .limit(limit)
-            .offset(offset) # skip some rows for pagination
-            .all() # return as a list of ORM objects
-        )
+    q = (_select(db, fields)
+         .filter(models.Interview.user_id == user_id, live(models.Interview))
+         .order_by(models.Interview.id.desc())) # newest first
+    if not include_archived:
+        return q.limit(limit).offset(offset).all() # skip some rows for pagination
+    # merge the newest limit + offset rows of both tables, then cut the page
+    archived = archive.list_archived(db, user_id, limit + offset)
+    rows = q.limit(limit + offset).all() + [_project(interview, fields) for interview in archived]
+    rows.sort(key=lambda interview: interview.id, reverse=True)
+    return rows[offset:offset + limit]
 
 # def list_interviews(
 #     db: Session,
@@ -57,15 +129,140 @@ def list_interviews(
 #         "offset": pagination.offset,
 #     }
 
-def update_interview(db: Session, interview_id: int, data: InterviewUpdate) -> models.Interview:
-    interview = get_interview(db, interview_id)
-    for field, value in data.model_dump(exclude_unset=True).items(): # only update fields that are set
+@grouped
+def update_interview(
+        db: Session, interview_id: int, data: InterviewUpdate, user_id: Optional[int] = None
+) -> models.Interview:
+    interview = get_interview(db, interview_id, user_id)
+    patch = data.model_dump(exclude_unset=True)
+    for field, value in patch.items(): # only update fields that are set
         setattr(interview, field, value) # setattr: update attribute of an object
+    if patch.keys() & DUPLICATE_FIELDS:
+        duplicates.link_duplicate(db, interview)
+    interview.change_seq = _next_change_seq(db)
     db.commit()
     db.refresh(interview)
+    _after_commit(db, "updated", interview.user_id, interview.id, interview.change_seq)
     return interview
 
-def delete_interview(db: Session, interview_id: int) -> None:
-    interview = get_interview(db, interview_id)
-    db.delete(interview)
+def _update_where(db: Session, condition, values: dict) -> list:
+    # returns (id, user_id) rows of the live interviews that were updated
+    stmt = (update(models.Interview)
+            .where(condition, live(models.Interview))
+            .values(**values)
+            .returning(models.Interview.id, models.Interview.user_id)
+            .execution_options(synchronize_session=False))
+    return db.execute(stmt).all()
+
+def _relink_duplicates(db: Session, data: InterviewBatchUpdate, ids: list[int]) -> None:
+    # the set-based UPDATEs bypass link_duplicate: re-key the rows whose blocking fields changed
+    patches = [data.patch] if data.filter is not None else [item.patch for item in data.items]
+    if not any(patch.model_fields_set & DUPLICATE_FIELDS for patch in patches):
+        return
+    for chunk in chunked(ids, IN_CLAUSE_CHUNK_SIZE):
+        rows = db.execute(select(models.Interview).where(models.Interview.id.in_(chunk))
+                          .execution_options(populate_existing=True)).scalars()
+        for interview in rows:
+            duplicates.link_duplicate(db, interview)
+        db.flush() # later chunks see these links as candidates
+
+def batch_update_interviews(
+        db: Session, data: InterviewBatchUpdate, user_id: Optional[int] = None
+) -> tuple[list[int], list[int]]:
+    """Apply a batch PATCH as set-based UPDATEs in a single transaction.
+
+    Returns (updated ids, missing ids). Items that share an identical patch are
+    folded into one UPDATE ... WHERE id IN (...). All rows share one change_seq.
+    """
+    try:
+        change_seq = _next_change_seq(db)
+        if data.filter is not None:
+            f = data.filter
+            condition = models.Interview.user_id == f.user_id
+            for field in ("company", "type", "source"):
+                value = getattr(f, field)
+                if value is not None:
+                    condition &= getattr(models.Interview, field) == value
+            values = {**data.patch.model_dump(exclude_unset=True), "change_seq": change_seq}
+            updated = _update_where(db, condition, values)
+            missing = []
+        else:
+            groups: dict[str, tuple[dict, list[int]]] = {}
+            for item in data.items:
+                values = item.patch.model_dump(exclude_unset=True)
+                key = json.dumps(values, sort_keys=True, default=str)
+                groups.setdefault(key, ({**values, "change_seq": change_seq}, []))[1].append(item.id)
+            updated = []
+            for values, ids in groups.values():
+                for chunk in chunked(ids, IN_CLAUSE_CHUNK_SIZE):
+                    condition = models.Interview.id.in_(chunk)
+                    if user_id is not None:
+                        condition &= models.Interview.user_id == user_id
+                    updated += _update_where(db, condition, values)
+            found = {row.id for row in updated}
+            missing = [item.id for item in data.items if item.id not in found]
+        _relink_duplicates(db, data, [row.id for row in updated])
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    for row in updated:
+        _after_commit(db, "updated", row.user_id, row.id, change_seq)
+    return sorted(row.id for row in updated), missing
+
+def delete_interview(db: Session, interview_id: int, user_id: Optional[int] = None) -> None:
+    # soft delete: one single-row UPDATE; the compactor purges the tombstone later
+    condition = models.Interview.id == interview_id
+    if user_id is not None:
+        condition &= models.Interview.user_id == user_id
+    values = {"deleted_at": datetime.now(timezone.utc), "change_seq": _next_change_seq(db)}
+    deleted = _update_where(db, condition, values)
+    if deleted:
+        db.commit()
+        _after_commit(db, "deleted", deleted[0].user_id, interview_id, values["change_seq"])
+        return
+    db.rollback()
+    # archived rows carry no tombstone and no change_seq: they are removed outright
+    owner = archive.delete_archived(db, interview_id, user_id)
+    if owner is None:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Interview not found")
     db.commit()
+    _after_commit(db, "deleted", owner, interview_id, None)
+
+def tombstone_user_interviews(db: Session, user_id: int, deleted_at: datetime) -> tuple[list[int], int]:
+    """Soft-delete every live interview of a user being deleted, in the caller's transaction.
+
+    Returns (ids, change_seq); pass them to interviews_deleted once committed.
+    """
+    change_seq = _next_change_seq(db)
+    rows = _update_where(db, models.Interview.user_id == user_id,
+                         {"deleted_at": deleted_at, "change_seq": change_seq})
+    return [row.id for row in rows], change_seq
+
+def interviews_deleted(db: Session, user_id: int, interview_ids: list[int], change_seq: int) -> None:
+    for interview_id in interview_ids:
+        _after_commit(db, "deleted", user_id, interview_id, change_seq)
+
+def list_changes(
+        db: Session, user_id: int, since: int, limit: int
+) -> tuple[list[models.Interview], int, bool]:
+    """Interviews (tombstones included) written after change sequence `since`.
+
+    Returns (rows ordered by change_seq, new cursor, has_more). A page never
+    ends inside a group of rows sharing one change_seq (a batch update), so
+    resuming from the cursor cannot skip the rest of that group.
+    """
+    purged_through = sequences.current_value(db, sequences.INTERVIEW_CHANGES_PURGED)
+    if 0 < since < purged_through:
+        raise HTTPException(status_code=status.HTTP_410_GONE, detail="Cursor expired, full resync required")
+    q = (db.query(models.Interview)
+         .filter(models.Interview.user_id == user_id, models.Interview.change_seq > since)
+         .order_by(models.Interview.change_seq, models.Interview.id))
+    rows = q.limit(limit).all()
+    has_more = len(rows) == limit
+    if has_more:
+        last = rows[-1]
+        rows += q.filter(models.Interview.change_seq == last.change_seq, models.Interview.id > last.id).all()
+    cursor = rows[-1].change_seq if rows else since
+    return rows, cursor, has_more
@@ -0,0 +1,276 @@
+"""Interview reminders (e.g. 24h and 1h before starts_at) from a timing wheel.
+
+The scheduler keeps only the interviews starting within the next
+max(lead) + REMINDER_LOOKAHEAD in memory. It reads them as a range scan of
+the partial `starts_at` index and extends the window a slice at a time as
+the clock moves, so the table is never polled as a whole, not even after a
+restart. Each pending reminder sits in a hashed timing wheel. Adding and
+cancelling a reminder is O(1), and a tick only visits the reminders due in
+that slot.
+
+Interview writes mark the interview dirty (see services.interviews). The
+next tick reloads those rows and reschedules them, so a reschedule or
+delete takes effect within one tick. Right before delivery the due
+interviews are re-read. A reminder is then claimed by inserting it into
+`reminders_sent`, keyed on (interview, lead, starts_at), which means a
+restart or a second worker never sends the same reminder twice.
+
+Delivery goes through the configured Notifier (LogNotifier by default).
+With SHARD_URLS set, each shard gets its own scheduler over its own
+interviews and `reminders_sent`.
+"""
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Iterable, Optional, Protocol
+
+from loguru import logger
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.jobs import PeriodicJob
+from app.db import models
+from app.db.queries import IN_CLAUSE_CHUNK_SIZE, chunked, live
+
+REMINDERS_ENABLED = os.getenv("REMINDERS_ENABLED", "false").lower() == "true"
+REMINDER_LEADS = tuple(sorted(
+    (timedelta(minutes=int(m)) for m in os.getenv("REMINDER_LEAD_MINUTES", "1440,60").split(",") if m.strip()),
+    reverse=True,
+))
+REMINDER_TICK = float(os.getenv("REMINDER_TICK", "1"))
+REMINDER_WHEEL_SLOTS = int(os.getenv("REMINDER_WHEEL_SLOTS", "3600"))
+REMINDER_LOOKAHEAD = timedelta(seconds=float(os.getenv("REMINDER_LOOKAHEAD", "3600")))
+REMINDER_RETRY = float(os.getenv("REMINDER_RETRY", "60")) # seconds before a failed delivery is retried
+
+
+def _utc(value: datetime) -> datetime:
+    # sqlite hands back naive datetimes; everything is stored in UTC
+    return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+
+
+class Reminder:
+    __slots__ = ("interview_id", "user_id", "company", "role", "starts_at", "lead")
+
+    def __init__(self, interview_id: int, user_id: int, company: Optional[str], role: Optional[str],
+                 starts_at: datetime, lead: timedelta):
+        self.interview_id = interview_id
+        self.user_id = user_id
+        self.company = company
+        self.role = role
+        self.starts_at = starts_at
+        self.lead = lead
+
+    @property
+    def key(self) -> tuple:
+        return self.interview_id, self.lead
+
+    @property
+    def due_at(self) -> datetime:
+        return self.starts_at - self.lead
+
+
+class Notifier(Protocol):
+    def send(self, reminder: Reminder) -> None: ...
+
+
+class LogNotifier:
+    """Local stand-in: logs reminders instead of emailing or pushing them."""
+
+    def send(self, reminder: Reminder) -> None:
+        logger.info("reminder for user {}: {} {} starts at {} (in {})", reminder.user_id,
+                    reminder.company, reminder.role, reminder.starts_at.isoformat(), reminder.lead)
+
+
+notifier: Notifier = LogNotifier()
+
+
+def set_notifier(backend: Notifier) -> None:
+    global notifier
+    notifier = backend
+
+
+class TimingWheel:
+    """Hashed timing wheel keyed by absolute tick number.
+
+    Items due more than one revolution ahead share a slot with nearer ones
+    and are skipped until their tick comes round.
+    """
+
+    def __init__(self, tick: float, slots: int, now: float):
+        self.tick = tick
+        self.slots: list[dict] = [{} for _ in range(slots)]
+        self.current = int(now // tick) # next tick to process
+        self._where: dict = {} # key -> slot index
+
+    def __len__(self) -> int:
+        return len(self._where)
+
+    def add(self, key, due: float, item) -> None:
+        self.remove(key)
+        at = max(int(due // self.tick), self.current) # overdue fires on the next tick
+        index = at % len(self.slots)
+        self.slots[index][key] = (at, item)
+        self._where[key] = index
+
+    def remove(self, key) -> None:
+        index = self._where.pop(key, None)
+        if index is not None:
+            del self.slots[index][key]
+
+    def advance(self, now: float) -> list:
+        """Pop every item due up to `now`."""
+        target = int(now // self.tick)
+        due = []
+        # after a long stall each slot needs visiting only once
+        for at in range(self.current, min(target, self.current + len(self.slots) - 1) + 1):
+            slot = self.slots[at % len(self.slots)]
+            for key, (item_at, item) in list(slot.items()):
+                if item_at <= target:
+                    del slot[key]
+                    del self._where[key]
+                    due.append(item)
+        self.current = max(self.current, target + 1)
+        return due
+
+
+class ReminderScheduler:
+    def __init__(self, session_factory: Callable[[], Session], leads: Iterable[timedelta] = REMINDER_LEADS,
+                 tick: float = REMINDER_TICK, slots: int = REMINDER_WHEEL_SLOTS,
+                 lookahead: timedelta = REMINDER_LOOKAHEAD, clock: Callable[[], float] = time.time):
+        self.session_factory = session_factory
+        self.leads = tuple(sorted(leads, reverse=True))
+        self.tick = tick
+        self.slots = slots
+        self.lookahead = lookahead
+        self.clock = clock
+        self.wheel: Optional[TimingWheel] = None
+        self.loaded_until: Optional[datetime] = None
+        self._dirty: set[int] = set()
+        self._lock = threading.Lock()
+
+    def interview_changed(self, interview_id: int) -> None:
+        """Called after a committed write; applied on the next tick."""
+        with self._lock:
+            self._dirty.add(interview_id)
+
+    def _now(self) -> datetime:
+        return datetime.fromtimestamp(self.clock(), timezone.utc)
+
+    def _schedule(self, row, now: datetime) -> None:
+        for lead in self.leads:
+            self.wheel.remove((row.id, lead))
+        if row.starts_at is None or row.deleted_at is not None:
+            return
+        starts_at = _utc(row.starts_at)
+        if starts_at <= now or starts_at > self.loaded_until:
+            return # already started, or the window will pick it up later
+        for lead in self.leads:
+            reminder = Reminder(row.id, row.user_id, row.company, row.role, starts_at, lead)
+            if reminder.due_at > now:
+                self.wheel.add(reminder.key, reminder.due_at.timestamp(), reminder)
+            elif lead == self.leads[-1]:
+                # every reminder missed (created late, or we were down): send the last one now
+                self.wheel.add(reminder.key, now.timestamp(), reminder)
+
+    def _columns(self):
+        i = models.Interview
+        return i.id, i.user_id, i.company, i.role, i.starts_at, i.deleted_at
+
+    def _extend(self, db: Session, now: datetime) -> None:
+        # the window always reaches max(lead) + lookahead ahead; refilled once half of the lookahead is used
+        horizon = now + self.leads[0] + self.lookahead
+        if self.loaded_until is not None and self.loaded_until - now > self.leads[0] + self.lookahead / 2:
+            return
+        start = self.loaded_until or now
+        rows = db.execute(
+            select(*self._columns())
+            .where(models.Interview.starts_at > start, models.Interview.starts_at <= horizon,
+                   live(models.Interview))
+            .order_by(models.Interview.starts_at)
+        ).all()
+        self.loaded_until = horizon
+        for row in rows:
+            self._schedule(row, now)
+        # delivery records are only needed until their interview has started
+        db.execute(delete(models.ReminderSent).where(models.ReminderSent.starts_at < now - timedelta(days=1)))
+        db.commit()
+
+    def _reload_dirty(self, db: Session, now: datetime) -> None:
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+        for chunk in chunked(sorted(dirty), IN_CLAUSE_CHUNK_SIZE):
+            found = db.execute(select(*self._columns()).where(models.Interview.id.in_(chunk))).all()
+            for row in found:
+                self._schedule(row, now)
+            for missing in set(chunk) - {row.id for row in found}: # purged or archived
+                for lead in self.leads:
+                    self.wheel.remove((missing, lead))
+
+    def _deliver(self, db: Session, due: list[Reminder], now: datetime) -> int:
+        # re-read first: another worker may have rescheduled or deleted the interview
+        current = {}
+        for chunk in chunked([r.interview_id for r in due], IN_CLAUSE_CHUNK_SIZE):
+            current.update(db.execute(
+                select(models.Interview.id, models.Interview.starts_at)
+                .where(models.Interview.id.in_(chunk), live(models.Interview))
+            ).all())
+        sent = 0
+        for reminder in due:
+            starts_at = current.get(reminder.interview_id)
+            if starts_at is None or _utc(starts_at) != reminder.starts_at:
+                continue
+            claim = models.ReminderSent(interview_id=reminder.interview_id,
+                                        lead_minutes=int(reminder.lead.total_seconds() // 60),
+                                        starts_at=reminder.starts_at, sent_at=now)
+            db.add(claim)
+            try:
+                db.commit()
+            except IntegrityError:
+                db.rollback() # already sent, by us before a restart or by another worker
+                continue
+            try:
+                notifier.send(reminder)
+            except Exception:
+                logger.exception("reminder delivery failed for interview {}", reminder.interview_id)
+                db.delete(claim)
+                db.commit()
+                self.wheel.add(reminder.key, now.timestamp() + REMINDER_RETRY, reminder)
+                continue
+            sent += 1
+        return sent
+
+    def tick_once(self) -> int:
+        """Advance the wheel to the current time; returns reminders sent."""
+        now = self._now()
+        with self.session_factory() as db:
+            if self.wheel is None:
+                self.wheel = TimingWheel(self.tick, self.slots, now.timestamp())
+            self._extend(db, now)
+            if self._dirty:
+                self._reload_dirty(db, now)
+            due = self.wheel.advance(now.timestamp())
+            return self._deliver(db, due, now) if due else 0
+
+
+# one per database holding interviews: the main one, or each shard
+schedulers: list[ReminderScheduler] = []
+
+
+def interview_changed(interview_id: int) -> None:
+    # the interview's shard reschedules it; the others drop it as not found
+    for scheduler in schedulers:
+        scheduler.interview_changed(interview_id)
+
+
+def make_reminder_job(session_factory, shard: Optional[str] = None) -> PeriodicJob:
+    scheduler = ReminderScheduler(session_factory)
+    schedulers.append(scheduler)
+
+    def step() -> int:
+        scheduler.tick_once()
+        return 0 # one tick per interval
+
+    return PeriodicJob(f"reminder-scheduler:{shard}" if shard else "reminder-scheduler", step,
+                       interval=REMINDER_TICK)
@@ -0,0 +1,586 @@
+"""Similar-interview retrieval over hashed n-gram vectors.
+
+Every interview is a fixed-size float32 vector of signed hashed features.
+Company and role contribute character trigrams, so "Acme Inc." and
+"ACME" match. Type contributes one token. The details notes contribute
+word unigrams and bigrams. Each field is L2-normalized and weighted by
+FIELD_WEIGHTS, and the result is normalized again, so a dot product is a
+cosine similarity.
+
+The vectors live in one contiguous (rows x SIMILAR_DIM) float32 matrix,
+memory-mapped from SIMILAR_INDEX_DIR, next to parallel id/user/type arrays.
+Compaction clusters the rows with spherical k-means into about sqrt(rows)
+lists and stores each list contiguously. A query then scores the
+SIMILAR_NPROBE nearest lists and the unclustered tail of recent appends,
+one matrix multiply per SIMILAR_BLOCK_ROWS block. Below SIMILAR_EXACT_ROWS
+rows, or when the query is filtered to one user, every candidate is scored,
+so those results are exact. Deleted and superseded rows are tombstoned in
+place (user -1). Compaction drops them and folds the tail back into the
+lists once either grows past its limit.
+
+The index is fed from the interview change feed (change_seq), so writes
+made on any worker are picked up within SIMILAR_SYNC_INTERVAL. With
+SHARD_URLS set, every shard has its own feed, and the index keeps one
+cursor per shard. One process holds `writer.lock` and maintains the files.
+Every other worker maps them read-only and remaps when `meta.json` is
+replaced. The index is derived data. If it is missing, or a feed it
+resumes from has been purged, it is rebuilt from the interviews and the
+archive of every database:
+    python -m app.services.similar rebuild|compact|stats
+"""
+import argparse
+import fcntl
+import itertools
+import json
+import os
+import re
+import shutil
+import threading
+import zlib
+from contextlib import ExitStack
+from typing import Any, Callable, Iterable, Optional
+
+import numpy as np
+from fastapi import HTTPException, status
+from loguru import logger
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.jobs import PeriodicJob
+from app.db import models, sequences
+from app.db.queries import live
+from app.services.duplicates import normalize
+
+SIMILAR_ENABLED = os.getenv("SIMILAR_ENABLED", "false").lower() == "true"
+SIMILAR_INDEX_DIR = os.getenv("SIMILAR_INDEX_DIR", "var/similar")
+SIMILAR_DIM = int(os.getenv("SIMILAR_DIM", "256"))
+SIMILAR_NPROBE = int(os.getenv("SIMILAR_NPROBE", "8"))
+SIMILAR_EXACT_ROWS = int(os.getenv("SIMILAR_EXACT_ROWS", "50000"))
+SIMILAR_BLOCK_ROWS = int(os.getenv("SIMILAR_BLOCK_ROWS", "65536"))
+SIMILAR_SYNC_INTERVAL = float(os.getenv("SIMILAR_SYNC_INTERVAL", "1"))
+SIMILAR_SYNC_BATCH = int(os.getenv("SIMILAR_SYNC_BATCH", "1000"))
+# compact once tombstones exceed this share of the rows, or the unclustered tail this many rows
+SIMILAR_COMPACT_DEAD_RATIO = float(os.getenv("SIMILAR_COMPACT_DEAD_RATIO", "0.2"))
+SIMILAR_COMPACT_TAIL_ROWS = int(os.getenv("SIMILAR_COMPACT_TAIL_ROWS", "20000"))
+SIMILAR_KMEANS_SAMPLE = int(os.getenv("SIMILAR_KMEANS_SAMPLE", "50000"))
+SIMILAR_KMEANS_ITERATIONS = int(os.getenv("SIMILAR_KMEANS_ITERATIONS", "10"))
+
+FIELD_WEIGHTS = {"company": 2.0, "role": 1.5, "type": 1.0, "details": 1.0}
+# parallel row arrays of a generation: name -> dtype (vectors is 2-d)
+ARRAYS = {"vectors": np.float32, "ids": np.int64, "users": np.int32, "types": np.int8}
+NO_TYPE = -1
+DEAD = -1 # `users` value of a tombstoned row
+MIN_CAPACITY = 1024
+MAIN = "main" # feed name of the unsharded database
+
+_WORD = re.compile(r"\w+")
+
+
+# -- vectors ---------------------------------------------------------------
+
+def _strings(value: Any) -> Iterable[str]:
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _strings(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _strings(item)
+
+
+def _tokens(field: str, value: Any) -> list[str]:
+    if field in ("company", "role"):
+        words = normalize(value).split()
+        grams = [f" {word} "[i:i + 3] for word in words for i in range(len(word))]
+        return words + grams
+    if field == "type":
+        return [value] if value else []
+    words = _WORD.findall(" ".join(_strings(value)).lower())
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+def vectorize(interview, dim: int = SIMILAR_DIM) -> np.ndarray:
+    """Unit float32 vector of an interview (anything with company, role, type, details)."""
+    vector = np.zeros(dim, dtype=np.float32)
+    for field, weight in FIELD_WEIGHTS.items():
+        tokens = _tokens(field, getattr(interview, field, None))
+        if not tokens:
+            continue
+        hashes = np.fromiter((zlib.crc32(f"{field}:{token}".encode()) for token in tokens),
+                             dtype=np.uint32, count=len(tokens))
+        signs = np.where(hashes & 0x80000000, 1.0, -1.0)
+        part = np.bincount(hashes % dim, weights=signs, minlength=dim)
+        norm = np.linalg.norm(part)
+        if norm:
+            vector += (weight / norm) * part.astype(np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def _type_code(value: Optional[str]) -> int:
+    return models.INTERVIEW_TYPE_CODES.get(value, NO_TYPE) if value is not None else NO_TYPE
+
+
+def _kmeans(vectors: np.ndarray, lists: int, seed: int = 0) -> np.ndarray:
+    # spherical k-means on a sample; returns unit centroids
+    rng = np.random.default_rng(seed)
+    sample = vectors[np.sort(rng.choice(len(vectors), min(len(vectors), SIMILAR_KMEANS_SAMPLE), replace=False))]
+    centroids = sample[rng.choice(len(sample), lists, replace=False)].copy()
+    for _ in range(SIMILAR_KMEANS_ITERATIONS):
+        assign = np.argmax(sample @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, sample)
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        filled = norms[:, 0] > 0 # an empty list keeps its old centroid
+        centroids[filled] = sums[filled] / norms[filled]
+    return centroids
+
+
+def _blocks(rows, size: int):
+    if isinstance(rows, slice):
+        for start in range(rows.start, rows.stop, size):
+            yield slice(start, min(start + size, rows.stop))
+    else:
+        for start in range(0, len(rows), size):
+            yield rows[start:start + size]
+
+
+# -- storage ---------------------------------------------------------------
+
+class _State:
+    """One mapped view of the index; queries keep using it while the writer swaps in a new one."""
+    __slots__ = ("meta", "vectors", "ids", "users", "types", "centroids", "offsets")
+
+    def __init__(self, meta: dict, arrays: dict, centroids: Optional[np.ndarray], offsets: Optional[np.ndarray]):
+        self.meta = meta
+        self.vectors, self.ids, self.users, self.types = (arrays[name] for name in ARRAYS)
+        self.centroids = centroids
+        self.offsets = offsets
+
+    @property
+    def count(self) -> int:
+        return self.meta["count"]
+
+    @property
+    def clustered(self) -> int:
+        return self.meta["clustered"]
+
+
+class VectorIndex:
+    """The memory-mapped vector files under `root`; writable only for the process holding writer.lock."""
+
+    def __init__(self, root: str = SIMILAR_INDEX_DIR, dim: int = SIMILAR_DIM):
+        self.root = root
+        self.dim = dim
+        self.writer = False
+        self._lock = threading.Lock()
+        self._lock_file = None
+        self._meta_inode = None
+        self._state: Optional[_State] = None
+        # writer only: id -> row of its live vector
+        self._sorted_ids = np.empty(0, dtype=np.int64)
+        self._sorted_rows = np.empty(0, dtype=np.int64)
+        self._recent: dict[int, int] = {}
+
+    def _path(self, *parts) -> str:
+        return os.path.join(self.root, *(str(part) for part in parts))
+
+    def acquire_writer(self) -> bool:
+        """Become the writer unless another process already is."""
+        if self.writer:
+            return True
+        os.makedirs(self.root, exist_ok=True)
+        handle = open(self._path("writer.lock"), "a")
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            handle.close()
+            return False
+        self._lock_file, self.writer = handle, True
+        with self._lock:
+            try:
+                self._state = self._load()
+            except (FileNotFoundError, ValueError) as exc: # nothing usable on disk: sync rebuilds it
+                logger.info("similar index not loaded: {}", exc)
+                self._state = None
+            if self._state is not None:
+                self._index_positions(self._state)
+        return True
+
+    def release_writer(self) -> None:
+        if self._lock_file is not None:
+            self._lock_file.close()
+        self._lock_file, self.writer = None, False
+
+    # mapping
+
+    def _map(self, generation: int, name: str, rows: int, mode: str) -> np.ndarray:
+        shape = (rows, self.dim) if name == "vectors" else (rows,)
+        return np.memmap(self._path(f"g{generation}", name), dtype=ARRAYS[name], mode=mode, shape=shape)
+
+    def _load(self) -> Optional[_State]:
+        with open(self._path("meta.json")) as handle:
+            inode = os.fstat(handle.fileno()).st_ino
+            meta = json.load(handle)
+        if meta["dim"] != self.dim:
+            raise ValueError(f"similar index has dim {meta['dim']}, expected {self.dim}; rebuild it")
+        if "cursors" not in meta:
+            raise ValueError("similar index predates per-database cursors; rebuild it")
+        mode = "r+" if self.writer else "r"
+        generation = meta["generation"]
+        arrays = {name: self._map(generation, name, meta["capacity"], mode) for name in ARRAYS}
+        centroids = offsets = None
+        if meta["lists"]:
+            centroids = np.fromfile(self._path(f"g{generation}", "centroids"), dtype=np.float32).reshape(-1, self.dim)
+            offsets = np.fromfile(self._path(f"g{generation}", "offsets"), dtype=np.int64)
+        self._meta_inode = inode
+        return _State(meta, arrays, centroids, offsets)
+
+    def current(self) -> Optional[_State]:
+        """The latest state, remapped when another process replaced meta.json."""
+        if self.writer:
+            return self._state
+        try:
+            inode = os.stat(self._path("meta.json")).st_ino
+        except FileNotFoundError:
+            return None
+        if inode != self._meta_inode:
+            with self._lock:
+                if inode != self._meta_inode:
+                    try:
+                        self._state = self._load()
+                    except FileNotFoundError: # the writer swapped generations meanwhile; retry next query
+                        pass
+        return self._state
+
+    def _write_meta(self, meta: dict) -> None:
+        temp = self._path("meta.json.tmp")
+        with open(temp, "w") as handle:
+            json.dump(meta, handle)
+        os.replace(temp, self._path("meta.json"))
+
+    # writer
+
+    def _index_positions(self, state: _State) -> None:
+        rows = np.flatnonzero(state.users[:state.count] != DEAD)
+        order = np.argsort(state.ids[rows], kind="stable")
+        self._sorted_ids = np.asarray(state.ids[rows][order])
+        self._sorted_rows = rows[order]
+        self._recent = {}
+
+    def _row_of(self, interview_id: int) -> Optional[int]:
+        row = self._recent.get(interview_id)
+        if row is not None:
+            return row
+        at = np.searchsorted(self._sorted_ids, interview_id)
+        if at < len(self._sorted_ids) and self._sorted_ids[at] == interview_id:
+            row = int(self._sorted_rows[at])
+            if self._state.users[row] != DEAD:
+                return row
+        return None
+
+    def _new_generation(self, capacity: int, cursors: dict[str, int]) -> _State:
+        existing = [int(name[1:]) for name in os.listdir(self.root) if re.fullmatch(r"g\d+", name)]
+        generation = max(existing, default=0) + 1
+        os.makedirs(self._path(f"g{generation}"))
+        meta = {"generation": generation, "dim": self.dim, "count": 0, "clustered": 0, "capacity": capacity,
+                "dead": 0, "lists": 0, "cursors": dict(cursors)}
+        for name in ARRAYS:
+            width = self.dim if name == "vectors" else 1
+            with open(self._path(f"g{generation}", name), "wb") as handle:
+                handle.truncate(capacity * width * np.dtype(ARRAYS[name]).itemsize)
+        return _State(meta, {name: self._map(generation, name, capacity, "r+") for name in ARRAYS}, None, None)
+
+    def _grow(self, state: _State, needed: int) -> _State:
+        capacity = max(needed, 2 * state.meta["capacity"], MIN_CAPACITY)
+        generation = state.meta["generation"]
+        for name in ARRAYS:
+            getattr(state, name).flush()
+            width = self.dim if name == "vectors" else 1
+            os.truncate(self._path(f"g{generation}", name), capacity * width * np.dtype(ARRAYS[name]).itemsize)
+        meta = {**state.meta, "capacity": capacity}
+        return _State(meta, {name: self._map(generation, name, capacity, "r+") for name in ARRAYS},
+                      state.centroids, state.offsets)
+
+    def _swap(self, state: _State) -> None:
+        for name in ARRAYS:
+            getattr(state, name).flush()
+        old = self._state
+        self._write_meta(state.meta)
+        self._state = state
+        if old is not None and old.meta["generation"] != state.meta["generation"]:
+            # processes still mapping the old files keep reading them until they remap
+            shutil.rmtree(self._path(f"g{old.meta['generation']}"), ignore_errors=True)
+
+    def _append(self, state: _State, rows: list) -> _State:
+        # rows of (id, user_id, type code, vector) written after the last row
+        count = state.count
+        if count + len(rows) > state.meta["capacity"]:
+            state = self._grow(state, count + len(rows))
+        if rows:
+            ids, users, types, vectors = zip(*rows)
+            end = count + len(rows)
+            state.vectors[count:end] = np.stack(vectors)
+            state.ids[count:end], state.users[count:end], state.types[count:end] = ids, users, types
+        state.meta = {**state.meta, "count": count + len(rows)}
+        return state
+
+    def apply(self, upserts: list, removals: Iterable[int], cursor: int, feed: str = MAIN) -> None:
+        """Append new vectors (id, user_id, type, vector), tombstone replaced and removed ids, save `feed`'s cursor."""
+        with self._lock:
+            state = self._state
+            dead = 0
+            for interview_id in [*removals, *(item[0] for item in upserts)]:
+                row = self._row_of(interview_id)
+                if row is not None:
+                    state.users[row] = DEAD
+                    self._recent.pop(interview_id, None)
+                    dead += 1
+            count = state.count
+            state = self._append(state, upserts)
+            for offset, (interview_id, *_) in enumerate(upserts):
+                self._recent[interview_id] = count + offset
+            state.meta = {**state.meta, "dead": state.meta["dead"] + dead,
+                          "cursors": {**state.meta["cursors"], feed: cursor}}
+            self._swap(state)
+
+    def needs_compaction(self) -> bool:
+        state = self._state
+        if state is None or not state.count:
+            return False
+        tail = state.count - state.clustered
+        # below SIMILAR_EXACT_ROWS everything is scanned anyway, so the tail costs nothing extra
+        tail_limit = state.count >= SIMILAR_EXACT_ROWS and tail > SIMILAR_COMPACT_TAIL_ROWS
+        return tail_limit or state.meta["dead"] > SIMILAR_COMPACT_DEAD_RATIO * state.count
+
+    def compact(self, source: Optional[_State] = None, cursors: Optional[dict[str, int]] = None) -> None:
+        """Rewrite the live rows of `source` (default: the index) as a new, clustered generation."""
+        with self._lock:
+            source = source or self._state
+            if source is None:
+                return
+            rows = np.flatnonzero(source.users[:source.count] != DEAD)
+            lists = 0
+            if len(rows) >= SIMILAR_EXACT_ROWS:
+                lists = int(np.sqrt(len(rows)))
+            assign = np.zeros(len(rows), dtype=np.int64)
+            centroids = offsets = None
+            if lists:
+                centroids = _kmeans(source.vectors[rows], lists)
+                for block in _blocks(slice(0, len(rows)), SIMILAR_BLOCK_ROWS):
+                    assign[block] = np.argmax(source.vectors[rows[block]] @ centroids.T, axis=1)
+            order = rows[np.argsort(assign, kind="stable")]
+            cursors = source.meta["cursors"] if cursors is None else cursors
+            state = self._new_generation(max(len(rows), MIN_CAPACITY), cursors)
+            for block in _blocks(slice(0, len(order)), SIMILAR_BLOCK_ROWS):
+                picked = order[block]
+                for name in ARRAYS:
+                    getattr(state, name)[block] = getattr(source, name)[picked]
+            if lists:
+                offsets = np.searchsorted(np.sort(assign), np.arange(lists + 1)).astype(np.int64)
+                centroids.astype(np.float32).tofile(self._path(f"g{state.meta['generation']}", "centroids"))
+                offsets.tofile(self._path(f"g{state.meta['generation']}", "offsets"))
+                state.centroids, state.offsets = centroids, offsets
+            state.meta = {**state.meta, "count": len(rows), "clustered": len(rows) if lists else 0, "lists": lists}
+            staging = source is not self._state
+            self._swap(state)
+            self._index_positions(state)
+            if staging:
+                shutil.rmtree(self._path(f"g{source.meta['generation']}"), ignore_errors=True)
+
+    def staging(self, cursors: dict[str, int]) -> _State:
+        """An empty generation to bulk-load with `load_rows`; `compact(staging)` makes it current."""
+        return self._new_generation(MIN_CAPACITY, cursors)
+
+    def load_rows(self, state: _State, rows: list) -> _State:
+        return self._append(state, rows)
+
+    # queries
+
+    def _candidates(self, state: _State, vector: np.ndarray, user_id: Optional[int]):
+        if user_id is not None:
+            return [np.flatnonzero(state.users[:state.count] == user_id)]
+        if state.centroids is None:
+            return [slice(0, state.count)]
+        nprobe = min(SIMILAR_NPROBE, len(state.centroids))
+        probed = np.argpartition(state.centroids @ vector, -nprobe)[-nprobe:]
+        ranges = [slice(int(state.offsets[l]), int(state.offsets[l + 1])) for l in np.sort(probed)]
+        return ranges + [slice(state.clustered, state.count)]
+
+    def search(self, vector: np.ndarray, k: int, user_id: Optional[int] = None, type: Optional[str] = None,
+               exclude: Optional[int] = None) -> list[tuple[int, float]]:
+        """Top-k (id, cosine) for `vector`, optionally only one user's or one type's interviews."""
+        state = self.current()
+        if state is None or not state.count:
+            return []
+        type_code = _type_code(type) if type is not None else None
+        found_ids, found_scores = [], []
+        for candidates in self._candidates(state, vector, user_id):
+            for rows in _blocks(candidates, SIMILAR_BLOCK_ROWS):
+                scores = state.vectors[rows] @ vector
+                keep = state.users[rows] != DEAD
+                if type_code is not None:
+                    keep &= state.types[rows] == type_code
+                if exclude is not None:
+                    keep &= state.ids[rows] != exclude
+                scores = np.where(keep, scores, -np.inf)
+                if len(scores) > k:
+                    top = np.argpartition(scores, -k)[-k:]
+                    scores, ids = scores[top], state.ids[rows][top]
+                else:
+                    ids = state.ids[rows]
+                found_ids.append(np.asarray(ids))
+                found_scores.append(scores)
+        if not found_ids:
+            return []
+        ids, scores = np.concatenate(found_ids), np.concatenate(found_scores)
+        order = np.argsort(-scores, kind="stable")[:k]
+        return [(int(ids[i]), float(scores[i])) for i in order if scores[i] > -np.inf]
+
+    def stats(self) -> dict:
+        state = self.current()
+        if state is None:
+            return {"rows": 0}
+        meta = state.meta
+        return {"rows": meta["count"], "dead": meta["dead"], "clustered": meta["clustered"],
+                "lists": meta["lists"], "cursors": meta["cursors"], "generation": meta["generation"]}
+
+
+# -- sync ------------------------------------------------------------------
+
+def _entry(interview, dim: int) -> tuple:
+    return interview.id, interview.user_id, _type_code(interview.type), vectorize(interview, dim)
+
+
+def sync(feeds: dict[str, Session], vector_index: VectorIndex, batch_size: int = SIMILAR_SYNC_BATCH) -> int:
+    """Apply the next batch of every database's change feed; returns interviews processed (0 when caught up)."""
+    state = vector_index.current()
+    for feed, db in feeds.items():
+        cursor = state.meta["cursors"].get(feed) if state is not None else None
+        if cursor is None or cursor < sequences.current_value(db, sequences.INTERVIEW_CHANGES_PURGED):
+            rebuild(feeds, vector_index) # a feed no longer holds every change since its cursor
+            return 1
+    return sum(_sync_feed(db, vector_index, feed, state.meta["cursors"][feed], batch_size)
+               for feed, db in feeds.items())
+
+
+def _sync_feed(db: Session, vector_index: VectorIndex, feed: str, cursor: int, batch_size: int) -> int:
+    i = models.Interview
+    q = select(i).where(i.change_seq > cursor).order_by(i.change_seq, i.id)
+    rows = db.execute(q.limit(batch_size)).scalars().all()
+    if not rows:
+        return 0
+    if len(rows) == batch_size:
+        # never stop inside a group of rows sharing one change_seq (a batch update)
+        rows += db.execute(q.where(i.change_seq == rows[-1].change_seq, i.id > rows[-1].id)).scalars().all()
+    latest = {row.id: row for row in rows}
+    upserts = [_entry(row, vector_index.dim) for row in latest.values() if row.deleted_at is None]
+    removals = [row.id for row in latest.values() if row.deleted_at is not None]
+    vector_index.apply(upserts, removals, rows[-1].change_seq, feed)
+    return len(rows)
+
+
+def _all_interviews(db: Session, batch_size: int):
+    from app.services import archive
+
+    i = models.Interview
+    yield from db.execute(select(i).where(live(i)).order_by(i.id).execution_options(yield_per=batch_size)).scalars()
+    payloads = db.execute(select(models.InterviewArchive.payload).order_by(models.InterviewArchive.id)
+                          .execution_options(yield_per=batch_size)).scalars()
+    for payload in payloads:
+        # transient, like archive.get_archived's rows
+        yield models.Interview(**archive.decode_row(payload))
+
+
+def rebuild(feeds: dict[str, Session], vector_index: VectorIndex, batch_size: int = SIMILAR_SYNC_BATCH) -> int:
+    """Re-index every live and archived interview of every database; returns the row count."""
+    # changes committed during the scan are replayed from these cursors, which is idempotent
+    cursors = {feed: sequences.current_value(db, sequences.INTERVIEW_CHANGES) for feed, db in feeds.items()}
+    state = vector_index.staging(cursors)
+    interviews = itertools.chain.from_iterable(_all_interviews(db, batch_size) for db in feeds.values())
+    entries = (_entry(interview, vector_index.dim) for interview in interviews)
+    while batch := list(itertools.islice(entries, batch_size)):
+        state = vector_index.load_rows(state, batch)
+    vector_index.compact(state, cursors)
+    logger.info("similar index rebuilt: {} interviews", state.count)
+    return state.count
+
+
+index: Optional[VectorIndex] = None
+
+
+def find_similar(db: Session, interview, limit: int, user_id: Optional[int] = None,
+                 type: Optional[str] = None) -> list[tuple[int, float]]:
+    """(id, score) of the interviews most like `interview`, best first."""
+    if index is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Similar-interview search is disabled")
+    if index.current() is None:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Similar-interview index is being built")
+    return index.search(vectorize(interview, index.dim), limit, user_id=user_id, type=type, exclude=interview.id)
+
+
+def rank(interview, hits: list[tuple[int, float]], rows: Iterable, viewer_id: Optional[int],
+         limit: int) -> list[dict]:
+    """Results for GET /interviews/{id}/similar: hits still present in `rows`, minus `interview`'s duplicates."""
+    found = {row.id: row for row in rows}
+    canonical = interview.duplicate_of or interview.id
+    results = []
+    for hit_id, score in hits:
+        row = found.get(hit_id) # gone if deleted since the index last synced
+        if row is None or (getattr(row, "duplicate_of", None) or row.id) == canonical:
+            continue
+        result = {"score": round(score, 4), "company": row.company, "role": row.role, "type": row.type,
+                  "starts_at": row.starts_at}
+        if viewer_id is None or row.user_id == viewer_id:
+            result.update(id=row.id, user_id=row.user_id)
+        results.append(result)
+        if len(results) == limit:
+            break
+    return results
+
+
+def _open(stack: ExitStack, session_factories: dict[str, Callable[[], Session]]) -> dict[str, Session]:
+    return {feed: stack.enter_context(factory()) for feed, factory in session_factories.items()}
+
+
+def make_similar_job(session_factories: dict[str, Callable[[], Session]]) -> PeriodicJob:
+    """The writer job, fed by every database in `session_factories` (feed name -> sessionmaker)."""
+    global index
+    index = VectorIndex()
+    index.current()
+
+    def step() -> int:
+        # workers that lose the writer lock only read; they retry in case the writer exits
+        if not index.acquire_writer():
+            return 0
+        with ExitStack() as stack:
+            processed = sync(_open(stack, session_factories), index)
+        if not processed and index.needs_compaction():
+            index.compact()
+        return processed
+
+    return PeriodicJob("similar-index", step, interval=SIMILAR_SYNC_INTERVAL)
+
+
+def main(argv=None) -> None:
+    from app.db import session as db_session
+
+    parser = argparse.ArgumentParser(description="Maintain the similar-interview index")
+    parser.add_argument("command", choices=("rebuild", "compact", "stats"))
+    args = parser.parse_args(argv)
+    vector_index = VectorIndex()
+    if args.command != "stats" and not vector_index.acquire_writer():
+        parser.error(f"another process is writing {SIMILAR_INDEX_DIR}")
+    if args.command == "rebuild":
+        shards = db_session.shard_router
+        session_factories = shards.sessionmakers if shards is not None else {MAIN: db_session.SessionLocal}
+        with ExitStack() as stack:
+            rebuild(_open(stack, session_factories), vector_index)
+    elif args.command == "compact":
+        vector_index.compact()
+    print(vector_index.stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,35 +1,63 @@
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from sqlalchemy import func, literal, null, select, union_all, update
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
+from app.core.security import forget_google_sub
 from app.db import models
+from app.db.queries import fetch_by_ids, live
 from app.schemas import UserCreate, UserUpdate
+from app.services import interviews as interview_service
 
-def create_user(db: Session, data: UserCreate) -> models.User:
-    existing_user = db.query(models.User).filter(models.User.email == data.email).first()
-    if existing_user:
+def create_user(db: Session, data: UserCreate, user_id: int | None = None) -> models.User:
+    # user_id is only passed in sharded mode, where ids come from the global directory
+    if get_user_by_email(db, data.email):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="User already exists")
-    user = models.User(**data.model_dump())
+    user = models.User(id=user_id, **data.model_dump())
     db.add(user)
     db.commit()
     db.refresh(user)
     return user
 
 def get_user(db: Session, user_id: int) -> models.User:
-    user = db.query(models.User).filter(models.User.id == user_id).first()
+    user = db.query(models.User).filter(models.User.id == user_id, live(models.User)).first()
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
     return user
 
-def get_user_by_email(db: Session, email: str) -> models.User | None:
-    return db.query(models.User).filter(models.User.email == email).first()
+def get_users(db: Session, user_ids: list[int]) -> tuple[list[models.User], list[int]]:
+    return fetch_by_ids(db.query(models.User).filter(live(models.User)), models.User, user_ids)
+
+def list_users(
+        db: Session, email: str | None, exact_email: bool, limit: int, offset: int
+) -> list[models.User]:
+    q = db.query(models.User).filter(live(models.User))
+    if email:
+        if exact_email:
+            q = q.filter(models.User.email == email)
+        else:
+            q = q.filter(models.User.email_lower == email.lower())
+    return q.order_by(models.User.id.desc()).offset(offset).limit(limit).all()
+
+def get_user_by_email(db: Session, email: str, exact: bool = False) -> models.User | None:
+    # case-insensitive by default; exact=True keeps the old byte-for-byte match
+    q = db.query(models.User).filter(live(models.User))
+    if exact:
+        return q.filter(models.User.email == email).first()
+    return q.filter(models.User.email_lower == email.lower()).first()
 
 def update_user(db: Session, user_id: int, data: UserUpdate) -> models.User:
     user = get_user(db, user_id)
     patch = data.model_dump(exclude_unset=True)
     if "email" in patch:
         # enforce unique email
-        q = db.query(models.User).filter(models.User.email == patch["email"], models.User.id != user_id)
+        q = db.query(models.User).filter(
+            models.User.email_lower == patch["email"].lower(), models.User.id != user_id, live(models.User)
+        )
         if db.query(q.exists()).scalar():
             raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Email already exists")
+    if "google_sub" in patch and patch["google_sub"] != user.google_sub:
+        forget_google_sub(user.google_sub)
     for k, v in patch.items():
         setattr(user, k, v)
     db.commit()
@@ -37,6 +65,62 @@ def update_user(db: Session, user_id: int, data: UserUpdate) -> models.User:
     return user
 
 def delete_user(db: Session, user_id: int) -> None:
+    # soft delete: tombstones for the user and their live interviews; the compactor purges them later
+    deleted_at = datetime.now(timezone.utc)
+    stmt = (update(models.User)
+            .where(models.User.id == user_id, live(models.User))
+            .values(deleted_at=deleted_at)
+            .returning(models.User.google_sub)
+            .execution_options(synchronize_session=False))
+    deleted = db.execute(stmt).first()
+    if deleted is None:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    # same transaction: a purged user never leaves live interviews behind
+    interview_ids, change_seq = interview_service.tombstone_user_interviews(db, user_id, deleted_at)
+    db.commit()
+    forget_google_sub(deleted.google_sub)
+    interview_service.interviews_deleted(db, user_id, interview_ids, change_seq)
+
+DASHBOARD_FIELDS = ("id", "user_id", "company", "role", "type", "source", "starts_at", "created_at")
+
+def get_dashboard(db: Session, user_id: int, upcoming: int, recent: int) -> dict:
+    """User, next/last interviews and per-type counts in two statements.
+
+    The user row is one query; the three interview parts are one UNION ALL,
+    each branch served by a partial index on (user_id, starts_at) or (user_id, type).
+    """
     user = get_user(db, user_id)
-    db.delete(user)
-    db.commit()
\ No newline at end of file
+    i = models.Interview
+    now = datetime.now(timezone.utc)
+    columns = [getattr(i, field) for field in DASHBOARD_FIELDS]
+    mine = (i.user_id == user_id, live(i))
+
+    def part(kind: str, query):
+        # sqlite only allows ORDER BY/LIMIT in a compound select's members through a subquery
+        sub = query.subquery()
+        return select(literal(kind).label("kind"), *sub.c)
+
+    parts = [
+        part("upcoming", select(*columns, literal(None).label("n"))
+             .where(*mine, i.starts_at >= now).order_by(i.starts_at).limit(upcoming)),
+        part("recent", select(*columns, literal(None).label("n"))
+             .where(*mine, i.starts_at < now).order_by(i.starts_at.desc()).limit(recent)),
+        part("count", select(*(i.type if field == "type" else null() for field in DASHBOARD_FIELDS),
+                             func.count().label("n"))
+             .where(*mine).group_by(i.type)),
+    ]
+    rows = db.execute(union_all(*parts)).all()
+
+    dashboard = {"user": user, "upcoming": [], "recent": [], "counts_by_type": {}, "total": 0}
+    for row in rows:
+        if row.kind == "count":
+            dashboard["total"] += row.n
+            if row.type is not None:
+                dashboard["counts_by_type"][row.type] = row.n
+        else:
+            dashboard[row.kind].append(SimpleNamespace(**{field: getattr(row, field) for field in DASHBOARD_FIELDS}))
+    # UNION ALL does not promise to keep each member's order
+    dashboard["upcoming"].sort(key=lambda r: r.starts_at)
+    dashboard["recent"].sort(key=lambda r: r.starts_at, reverse=True)
+    return dashboard
@@ -0,0 +1,68 @@
+"""Concurrent single-row creates with and without group commit.
+
+    python bench/bench_group_commit.py --threads 32 --writes 2000
+
+Runs create_interview from many threads against a throwaway sqlite file and
+prints writes/s for plain per-call commits and for group commit.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, BACKEND_DIR)
+
+from app.db import group_commit  # noqa: E402
+from app.db.base import Base  # noqa: E402
+from app.schemas import InterviewCreate  # noqa: E402
+from app.services import interviews as interview_service  # noqa: E402
+
+
+def run(db_url: str, threads: int, writes: int) -> float:
+    engine = create_engine(db_url, connect_args={"check_same_thread": False, "timeout": 30},
+                           pool_size=threads, max_overflow=0)
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine, autoflush=False)
+
+    def create(i: int) -> None:
+        with factory() as db:
+            interview_service.create_interview(db, InterviewCreate(user_id=1, company=f"Company {i}"))
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(create, range(writes)))
+    elapsed = time.perf_counter() - start
+    engine.dispose()
+    return writes / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--writes", type=int, default=2000)
+    parser.add_argument("--max-batch", type=int, default=group_commit.GROUP_COMMIT_MAX_BATCH)
+    parser.add_argument("--max-delay", type=float, default=group_commit.GROUP_COMMIT_MAX_DELAY)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        group_commit.committer = None
+        plain = run(f"sqlite:///{os.path.join(tmp, 'plain.db')}", args.threads, args.writes)
+        group_commit.committer = group_commit.GroupCommitter(args.max_batch, args.max_delay)
+        try:
+            grouped = run(f"sqlite:///{os.path.join(tmp, 'grouped.db')}", args.threads, args.writes)
+        finally:
+            group_commit.committer.close()
+
+    print(f"{'mode':>12} {'writes/s':>10}")
+    print(f"{'per-call':>12} {plain:>10.1f}")
+    print(f"{'group':>12} {grouped:>10.1f} ({grouped / plain:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Bytes per interview row with text/JSON columns versus the compact encoding.
+
+    python bench/bench_row_size.py --rows 20000
+
+Fills two throwaway sqlite files with the same interviews, one with the old
+String/JSON columns and one with the current model (CodedEnum type/source
+and PackedJSON details), vacuums both and prints the table size per row and
+how many rows fit in one page.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+
+from sqlalchemy import JSON, Column, DateTime, Integer, MetaData, String, Table, create_engine, insert, text
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, BACKEND_DIR)
+
+from app.db import models  # noqa: E402
+from app.db.types import msgpack  # noqa: E402
+
+legacy = Table(
+    "interviews", MetaData(),
+    Column("id", Integer, primary_key=True),
+    Column("user_id", Integer, nullable=False),
+    Column("company", String), Column("role", String),
+    Column("type", String), Column("source", String),
+    Column("starts_at", DateTime(timezone=True)),
+    Column("details", JSON),
+)
+
+WORDS = "recruiter screen onsite loop system design coding round behavioural panel follow up notes".split()
+
+
+def make_rows(count: int) -> list[dict]:
+    rng = random.Random(42)
+    rows = []
+    for i in range(count):
+        details = None
+        if rng.random() < 0.8:
+            details = {
+                "location": rng.choice(["Zoom", "Google Meet", "On-site"]),
+                "interviewers": [f"Interviewer {rng.randint(1, 500)}" for _ in range(rng.randint(1, 3))],
+                "notes": " ".join(rng.choice(WORDS) for _ in range(rng.randint(5, 120))),
+                "round": rng.randint(1, 5),
+            }
+        rows.append({
+            "user_id": rng.randint(1, 1000), "company": f"Company {rng.randint(1, 2000)}",
+            "role": rng.choice(["SWE", "Backend Engineer", "Data Scientist"]),
+            "type": rng.choice(list(models.INTERVIEW_TYPE_CODES)),
+            "source": rng.choice(list(models.INTERVIEW_SOURCE_CODES)),
+            "details": details,
+        })
+    return rows
+
+
+def table_bytes(table: Table, rows: list[dict]) -> tuple[int, int]:
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    engine = create_engine(f"sqlite:///{path}")
+    try:
+        table.create(engine)
+        with engine.begin() as conn:
+            conn.execute(insert(table), rows)
+        with engine.connect() as conn:
+            conn.execute(text("VACUUM"))
+            page_size = conn.execute(text("PRAGMA page_size")).scalar()
+            try: # the dbstat table counts this table's pages only, when sqlite has it
+                size = conn.execute(text("SELECT sum(pgsize) FROM dbstat WHERE name = 'interviews'")).scalar()
+            except Exception:
+                size = conn.execute(text("PRAGMA page_count")).scalar() * page_size
+        return size, page_size
+    finally:
+        engine.dispose()
+        os.remove(path)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=20000)
+    args = parser.parse_args()
+    rows = make_rows(args.rows)
+
+    print(f"{args.rows} rows, details as {'msgpack' if msgpack else 'JSON'} (+ zlib above threshold)")
+    results = {}
+    for name, table in (("text/JSON", legacy), ("compact", models.Interview.__table__)):
+        size, page_size = table_bytes(table, rows)
+        results[name] = size / args.rows
+        print(f"{name:>10}: {size / args.rows:7.1f} bytes/row, {page_size * args.rows / size:5.1f} rows/page")
+    print(f"compact rows are {results['compact'] / results['text/JSON']:.0%} of the text/JSON size")
+
+
+if __name__ == "__main__":
+    main()
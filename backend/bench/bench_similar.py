@@ -0,0 +1,95 @@
+"""Query latency and recall of the similar-interview index.
+
+    python bench/bench_similar.py --rows 1000000
+
+Vectorizes synthetic interviews into a throwaway index directory, compacts
+it (k-means lists), then times unfiltered, type-filtered and user-filtered
+top-10 queries and measures recall@10 of the probed lists against an exact
+scan of every row.
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, BACKEND_DIR)
+
+from app.db import models  # noqa: E402
+from app.services import similar  # noqa: E402
+
+COMPANIES = [f"{a}{b}" for a in ("Acme", "Globex", "Initech", "Umbrella", "Hooli", "Stark", "Wayne", "Wonka",
+                                 "Tyrell", "Cyberdyne") for b in ("", " Labs", " Systems", " AI", " Inc")]
+ROLES = ["Software Engineer", "Senior Backend Engineer", "Frontend Developer", "Data Scientist", "SRE",
+         "Machine Learning Engineer", "Engineering Manager", "Mobile Developer"]
+WORDS = ("system design caching queues sharding recursion graphs dynamic programming react hooks sql joins "
+         "indexes behavioural conflict leadership ownership kubernetes latency tradeoffs api rate limiting").split()
+
+
+def make_interview(rng: random.Random, interview_id: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=interview_id, user_id=rng.randint(1, 50000), company=rng.choice(COMPANIES), role=rng.choice(ROLES),
+        type=rng.choice(list(models.INTERVIEW_TYPE_CODES)),
+        details={"notes": " ".join(rng.choice(WORDS) for _ in range(rng.randint(0, 30)))},
+    )
+
+
+def timed(fn, queries) -> list[float]:
+    times = []
+    for query in queries:
+        started = time.perf_counter()
+        fn(query)
+        times.append((time.perf_counter() - started) * 1000)
+    return sorted(times)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+    rng = random.Random(7)
+    root = tempfile.mkdtemp(prefix="similar-")
+    try:
+        index = similar.VectorIndex(root)
+        index.acquire_writer()
+        started = time.perf_counter()
+        state = index.staging({})
+        for start in range(0, args.rows, 10000):
+            batch = [make_interview(rng, i) for i in range(start + 1, min(start + 10000, args.rows) + 1)]
+            state = index.load_rows(state, [(i.id, i.user_id, similar._type_code(i.type), similar.vectorize(i))
+                                            for i in batch])
+        loaded = time.perf_counter()
+        index.compact(state, {})
+        print(f"{args.rows} rows, dim {index.dim}: vectorized in {loaded - started:.0f}s, "
+              f"compacted in {time.perf_counter() - loaded:.0f}s, {index.stats()}")
+
+        queries = [make_interview(rng, 0) for _ in range(args.queries)]
+        vectors = [similar.vectorize(q) for q in queries]
+        for name, fn in (
+            ("all users", lambda v: index.search(v, 10)),
+            ("type=coding", lambda v: index.search(v, 10, type="coding")),
+            ("one user", lambda v: index.search(v, 10, user_id=rng.randint(1, 50000))),
+        ):
+            times = timed(fn, vectors)
+            print(f"{name:>12}: p50 {times[len(times) // 2]:6.2f} ms, p99 {times[int(len(times) * 0.99)]:6.2f} ms")
+
+        state = index.current()
+        hits = 0
+        for vector in vectors[:50]:
+            exact = np.argpartition(state.vectors[:state.count] @ vector, -10)[-10:]
+            found = {hit_id for hit_id, _ in index.search(vector, 10)}
+            hits += len(found & set(state.ids[exact].tolist()))
+        print(f"recall@10 with nprobe={similar.SIMILAR_NPROBE}: {hits / (50 * 10):.2f}")
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Throughput of the production server from 1 to N workers.
+
+    python bench/bench_workers.py --max-workers 4 --duration 10
+
+Starts `python -m app.server` against a throwaway sqlite database for each
+worker count, drives it with a pool of client threads and prints requests/s.
+"""
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import httpx
+from sqlalchemy import create_engine
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, BACKEND_DIR)
+
+from app.db import models  # noqa: E402
+from app.db.base import Base  # noqa: E402
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def seed(db_url: str, rows: int) -> None:
+    engine = create_engine(db_url)
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(models.Interview.__table__.insert(), [
+            {"user_id": 1, "company": f"Company {i}", "role": "Engineer", "type": "coding"}
+            for i in range(rows)
+        ])
+    engine.dispose()
+
+
+def wait_until_up(base_url: str, timeout: float = 20.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{base_url}/health").status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("server did not come up")
+
+
+def drive(base_url: str, clients: int, duration: float) -> float:
+    done = [0] * clients
+    stop = time.monotonic() + duration
+
+    def run(slot: int) -> None:
+        with httpx.Client(base_url=base_url) as client:
+            while time.monotonic() < stop:
+                client.get("/api/v1/interviews", params={"user_id": 1, "limit": 20, "offset": 0})
+                done[slot] += 1
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(clients)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return sum(done) / duration
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--rows", type=int, default=1000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        seed(db_url, args.rows)
+
+        baseline = None
+        print(f"{'workers':>7} {'req/s':>10} {'speedup':>8}")
+        for workers in range(1, args.max_workers + 1):
+            port = free_port()
+            proc = subprocess.Popen(
+                [sys.executable, "-m", "app.server", "--bind", f"127.0.0.1:{port}",
+                 "--workers", str(workers)],
+                cwd=BACKEND_DIR,
+                env={**os.environ, "DATABASE_URL": db_url},
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            )
+            try:
+                base_url = f"http://127.0.0.1:{port}"
+                wait_until_up(base_url)
+                rps = drive(base_url, args.clients, args.duration)
+            finally:
+                proc.terminate()
+                proc.wait()
+            baseline = baseline or rps
+            print(f"{workers:>7} {rps:>10.1f} {rps / baseline:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,9 +2,13 @@
 import sys, os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 import tempfile
+
+# background jobs would otherwise run against the real DATABASE_URL
+os.environ.setdefault("COMPACTOR_ENABLED", "false")
+os.environ.setdefault("ARCHIVER_ENABLED", "false")
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 
 # Adjust imports to your project structure:
@@ -13,7 +17,7 @@ from sqlalchemy.orm import sessionmaker
 # - app is your FastAPI instance
 from app.db import models  # Import models to register table definitions  
 from app.db.base import Base   # you mentioned base.py exists
-from app.db.session import get_db
+from app.db.session import get_db, instrument_engine
 from app.main import app
 
 @pytest.fixture(scope="session")
@@ -32,6 +36,7 @@ def db_file():
 @pytest.fixture(scope="session")
 def engine(db_file):
     engine = create_engine(f"sqlite:///{db_file}", connect_args={"check_same_thread": False})
+    instrument_engine(engine) # as on the app's engine
     Base.metadata.create_all(bind=engine)
     yield engine
     engine.dispose()
@@ -46,16 +51,16 @@ def _clean_tables(engine):
     # Clear all data from tables before each test
     with engine.connect() as conn:
         # Delete in reverse dependency order (interviews first, then users)
-        conn.execute(Base.metadata.tables['interviews'].delete())
-        conn.execute(Base.metadata.tables['users'].delete())
+        for table in reversed(Base.metadata.sorted_tables):
+            conn.execute(table.delete())
         conn.commit()
     
     yield  # Run the test
     
     # Clean after test too (though before should be sufficient)
     with engine.connect() as conn:
-        conn.execute(Base.metadata.tables['interviews'].delete())
-        conn.execute(Base.metadata.tables['users'].delete())
+        for table in reversed(Base.metadata.sorted_tables):
+            conn.execute(table.delete())
         conn.commit()
 
 @pytest.fixture(scope="function")
@@ -72,3 +77,13 @@ def client(TestingSessionLocal):
     with TestClient(app) as c:
         yield c
     app.dependency_overrides.clear()
+
+@pytest.fixture(scope="function")
+def sql_statements(engine):
+    # every SQL statement sent to the test database while the test runs
+    statements = []
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    event.listen(engine, "before_cursor_execute", _record)
+    yield statements
+    event.remove(engine, "before_cursor_execute", _record)
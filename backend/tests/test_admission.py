@@ -0,0 +1,112 @@
+from http import HTTPStatus
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import admission, security
+from app.core.admission import AdmissionMiddleware, TokenBucket
+from app.main import app
+
+
+@pytest.fixture(autouse=True)
+def signing_keys(monkeypatch):
+    monkeypatch.setenv("AUTH_HMAC_KEYS", "k1:admission-secret")
+    security._keyset_cache.clear()
+    security._claims_cache.clear()
+    monkeypatch.setattr(admission, "metrics", admission.Metrics())
+    yield
+    security._keyset_cache.clear()
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def limited_client(client, **limits):
+    # `client` has already installed the get_db override
+    clock = FakeClock()
+    middleware = AdmissionMiddleware(app, clock=clock, **{
+        "read_rate": 1, "read_burst": 3, "write_rate": 1, "write_burst": 2, **limits})
+    return TestClient(middleware), clock
+
+
+def bearer(**claims):
+    return {"Authorization": f"Bearer {security.issue_token(claims)}"}
+
+
+class TestTokenBucket:
+    """Test token bucket refill arithmetic"""
+
+    def test_burst_then_refill(self):
+        bucket = TokenBucket(rate=2, burst=2, now=0)
+        assert bucket.take(0) == 0 and bucket.take(0) == 0
+        assert bucket.take(0) == pytest.approx(0.5)
+        assert bucket.take(0.5) == 0
+
+
+class TestAdmission:
+    """Test per-client rate limits and load shedding"""
+
+    def test_reads_throttled_with_retry_after(self, client):
+        limited, clock = limited_client(client)
+        statuses = [limited.get("/api/v1/interviews?user_id=1").status_code for _ in range(4)]
+        assert statuses == [HTTPStatus.OK] * 3 + [HTTPStatus.TOO_MANY_REQUESTS]
+        response = limited.get("/api/v1/interviews?user_id=1")
+        assert response.headers["retry-after"] == "1"
+
+        clock.now += 1
+        assert limited.get("/api/v1/interviews?user_id=1").status_code == HTTPStatus.OK
+
+    def test_read_and_write_budgets_are_separate(self, client):
+        limited, _ = limited_client(client)
+        for _ in range(3):
+            limited.get("/api/v1/interviews?user_id=1")
+        assert limited.post("/api/v1/interviews", json={"user_id": 1}).status_code == HTTPStatus.CREATED
+        assert limited.post("/api/v1/interviews", json={"user_id": 1}).status_code == HTTPStatus.CREATED
+        assert limited.post("/api/v1/interviews", json={"user_id": 1}).status_code == HTTPStatus.TOO_MANY_REQUESTS
+
+    def test_clients_are_limited_independently(self, client):
+        limited, _ = limited_client(client, read_burst=1)
+        noisy, quiet = bearer(uid=1), bearer(uid=2)
+        limited.get("/api/v1/interviews", headers=noisy)
+        assert limited.get("/api/v1/interviews", headers=noisy).status_code == HTTPStatus.TOO_MANY_REQUESTS
+        assert limited.get("/api/v1/interviews", headers=quiet).status_code == HTTPStatus.OK
+        assert limited.get("/health").status_code == HTTPStatus.OK
+
+    def test_overload_sheds_with_503(self, client):
+        limited, _ = limited_client(client, max_in_flight=0)
+        response = limited.get("/api/v1/interviews?user_id=1")
+        assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+        assert response.headers["retry-after"] == "1"
+
+    def test_shed_requests_keep_their_tokens(self, client):
+        """Test load shedding refunds the rate-limit token it took"""
+        limited, _ = limited_client(client, read_burst=1)
+        limited.app.max_in_flight = 0
+        for _ in range(3):
+            assert limited.get("/api/v1/interviews?user_id=1").status_code == HTTPStatus.SERVICE_UNAVAILABLE
+        limited.app.max_in_flight = 1
+        assert limited.get("/api/v1/interviews?user_id=1").status_code == HTTPStatus.OK
+
+
+class TestAdminMetrics:
+    """Test the admin metrics endpoint"""
+
+    def test_requires_admin_token(self, client):
+        assert client.get("/api/v1/admin/metrics").status_code == HTTPStatus.UNAUTHORIZED
+        response = client.get("/api/v1/admin/metrics", headers=bearer(uid=1))
+        assert response.status_code == HTTPStatus.FORBIDDEN
+
+    def test_reports_throttling(self, client):
+        limited, _ = limited_client(client, read_burst=1)
+        limited.get("/api/v1/interviews?user_id=1")
+        limited.get("/api/v1/interviews?user_id=1")
+
+        response = client.get("/api/v1/admin/metrics", headers=bearer(uid=1, admin=True))
+        assert response.status_code == HTTPStatus.OK
+        counts = response.json()["admission"]
+        assert counts["admitted_read"] == 1 and counts["throttled_read"] == 1
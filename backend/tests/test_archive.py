@@ -0,0 +1,103 @@
+from datetime import datetime, timedelta, timezone
+from http import HTTPStatus
+
+from app.db import models
+from app.services.archive import archive_interviews
+from app.services.compaction import purge_tombstones
+
+
+def create(client, days_ago, **fields):
+    starts_at = (datetime.now(timezone.utc) - timedelta(days=days_ago)).isoformat()
+    payload = {"user_id": 1, "company": "Acme", "starts_at": starts_at, **fields}
+    return client.post("/api/v1/interviews", json=payload).json()["id"]
+
+
+class TestArchival:
+    """Test moving old interviews to cold storage"""
+
+    def test_archive_in_batches(self, client, TestingSessionLocal):
+        """Test old interviews move in batches and recent ones stay hot"""
+        old = [create(client, days_ago=400) for _ in range(3)]
+        recent = create(client, days_ago=1)
+
+        with TestingSessionLocal() as db:
+            assert archive_interviews(db, batch_size=2, older_than=timedelta(days=180)) == 2
+            assert archive_interviews(db, batch_size=2, older_than=timedelta(days=180)) == 1
+            assert archive_interviews(db, batch_size=2, older_than=timedelta(days=180)) == 0
+            assert [i.id for i in db.query(models.Interview)] == [recent]
+            assert sorted(a.id for a in db.query(models.InterviewArchive)) == old
+
+    def test_archived_interview_reads_transparently(self, client, TestingSessionLocal):
+        """Test GET by id falls back to the archive, with the full row intact"""
+        interview_id = create(client, days_ago=400, role="SWE", details={"notes": "x" * 2000})
+        before = client.get(f"/api/v1/interviews/{interview_id}").json()
+        create(client, days_ago=1)
+
+        with TestingSessionLocal() as db:
+            archive_interviews(db, older_than=timedelta(days=180))
+            assert db.get(models.Interview, interview_id) is None
+
+        response = client.get(f"/api/v1/interviews/{interview_id}")
+        assert response.status_code == HTTPStatus.OK
+        assert response.json() == before
+
+        # archived interviews are read-only
+        response = client.patch(f"/api/v1/interviews/{interview_id}", json={"role": "PM"})
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_list_include_archived(self, client, TestingSessionLocal):
+        """Test listings hide archived rows unless include_archived is set"""
+        old = [create(client, days_ago=400) for _ in range(2)]
+        recent = [create(client, days_ago=1) for _ in range(2)]
+        with TestingSessionLocal() as db:
+            archive_interviews(db, older_than=timedelta(days=180))
+
+        hot = client.get("/api/v1/interviews", params={"user_id": 1}).json()
+        assert [i["id"] for i in hot] == recent[::-1]
+
+        params = {"user_id": 1, "include_archived": True}
+        everything = client.get("/api/v1/interviews", params=params).json()
+        assert [i["id"] for i in everything] == (old + recent)[::-1]
+
+        page = client.get("/api/v1/interviews", params={**params, "limit": 2, "offset": 1}).json()
+        assert [i["id"] for i in page] == [recent[0], old[1]]
+
+    def test_ids_not_reused(self, client, TestingSessionLocal):
+        """Test archiving the newest interview never frees its id for the next insert"""
+        archived = create(client, days_ago=400)
+        with TestingSessionLocal() as db:
+            assert archive_interviews(db, older_than=timedelta(days=180)) == 1
+        assert create(client, days_ago=1) > archived
+
+    def test_delete_archived_interview(self, client, TestingSessionLocal):
+        """Test DELETE removes an archived interview for good"""
+        interview_id = create(client, days_ago=400)
+        with TestingSessionLocal() as db:
+            archive_interviews(db, older_than=timedelta(days=180))
+
+        assert client.delete(f"/api/v1/interviews/{interview_id}").status_code == HTTPStatus.NO_CONTENT
+        assert client.get(f"/api/v1/interviews/{interview_id}").status_code == HTTPStatus.NOT_FOUND
+        assert client.delete(f"/api/v1/interviews/{interview_id}").status_code == HTTPStatus.NOT_FOUND
+        with TestingSessionLocal() as db:
+            assert db.query(models.InterviewArchive).count() == 0
+
+    def test_deleted_user_takes_archive_along(self, client, TestingSessionLocal):
+        """Test a deleted user's archived interviews disappear, and are purged before the user"""
+        user = client.post("/api/v1/users", json={"email": "archived@example.com"}).json()
+        interview_id = create(client, days_ago=400, user_id=user["id"])
+        other = create(client, days_ago=400, user_id=user["id"] + 1)
+        with TestingSessionLocal() as db:
+            archive_interviews(db, older_than=timedelta(days=180))
+        client.delete(f"/api/v1/users/{user['id']}")
+
+        assert client.get(f"/api/v1/interviews/{interview_id}").status_code == HTTPStatus.NOT_FOUND
+        params = {"user_id": user["id"], "include_archived": True}
+        assert client.get("/api/v1/interviews", params=params).json() == []
+        assert client.get(f"/api/v1/interviews/{other}").status_code == HTTPStatus.OK
+
+        with TestingSessionLocal() as db:
+            # the user waits until their archived interviews are gone
+            assert purge_tombstones(db, models.User, retention=timedelta(0)) == 0
+            assert purge_tombstones(db, models.InterviewArchive, retention=timedelta(0)) == 1
+            assert purge_tombstones(db, models.User, retention=timedelta(0)) == 1
+            assert [a.id for a in db.query(models.InterviewArchive)] == [other]
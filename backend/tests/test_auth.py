@@ -0,0 +1,121 @@
+import hashlib
+import hmac
+import json
+import time
+import pytest
+from http import HTTPStatus
+
+from app.core import security
+
+
+@pytest.fixture(autouse=True)
+def signing_keys(monkeypatch):
+    monkeypatch.setenv("AUTH_HMAC_KEYS", "k1:first-secret,k2:second-secret")
+    security._keyset_cache.clear()
+    security._claims_cache.clear()
+    security._user_id_cache.clear()
+    yield
+    security._keyset_cache.clear()
+
+
+@pytest.fixture
+def user(client):
+    return client.post("/api/v1/users", json={"email": "auth@example.com", "google_sub": "sub-123"}).json()
+
+
+def bearer(**claims):
+    return {"Authorization": f"Bearer {security.issue_token(claims)}"}
+
+
+class TestTokenAuth:
+    """Test bearer-token auth on the interview routes"""
+
+    def test_token_user_scopes_interviews(self, client, user):
+        """Test that the token's user is used when user_id is omitted"""
+        headers = bearer(sub="sub-123")
+        response = client.post("/api/v1/interviews", json={"user_id": user["id"], "company": "Acme"}, headers=headers)
+        assert response.status_code == HTTPStatus.CREATED
+        client.post("/api/v1/interviews", json={"user_id": user["id"] + 1, "company": "Other"})
+
+        response = client.get("/api/v1/interviews", headers=headers)
+        assert response.status_code == HTTPStatus.OK
+        assert [i["company"] for i in response.json()] == ["Acme"]
+
+    def test_steady_state_costs_no_auth_queries(self, client, user, sql_statements):
+        """Test cached claims and google_sub mapping avoid extra DB round trips"""
+        headers = bearer(sub="sub-123")
+        client.get("/api/v1/interviews", headers=headers)  # warms the caches
+
+        sql_statements.clear()
+        client.get("/api/v1/interviews", headers=headers)
+        assert len(sql_statements) == 1  # just the listing itself
+
+    def test_uid_claim_skips_lookup(self, client, user):
+        """Test that a uid claim resolves the user without a google_sub mapping"""
+        response = client.get("/api/v1/interviews", headers=bearer(uid=user["id"]))
+        assert response.status_code == HTTPStatus.OK
+
+    def test_rejects_other_users_id(self, client, user):
+        """Test a client-supplied user_id must match the token"""
+        headers = bearer(uid=user["id"])
+        response = client.post("/api/v1/interviews", json={"user_id": user["id"] + 1}, headers=headers)
+        assert response.status_code == HTTPStatus.FORBIDDEN
+
+        response = client.get(f"/api/v1/interviews?user_id={user['id'] + 1}", headers=headers)
+        assert response.status_code == HTTPStatus.FORBIDDEN
+
+    def test_dashboard_is_scoped_to_token(self, client, user):
+        """Test a user's dashboard is only readable with that user's token"""
+        other = client.post("/api/v1/users", json={"email": "other@example.com"}).json()
+        headers = bearer(uid=user["id"])
+        assert client.get(f"/api/v1/users/{user['id']}/dashboard", headers=headers).status_code == HTTPStatus.OK
+        response = client.get(f"/api/v1/users/{other['id']}/dashboard", headers=headers)
+        assert response.status_code == HTTPStatus.FORBIDDEN
+
+    def test_other_users_interview_is_not_found(self, client, user):
+        """Test that interviews of other users are invisible"""
+        interview_id = client.post("/api/v1/interviews", json={"user_id": user["id"] + 1}).json()["id"]
+        headers = bearer(uid=user["id"])
+        assert client.get(f"/api/v1/interviews/{interview_id}", headers=headers).status_code == HTTPStatus.NOT_FOUND
+        assert client.delete(f"/api/v1/interviews/{interview_id}", headers=headers).status_code == HTTPStatus.NOT_FOUND
+
+    def test_invalid_tokens(self, client, user):
+        """Test tampered, expired and unknown-subject tokens"""
+        token = security.issue_token({"uid": user["id"]})
+        tampered = token[:-2] + ("AA" if not token.endswith("AA") else "BB")
+        response = client.get("/api/v1/interviews", headers={"Authorization": f"Bearer {tampered}"})
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+        expired = security.issue_token({"uid": user["id"]}, ttl=-3600)
+        response = client.get("/api/v1/interviews", headers={"Authorization": f"Bearer {expired}"})
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+        response = client.get("/api/v1/interviews", headers=bearer(sub="nobody"))
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+    def test_ill_typed_tokens(self, client, user):
+        """Test validly signed tokens with non-object segments or ill-typed claims are a 401, not a 500"""
+        def signed(header, payload):
+            signing_input = ".".join(security._b64encode(json.dumps(part).encode()) for part in (header, payload))
+            signature = hmac.new(b"first-secret", signing_input.encode(), hashlib.sha256).digest()
+            return {"Authorization": f"Bearer {signing_input}.{security._b64encode(signature)}"}
+
+        header = {"alg": "HS256", "kid": "k1"}
+        exp = int(time.time()) + 3600
+        for token in (
+            signed(["HS256"], {"uid": user["id"], "exp": exp}),
+            signed({"alg": "HS256", "kid": ["k1"]}, {"uid": user["id"], "exp": exp}),
+            signed(header, [user["id"]]),
+            signed(header, {"uid": user["id"], "exp": "tomorrow"}),
+            signed(header, {"uid": str(user["id"]), "exp": exp}),
+            signed(header, {"uid": True, "exp": exp}),
+            signed(header, {"sub": 42, "exp": exp}),
+        ):
+            response = client.get("/api/v1/interviews", headers=token)
+            assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+    def test_rotated_key_still_verifies(self, client, user):
+        """Test tokens signed by any configured key are accepted"""
+        token = security.issue_token({"uid": user["id"]}, kid="k2")
+        response = client.get("/api/v1/interviews", headers={"Authorization": f"Bearer {token}"})
+        assert response.status_code == HTTPStatus.OK
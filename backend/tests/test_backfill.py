@@ -0,0 +1,61 @@
+from sqlalchemy import update
+
+from app.db import models
+from app.db.backfill import BACKFILLS, BackfillRunner, reset, status
+
+
+def runner(engine, **kwargs):
+    return BackfillRunner(engine, BACKFILLS["users.email_lower"], sleep=0, pause=lambda _: None, **kwargs)
+
+
+def seed_users(client, engine, count):
+    for i in range(count):
+        client.post("/api/v1/users", json={"email": f"User{i}@Example.com"})
+    # as if the column had just been added
+    with engine.begin() as conn:
+        conn.execute(update(models.User.__table__).values(email_lower=None))
+
+
+def lowered(TestingSessionLocal):
+    with TestingSessionLocal() as db:
+        return [u.email_lower for u in db.query(models.User).order_by(models.User.id)]
+
+
+class TestBackfillRunner:
+    """Test chunked, resumable backfills"""
+
+    def test_backfill_in_chunks(self, client, engine, TestingSessionLocal):
+        """Test every row is fixed and the checkpoint marks completion"""
+        seed_users(client, engine, 7)
+        assert runner(engine, batch_size=3, target_latency=1e-9).run() == 7
+        assert lowered(TestingSessionLocal) == [f"user{i}@example.com" for i in range(7)]
+
+        [checkpoint] = status(engine)
+        assert checkpoint["rows_done"] == 7 and checkpoint["completed_at"] is not None
+
+    def test_resume_from_checkpoint(self, client, engine, TestingSessionLocal):
+        """Test an interrupted run continues after the last committed chunk"""
+        seed_users(client, engine, 5)
+        first = runner(engine, batch_size=2, target_latency=1e-9)
+        assert first.run(max_chunks=1) == 2
+        assert lowered(TestingSessionLocal)[2:] == [None] * 3
+
+        assert runner(engine, batch_size=2, target_latency=1e-9).run() == 3
+        assert None not in lowered(TestingSessionLocal)
+
+        reset(engine, "users.email_lower")
+        assert status(engine) == []
+
+    def test_throttle_adapts_chunk_size(self, engine):
+        """Test slow chunks shrink the batch and fast ones grow it"""
+        r = runner(engine, batch_size=1000, target_latency=0.2, min_batch=100, max_batch=2000)
+        r.adjust(0.5)
+        assert r.batch_size == 500
+        for _ in range(5):
+            r.adjust(0.5)
+        assert r.batch_size == 100
+        r.adjust(0.01)
+        assert r.batch_size == 151
+        for _ in range(20):
+            r.adjust(0.01)
+        assert r.batch_size == 2000
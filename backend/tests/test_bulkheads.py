@@ -0,0 +1,70 @@
+import threading
+from http import HTTPStatus
+
+import anyio
+import pytest
+from sqlalchemy import text
+
+from app.core import bulkheads
+from app.core.bulkheads import DeadlineExceeded, _limiter, _run_with_deadline, bulkhead
+
+# a query that keeps sqlite busy for far longer than any test deadline
+SLOW_QUERY = text(
+    "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 100000000) SELECT count(*) FROM n"
+)
+
+
+class TestBulkheads:
+    """Test per-group concurrency limits"""
+
+    def test_full_group_does_not_block_others(self, monkeypatch):
+        """Test a saturated group queues its own calls while others still run"""
+        monkeypatch.setattr(bulkheads, "BULKHEAD_LIMITS", {"exports": 1, "reads": 1})
+        release = threading.Event()
+        slow = bulkhead("exports")(lambda: release.wait(5))
+        fast = bulkhead("reads")(lambda: "ok")
+
+        async def main():
+            async with anyio.create_task_group() as tg:
+                tg.start_soon(slow)
+                tg.start_soon(slow)
+                await anyio.sleep(0.05)
+                assert _limiter("exports").borrowed_tokens == 1
+                assert _limiter("exports").statistics().tasks_waiting == 1
+                assert await fast() == "ok"
+                release.set()
+
+        anyio.run(main)
+
+    def test_async_functions_rejected(self):
+        """Test only sync handlers can be wrapped"""
+        with pytest.raises(TypeError):
+            @bulkhead("reads")
+            async def handler():
+                pass
+
+
+class TestDeadlines:
+    """Test request deadlines reaching the database"""
+
+    def test_slow_statement_is_interrupted(self, engine):
+        """Test the sqlite progress handler stops a statement at the deadline"""
+        def scan():
+            with engine.connect() as conn:
+                return conn.execute(SLOW_QUERY).scalar()
+
+        with pytest.raises(DeadlineExceeded):
+            _run_with_deadline(0.05, scan)
+
+        # the connection is usable again without a deadline
+        with engine.connect() as conn:
+            assert conn.execute(text("SELECT 1")).scalar() == 1
+
+    def test_timeout_maps_to_504(self, client, monkeypatch):
+        """Test a route past its deadline answers 504"""
+        monkeypatch.setattr(bulkheads, "REQUEST_TIMEOUTS", {"reads": 1e-9})
+        response = client.get("/api/v1/interviews", params={"user_id": 1})
+        assert response.status_code == HTTPStatus.GATEWAY_TIMEOUT
+
+        monkeypatch.setattr(bulkheads, "REQUEST_TIMEOUTS", {})
+        assert client.get("/api/v1/interviews", params={"user_id": 1}).status_code == HTTPStatus.OK
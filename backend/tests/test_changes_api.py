@@ -0,0 +1,58 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+from app.db import models
+from app.services.compaction import purge_tombstones
+
+
+def changes(client, since, **params):
+    response = client.get("/api/v1/interviews/changes", params={"user_id": 1, "since": since, **params})
+    assert response.status_code == HTTPStatus.OK
+    return response.json()
+
+
+class TestInterviewChangeFeed:
+    """Test incremental sync via /interviews/changes"""
+
+    def test_feed_returns_only_changes_since_cursor(self, client):
+        """Test creates, updates and deletes all advance the cursor"""
+        first = client.post("/api/v1/interviews", json={"user_id": 1, "company": "A"}).json()["id"]
+        second = client.post("/api/v1/interviews", json={"user_id": 1, "company": "B"}).json()["id"]
+        client.post("/api/v1/interviews", json={"user_id": 2, "company": "Other user"})
+
+        page = changes(client, 0)
+        assert [item["id"] for item in page["items"]] == [first, second]
+        cursor = page["cursor"]
+
+        assert changes(client, cursor)["items"] == []
+
+        client.patch(f"/api/v1/interviews/{first}", json={"company": "A2"})
+        client.delete(f"/api/v1/interviews/{second}")
+        page = changes(client, cursor)
+        assert [(item["id"], item["deleted_at"] is not None) for item in page["items"]] == [
+            (first, False), (second, True)
+        ]
+        assert page["items"][0]["company"] == "A2"
+        assert page["cursor"] > cursor
+
+    def test_batch_update_is_never_split_across_pages(self, client):
+        """Test rows sharing one change_seq are returned together"""
+        ids = [client.post("/api/v1/interviews", json={"user_id": 1}).json()["id"] for _ in range(3)]
+        cursor = changes(client, 0)["cursor"]
+        client.patch("/api/v1/interviews:batch", json={"filter": {"user_id": 1}, "patch": {"type": "coding"}})
+
+        page = changes(client, cursor, limit=2)
+        assert sorted(item["id"] for item in page["items"]) == ids
+        assert page["has_more"] is True
+        assert changes(client, page["cursor"])["items"] == []
+
+    def test_cursor_older_than_purged_tombstone_is_gone(self, client, TestingSessionLocal):
+        """Test clients must resync once a delete they never saw was purged"""
+        interview_id = client.post("/api/v1/interviews", json={"user_id": 1}).json()["id"]
+        cursor = changes(client, 0)["cursor"]
+        client.delete(f"/api/v1/interviews/{interview_id}")
+        with TestingSessionLocal() as db:
+            purge_tombstones(db, models.Interview, retention=timedelta(0))
+
+        response = client.get("/api/v1/interviews/changes", params={"user_id": 1, "since": cursor})
+        assert response.status_code == HTTPStatus.GONE
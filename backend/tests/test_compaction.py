@@ -0,0 +1,77 @@
+import asyncio
+from datetime import timedelta
+
+from app.core import activity
+from app.core.jobs import PeriodicJob
+from app.db import models
+from app.services.compaction import purge_tombstones
+
+
+class TestTombstoneCompaction:
+    """Test physical purging of soft-deleted rows"""
+
+    def test_purge_in_batches(self, client, TestingSessionLocal):
+        """Test purges remove expired tombstones a batch at a time"""
+        ids = [client.post("/api/v1/interviews", json={"user_id": 1}).json()["id"] for _ in range(5)]
+        for interview_id in ids[:4]:
+            client.delete(f"/api/v1/interviews/{interview_id}")
+
+        with TestingSessionLocal() as db:
+            assert purge_tombstones(db, models.Interview, batch_size=3, retention=timedelta(0)) == 3
+            assert purge_tombstones(db, models.Interview, batch_size=3, retention=timedelta(0)) == 1
+            assert purge_tombstones(db, models.Interview, batch_size=3, retention=timedelta(0)) == 0
+            assert [i.id for i in db.query(models.Interview)] == [ids[4]]
+
+    def test_recent_tombstones_are_retained(self, client, TestingSessionLocal):
+        """Test tombstones inside the retention window survive a purge"""
+        interview_id = client.post("/api/v1/interviews", json={"user_id": 1}).json()["id"]
+        client.delete(f"/api/v1/interviews/{interview_id}")
+
+        with TestingSessionLocal() as db:
+            assert purge_tombstones(db, models.Interview, retention=timedelta(hours=1)) == 0
+            assert db.get(models.Interview, interview_id) is not None
+
+    def test_deleted_user_takes_interviews_along(self, client, TestingSessionLocal):
+        """Test deleting a user tombstones their interviews, and the user is purged only after them"""
+        user = client.post("/api/v1/users", json={"email": "leaving@example.com"}).json()
+        ids = [client.post("/api/v1/interviews", json={"user_id": user["id"]}).json()["id"] for _ in range(2)]
+        other = client.post("/api/v1/interviews", json={"user_id": user["id"] + 1}).json()["id"]
+        client.delete(f"/api/v1/users/{user['id']}")
+
+        changes = client.get("/api/v1/interviews/changes", params={"user_id": user["id"]}).json()["items"]
+        assert {c["id"] for c in changes if c["deleted_at"]} == set(ids)
+        with TestingSessionLocal() as db:
+            # the user waits until their interview tombstones are gone
+            assert purge_tombstones(db, models.User, batch_size=10, retention=timedelta(0)) == 0
+            assert purge_tombstones(db, models.Interview, batch_size=10, retention=timedelta(0)) == 2
+            assert purge_tombstones(db, models.User, batch_size=10, retention=timedelta(0)) == 1
+            assert [i.id for i in db.query(models.Interview)] == [other]
+
+    def test_job_yields_to_foreground_traffic(self):
+        """Test a periodic job does no work while the API is busy"""
+        calls = []
+        busy = [True]
+
+        def step():
+            # two batches of work, then nothing left
+            calls.append(1)
+            return 1 if len(calls) < 3 else 0
+
+        job = PeriodicJob("test", step, interval=60, pause=0, is_busy=lambda: busy[0])
+
+        assert job.run_once() == 0 and calls == []
+        busy[0] = False
+        assert job.run_once() == 2
+        assert len(calls) == 3
+
+    def test_event_streams_are_not_in_flight(self):
+        """Test open SSE streams don't keep background jobs from ever seeing a quiet period"""
+        seen = {}
+
+        async def app(scope, receive, send):
+            seen[scope["path"]] = activity.in_flight()
+
+        middleware = activity.ActivityMiddleware(app)
+        for path in ("/api/v1/users/1/events", "/api/v1/interviews"):
+            asyncio.run(middleware({"type": "http", "path": path}, None, None))
+        assert seen == {"/api/v1/users/1/events": 0, "/api/v1/interviews": 1}
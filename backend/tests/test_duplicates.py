@@ -0,0 +1,116 @@
+from datetime import datetime, timedelta, timezone
+from http import HTTPStatus
+
+from app.core import security
+from app.db import models
+from app.services import duplicates
+from app.services.duplicates import blocking_key, normalize
+
+START = datetime(2026, 11, 2, 15, 0, tzinfo=timezone.utc)
+
+
+def create(client, minutes=0, **fields):
+    payload = {"user_id": 1, "company": "Acme", "role": "Software Engineer",
+               "starts_at": (START + timedelta(minutes=minutes)).isoformat(), **fields}
+    return client.post("/api/v1/interviews", json=payload).json()
+
+
+class TestBlockingKeys:
+    """Test company normalization and time buckets"""
+
+    def test_normalize_company(self):
+        """Test case, punctuation and legal suffixes do not split a block"""
+        assert normalize("Acme, Inc.") == normalize("ACME inc") == normalize("The Acme Corporation") == "acme"
+
+    def test_key_needs_company_and_time(self):
+        assert blocking_key("Acme", None) is None
+        assert blocking_key(None, START) is None
+        assert blocking_key("Acme Inc", START) == blocking_key("acme", START + timedelta(minutes=1))
+
+
+class TestInlineDetection:
+    """Test creates are linked to an existing look-alike"""
+
+    def test_invite_and_calendar_event_linked(self, client):
+        """Test the gcal copy of a gmail import points at it"""
+        invite = create(client, source="gmail")
+        event = create(client, minutes=5, company="ACME Inc.", role="Software Engineer (Backend)", source="gcal")
+        assert invite["duplicate_of"] is None
+        assert event["duplicate_of"] == invite["id"]
+
+    def test_different_round_not_linked(self, client):
+        """Test other types, other times and other users stay separate"""
+        first = create(client, type="coding")
+        assert create(client, type="design")["duplicate_of"] is None
+        assert create(client, minutes=120)["duplicate_of"] is None
+        assert create(client, user_id=2)["duplicate_of"] is None
+        assert create(client, minutes=3, type="coding")["duplicate_of"] == first["id"]
+
+    def test_near_bucket_boundary(self, client):
+        """Test duplicates on either side of a bucket boundary still meet"""
+        window = duplicates.DUPLICATE_WINDOW
+        edge = datetime.fromtimestamp((START.timestamp() // window.total_seconds() + 1) * window.total_seconds(),
+                                      timezone.utc)
+        before = create(client, starts_at=(edge - timedelta(minutes=2)).isoformat())
+        after = create(client, starts_at=(edge + timedelta(minutes=2)).isoformat())
+        assert after["duplicate_of"] == before["id"]
+
+    def test_update_relinks(self, client):
+        """Test moving an interview away unlinks it"""
+        original = create(client)
+        copy = create(client, minutes=1)
+        assert copy["duplicate_of"] == original["id"]
+        moved = client.patch(f"/api/v1/interviews/{copy['id']}",
+                             json={"starts_at": (START + timedelta(days=1)).isoformat()}).json()
+        assert moved["duplicate_of"] is None
+
+    def test_batch_update_relinks(self, client):
+        """Test batch PATCHes re-key rows, including a cleared starts_at"""
+        original = create(client)
+        copy = create(client, minutes=1)
+        later = create(client, minutes=600)
+        response = client.patch("/api/v1/interviews:batch", json={"items": [
+            {"id": copy["id"], "patch": {"starts_at": None}},
+            {"id": later["id"], "patch": {"starts_at": (START + timedelta(minutes=2)).isoformat()}},
+        ]})
+        assert response.status_code == HTTPStatus.OK
+        assert client.get(f"/api/v1/interviews/{copy['id']}").json()["duplicate_of"] is None
+        assert client.get(f"/api/v1/interviews/{later['id']}").json()["duplicate_of"] == original["id"]
+
+        # the cleared row is no longer a candidate for new imports
+        assert create(client, minutes=3)["duplicate_of"] == original["id"]
+        response = client.post("/api/v1/interviews", json={"user_id": 1, "company": "Acme", "role": "Software Engineer"})
+        assert response.status_code == HTTPStatus.CREATED
+
+
+class TestBulkPass:
+    """Test the sweep re-keys and re-links existing rows"""
+
+    def test_scan_links_unkeyed_rows(self, client, TestingSessionLocal):
+        """Test rows written before keys existed are clustered under the oldest"""
+        ids = [create(client, minutes=m)["id"] for m in (0, 4, 8)]
+        other = create(client, minutes=0, company="Globex")["id"]
+        with TestingSessionLocal() as db:
+            db.query(models.Interview).update({"dedupe_key": None, "duplicate_of": None})
+            db.commit()
+
+            assert duplicates.scan(db, user_id=1) == {"users": 1, "links_changed": 2}
+            links = {i.id: i.duplicate_of for i in db.query(models.Interview)}
+            assert links == {ids[0]: None, ids[1]: ids[0], ids[2]: ids[0], other: None}
+            assert db.query(models.Interview).filter(models.Interview.dedupe_key.is_(None)).count() == 0
+
+            # idempotent
+            assert duplicates.scan(db)["links_changed"] == 0
+
+    def test_admin_endpoint(self, client, monkeypatch):
+        """Test the bulk pass is reachable by admins"""
+        monkeypatch.setenv("AUTH_HMAC_KEYS", "k1:duplicates-secret")
+        security._keyset_cache.clear()
+        security._claims_cache.clear()
+        create(client)
+        token = security.issue_token({"uid": 1, "admin": True})
+        response = client.post("/api/v1/admin/duplicates/scan", params={"user_id": 1},
+                               headers={"Authorization": f"Bearer {token}"})
+        assert response.status_code == HTTPStatus.OK
+        assert response.json() == {"users": 1, "links_changed": 0}
+        security._keyset_cache.clear()
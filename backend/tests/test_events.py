@@ -0,0 +1,97 @@
+import asyncio
+import threading
+import tracemalloc
+
+from app.services import events
+from app.services.events import EventHub, event_stream
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class TestEventHub:
+    """Test the in-process pub/sub hub"""
+
+    def test_publish_from_worker_thread_reaches_subscriber(self):
+        """Test messages published off the event loop are delivered"""
+        async def scenario():
+            hub = EventHub()
+            sub = hub.subscribe("user:1")
+            other = hub.subscribe("user:2")
+            thread = threading.Thread(target=hub.deliver, args=("user:1", {"type": "interview.created"}))
+            thread.start()
+            thread.join()
+            assert await sub.get(timeout=1) == {"type": "interview.created"}
+            assert await other.get(timeout=0.01) is None
+        run(scenario())
+
+    def test_slow_consumer_is_dropped(self):
+        """Test a full queue drops the subscriber instead of growing"""
+        async def scenario():
+            hub = EventHub(queue_size=2)
+            sub = hub.subscribe("user:1")
+            for i in range(3):
+                hub.deliver("user:1", {"n": i})
+            await asyncio.sleep(0)
+            assert sub.dropped
+            assert await sub.get(timeout=0.01) is None
+        run(scenario())
+
+    def test_stream_sends_heartbeats_and_events(self):
+        """Test the SSE rendering of a subscription"""
+        async def scenario():
+            sub = events.hub.subscribe("user:7")
+            stream = event_stream(sub, heartbeat=0.01)
+            assert await stream.__anext__() == "retry: 5000\n\n"
+            assert await stream.__anext__() == ": keep-alive\n\n"
+            events.publish_interview_change("created", 7, 42, 3)
+            frame = await stream.__anext__()
+            assert frame.startswith("id: 3\nevent: interview.created\n")
+            await stream.aclose()
+            assert events.hub.subscriber_count() == 0
+        run(scenario())
+
+    def test_idle_subscription_is_small(self):
+        """Test per-connection memory stays low for idle subscribers"""
+        async def scenario():
+            hub = EventHub()
+            tracemalloc.start()
+            try:
+                before = tracemalloc.get_traced_memory()[0]
+                subs = [hub.subscribe(f"user:{i}") for i in range(10_000)]
+                per_subscriber = (tracemalloc.get_traced_memory()[0] - before) / len(subs)
+            finally:
+                tracemalloc.stop()
+            assert hub.subscriber_count() == 10_000
+            assert per_subscriber < 4096
+        run(scenario())
+
+
+class RecordingBroadcaster:
+    def __init__(self):
+        self.published = []
+
+    def publish(self, channel, message):
+        self.published.append((channel, message["type"]))
+
+
+class TestInterviewEvents:
+    """Test that interview writes are published"""
+
+    def test_writes_publish_to_user_channel(self, client, monkeypatch):
+        """Test create, update, batch update and delete each publish an event"""
+        recorder = RecordingBroadcaster()
+        monkeypatch.setattr(events, "broadcaster", recorder)
+
+        interview_id = client.post("/api/v1/interviews", json={"user_id": 5}).json()["id"]
+        client.patch(f"/api/v1/interviews/{interview_id}", json={"company": "Acme"})
+        client.patch("/api/v1/interviews:batch", json={"items": [{"id": interview_id, "patch": {"type": "coding"}}]})
+        client.delete(f"/api/v1/interviews/{interview_id}")
+
+        assert recorder.published == [
+            ("user:5", "interview.created"),
+            ("user:5", "interview.updated"),
+            ("user:5", "interview.updated"),
+            ("user:5", "interview.deleted"),
+        ]
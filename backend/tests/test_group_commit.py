@@ -0,0 +1,84 @@
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+
+import pytest
+from sqlalchemy import event
+
+from app.db import group_commit, models
+from app.db.group_commit import GroupCommitter, after_commit
+
+
+@pytest.fixture
+def committer(monkeypatch):
+    committer = GroupCommitter(max_batch=16, max_delay=0.05)
+    monkeypatch.setattr(group_commit, "committer", committer)
+    yield committer
+    committer.close()
+
+
+@pytest.fixture
+def commits(engine):
+    count = [0]
+    def _count(conn):
+        count[0] += 1
+    event.listen(engine, "commit", _count)
+    yield count
+    event.remove(engine, "commit", _count)
+
+
+class TestGroupCommit:
+    """Test coalescing concurrent writes into shared transactions"""
+
+    def test_concurrent_creates_share_commits(self, client, committer, commits):
+        """Test concurrent creates all succeed with far fewer commits"""
+        def create(i):
+            return client.post("/api/v1/interviews", json={"user_id": 1, "company": f"C{i}"})
+
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            responses = list(pool.map(create, range(32)))
+
+        assert {r.status_code for r in responses} == {HTTPStatus.CREATED}
+        assert len({r.json()["id"] for r in responses}) == 32
+        assert all(r.json()["created_at"] for r in responses)
+        assert commits[0] < 32
+
+        data = client.get("/api/v1/interviews", params={"user_id": 1, "limit": 100}).json()
+        assert len(data) == 32
+
+    def test_failed_call_is_isolated(self, committer, TestingSessionLocal):
+        """Test one failing call rolls back alone and its hooks never run"""
+        hooks = []
+
+        def good(name):
+            def op(db):
+                db.add(models.Interview(user_id=1, company=name))
+                db.commit()
+                after_commit(db, lambda: hooks.append(name))
+                return name
+            return op
+
+        def bad(db):
+            db.add(models.Interview(user_id=1, company="bad"))
+            db.flush()
+            after_commit(db, lambda: hooks.append("bad"))
+            raise ValueError("boom")
+
+        with TestingSessionLocal() as db, ThreadPoolExecutor(max_workers=3) as pool:
+            futures = [pool.submit(committer.submit, db, op) for op in (good("a"), bad, good("b"))]
+            assert futures[0].result() == "a" and futures[2].result() == "b"
+            with pytest.raises(ValueError):
+                futures[1].result()
+
+        assert sorted(hooks) == ["a", "b"]
+        with TestingSessionLocal() as db:
+            assert sorted(i.company for i in db.query(models.Interview)) == ["a", "b"]
+
+    def test_errors_reach_the_caller(self, client, committer):
+        """Test a grouped update of a missing interview still answers 404"""
+        response = client.patch("/api/v1/interviews/999", json={"company": "x"})
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+        interview_id = client.post("/api/v1/interviews", json={"user_id": 1}).json()["id"]
+        response = client.patch(f"/api/v1/interviews/{interview_id}", json={"company": "New"})
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()["company"] == "New"
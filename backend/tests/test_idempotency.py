@@ -0,0 +1,99 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from http import HTTPStatus
+
+from app.core import idempotency
+from app.db import models
+
+
+def post(client, path, payload, key):
+    return client.post(path, json=payload, headers={"Idempotency-Key": key})
+
+
+class TestIdempotencyKeys:
+    """Test Idempotency-Key replays on POST endpoints"""
+
+    def test_retry_replays_stored_response(self, client, TestingSessionLocal):
+        """Test a retried create returns the first response without a second row"""
+        payload = {"user_id": 1, "company": "Acme"}
+        first = post(client, "/api/v1/interviews", payload, "k-1")
+        retry = post(client, "/api/v1/interviews", payload, "k-1")
+
+        assert first.status_code == retry.status_code == HTTPStatus.CREATED
+        assert retry.json() == first.json()
+        assert retry.headers["idempotent-replayed"] == "true"
+        with TestingSessionLocal() as db:
+            assert db.query(models.Interview).count() == 1
+
+        # a new key is a new request
+        assert post(client, "/api/v1/interviews", payload, "k-2").json()["id"] != first.json()["id"]
+
+    def test_user_signup_retry_is_not_a_conflict(self, client):
+        """Test a retried signup replays 201 instead of failing as a duplicate"""
+        payload = {"email": "retry@example.com"}
+        first = post(client, "/api/v1/users", payload, "signup")
+        retry = post(client, "/api/v1/users", payload, "signup")
+        assert first.status_code == retry.status_code == HTTPStatus.CREATED
+        assert retry.json()["id"] == first.json()["id"]
+
+    def test_key_reused_with_different_request(self, client):
+        """Test a key cannot be replayed for a different body"""
+        post(client, "/api/v1/interviews", {"user_id": 1, "company": "Acme"}, "k")
+        response = post(client, "/api/v1/interviews", {"user_id": 1, "company": "Other"}, "k")
+        assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+    def test_concurrent_duplicates_execute_once(self, client, TestingSessionLocal):
+        """Test concurrent requests with one key create a single row"""
+        payload = {"user_id": 1, "company": "Acme"}
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            responses = list(pool.map(lambda _: post(client, "/api/v1/interviews", payload, "burst"), range(8)))
+
+        assert {r.status_code for r in responses} == {HTTPStatus.CREATED}
+        assert len({r.json()["id"] for r in responses}) == 1
+        with TestingSessionLocal() as db:
+            assert db.query(models.Interview).count() == 1
+
+    def test_in_flight_elsewhere(self, client, TestingSessionLocal):
+        """Test a key still pending in another worker answers 409 with Retry-After"""
+        payload = {"user_id": 1}
+        post(client, "/api/v1/interviews", payload, "pending")
+        with TestingSessionLocal() as db:
+            entry = db.query(models.IdempotencyKey).one()
+            entry.status_code = None
+            db.commit()
+
+        response = post(client, "/api/v1/interviews", payload, "pending")
+        assert response.status_code == HTTPStatus.CONFLICT
+        assert response.headers["retry-after"] == "1"
+
+    def test_expired_key_executes_again(self, client, TestingSessionLocal):
+        """Test an expired entry no longer short-circuits the request"""
+        payload = {"user_id": 1}
+        first = post(client, "/api/v1/interviews", payload, "old")
+        with TestingSessionLocal() as db:
+            db.query(models.IdempotencyKey).update(
+                {"expires_at": datetime.now(timezone.utc) - timedelta(seconds=1)})
+            db.commit()
+
+        retry = post(client, "/api/v1/interviews", payload, "old")
+        assert retry.status_code == HTTPStatus.CREATED
+        assert retry.json()["id"] != first.json()["id"]
+
+    def test_errors_are_replayed_but_not_bad_keys(self, client):
+        """Test 4xx responses are stored, while an oversized key is rejected"""
+        first = post(client, "/api/v1/interviews", {"company": "no user"}, "invalid")
+        assert first.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+        retry = post(client, "/api/v1/interviews", {"company": "no user"}, "invalid")
+        assert retry.headers["idempotent-replayed"] == "true"
+
+        response = post(client, "/api/v1/interviews", {"user_id": 1}, "x" * 300)
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_anonymous_callers_do_not_share_keys(self):
+        """Test requests without a verified token are scoped by client address"""
+        def caller(host, authorization=b""):
+            return idempotency._caller({"client": (host, 50000)}, {b"authorization": authorization})
+
+        assert caller("10.0.0.1") != caller("10.0.0.2")
+        assert caller("10.0.0.1") == caller("10.0.0.1", b"Bearer not-a-token")
+        assert caller("10.0.0.1") != idempotency._caller({}, {})
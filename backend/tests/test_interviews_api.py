@@ -178,12 +178,107 @@ class TestInterviewListing:
         data = response.json()
         assert len(data) == 2
 
+    def test_multi_get_preserves_order_and_reports_missing(self, client):
+        """Test fetching several interviews by id in one request"""
+        ids = [
+            client.post("/api/v1/interviews", json={"user_id": 1, "company": f"Company {i}"}).json()["id"]
+            for i in range(3)
+        ]
+        requested = [ids[2], 99999, ids[0], ids[1]]
+
+        response = client.get("/api/v1/interviews?ids=" + ",".join(map(str, requested)))
+        assert response.status_code == HTTPStatus.OK
+
+        data = response.json()
+        assert [item["id"] for item in data["items"]] == [ids[2], ids[0], ids[1]]
+        assert data["missing"] == [99999]
+
+    def test_multi_get_returns_details(self, client):
+        """Test that ?ids= hydrates full interviews, like a GET by id"""
+        payload = {"user_id": 1, "company": "Acme", "details": {"notes": "bring a laptop"}}
+        interview_id = client.post("/api/v1/interviews", json=payload).json()["id"]
+
+        items = client.get(f"/api/v1/interviews?ids={interview_id}").json()["items"]
+        assert items == [client.get(f"/api/v1/interviews/{interview_id}").json()]
+        assert items[0]["details"] == {"notes": "bring a laptop"}
+
+    def test_multi_get_chunks_long_id_lists(self, client, monkeypatch):
+        """Test that long id lists are resolved across several IN chunks"""
+        from app.db import queries
+        monkeypatch.setattr(queries, "IN_CLAUSE_CHUNK_SIZE", 2)
+        ids = [client.post("/api/v1/interviews", json={"user_id": 1}).json()["id"] for _ in range(5)]
+
+        response = client.get("/api/v1/interviews?ids=" + ",".join(map(str, reversed(ids))))
+        assert response.status_code == HTTPStatus.OK
+        assert [item["id"] for item in response.json()["items"]] == list(reversed(ids))
+
+    def test_multi_get_invalid_ids(self, client):
+        """Test that malformed id lists are rejected"""
+        response = client.get("/api/v1/interviews?ids=1,abc")
+        assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
     def test_list_interviews_missing_user_id(self, client):
         """Test that user_id is required for listing interviews"""
         response = client.get("/api/v1/interviews?limit=10&offset=0")
         assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
 
 
+class TestSparseFieldsets:
+    """Test ?fields= projections on interview reads"""
+
+    def test_list_omits_details_by_default(self, client, sql_statements):
+        """Test listings leave out details, also in the SQL"""
+        client.post("/api/v1/interviews", json={"user_id": 1, "company": "Acme", "details": {"notes": "long"}})
+        sql_statements.clear()
+
+        data = client.get("/api/v1/interviews", params={"user_id": 1}).json()
+        assert data[0]["company"] == "Acme"
+        assert "details" not in data[0]
+        assert not any("details" in sql for sql in sql_statements)
+
+    def test_fields_projection(self, client, sql_statements):
+        """Test only the requested columns are selected and returned"""
+        interview_id = client.post("/api/v1/interviews", json={
+            "user_id": 1, "company": "Acme", "role": "SWE", "details": {"notes": "x"}
+        }).json()["id"]
+        sql_statements.clear()
+
+        data = client.get("/api/v1/interviews", params={"user_id": 1, "fields": "company,details"}).json()
+        assert data == [{"id": interview_id, "company": "Acme", "details": {"notes": "x"}}]
+        select = next(sql for sql in sql_statements if "FROM interviews" in sql)
+        assert "interviews.role" not in select
+
+        data = client.get(f"/api/v1/interviews/{interview_id}", params={"fields": "role"}).json()
+        assert data == {"id": interview_id, "role": "SWE"}
+
+        data = client.get("/api/v1/interviews", params={"ids": str(interview_id), "fields": "company"}).json()
+        assert data["items"] == [{"id": interview_id, "company": "Acme"}]
+
+    def test_single_get_returns_every_field(self, client):
+        """Test GET by id stays complete without ?fields="""
+        interview_id = client.post("/api/v1/interviews", json={"user_id": 1, "details": {"a": 1}}).json()["id"]
+        data = client.get(f"/api/v1/interviews/{interview_id}").json()
+        assert data["details"] == {"a": 1}
+        assert {"company", "role", "type", "source", "starts_at", "created_at"} <= data.keys()
+
+    def test_reads_keep_the_timezone(self, client):
+        """Test GET, lists and multi-get return starts_at in UTC like POST does"""
+        created = client.post("/api/v1/interviews", json={"user_id": 1, "starts_at": "2030-01-01T10:00:00Z"}).json()
+        expected = datetime(2030, 1, 1, 10, tzinfo=timezone.utc)
+        reads = [
+            client.get(f"/api/v1/interviews/{created['id']}").json(),
+            client.get("/api/v1/interviews", params={"user_id": 1}).json()[0],
+            client.get("/api/v1/interviews", params={"ids": created["id"]}).json()["items"][0],
+        ]
+        for read in [created, *reads]:
+            assert datetime.fromisoformat(read["starts_at"].replace("Z", "+00:00")) == expected
+
+    def test_unknown_field(self, client):
+        """Test unknown field names are rejected"""
+        response = client.get("/api/v1/interviews", params={"user_id": 1, "fields": "company,password"})
+        assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
 class TestInterviewUpdates:
     """Test interview update functionality"""
 
@@ -262,6 +357,63 @@ class TestInterviewUpdates:
         assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
 
 
+class TestInterviewBatchUpdates:
+    """Test bulk PATCH /interviews:batch"""
+
+    def test_batch_update_items(self, client):
+        """Test per-item patches, including an unknown id"""
+        ids = [client.post("/api/v1/interviews", json={"user_id": 1, "type": "phone"}).json()["id"] for _ in range(3)]
+
+        response = client.patch("/api/v1/interviews:batch", json={"items": [
+            {"id": ids[0], "patch": {"type": "coding"}},
+            {"id": ids[1], "patch": {"type": "coding"}},
+            {"id": ids[2], "patch": {"company": "Renamed"}},
+            {"id": 99999, "patch": {"company": "Nobody"}},
+        ]})
+        assert response.status_code == HTTPStatus.OK
+        assert response.json() == {"updated": sorted(ids), "missing": [99999]}
+
+        assert client.get(f"/api/v1/interviews/{ids[0]}").json()["type"] == "coding"
+        third = client.get(f"/api/v1/interviews/{ids[2]}").json()
+        assert third["company"] == "Renamed"
+        assert third["type"] == "phone"
+
+    def test_batch_update_filter(self, client):
+        """Test filter + patch reclassifies only matching interviews"""
+        acme = [client.post("/api/v1/interviews", json={"user_id": 1, "company": "Acme"}).json()["id"] for _ in range(2)]
+        other = client.post("/api/v1/interviews", json={"user_id": 1, "company": "Globex"}).json()["id"]
+        client.post("/api/v1/interviews", json={"user_id": 2, "company": "Acme"})
+
+        response = client.patch("/api/v1/interviews:batch", json={
+            "filter": {"user_id": 1, "company": "Acme"},
+            "patch": {"type": "coding"},
+        })
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()["updated"] == sorted(acme)
+        assert client.get(f"/api/v1/interviews/{other}").json()["type"] is None
+
+    def test_batch_update_validation(self, client):
+        """Test invalid batch payloads are rejected"""
+        # both modes at once
+        response = client.patch("/api/v1/interviews:batch", json={
+            "items": [{"id": 1, "patch": {"type": "coding"}}],
+            "filter": {"user_id": 1}, "patch": {"type": "coding"},
+        })
+        assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+        # filter without user_id
+        response = client.patch("/api/v1/interviews:batch", json={
+            "filter": {"company": "Acme"}, "patch": {"type": "coding"},
+        })
+        assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+        # patch values go through InterviewUpdate validation
+        response = client.patch("/api/v1/interviews:batch", json={
+            "items": [{"id": 1, "patch": {"type": "invalid_type"}}],
+        })
+        assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
 class TestInterviewDeletion:
     """Test interview deletion functionality"""
 
@@ -288,6 +440,22 @@ class TestInterviewDeletion:
         response = client.delete("/api/v1/interviews/99999")
         assert response.status_code == HTTPStatus.NOT_FOUND
 
+    def test_delete_is_soft(self, client, TestingSessionLocal):
+        """Test deletes leave a tombstone that every query ignores"""
+        from app.db import models
+        interview_id = client.post("/api/v1/interviews", json={"user_id": 1}).json()["id"]
+        client.delete(f"/api/v1/interviews/{interview_id}")
+
+        with TestingSessionLocal() as db:
+            row = db.get(models.Interview, interview_id)
+            assert row is not None and row.deleted_at is not None
+
+        assert client.get("/api/v1/interviews?user_id=1").json() == []
+        assert client.get(f"/api/v1/interviews?ids={interview_id}").json()["missing"] == [interview_id]
+        assert client.delete(f"/api/v1/interviews/{interview_id}").status_code == HTTPStatus.NOT_FOUND
+        response = client.patch(f"/api/v1/interviews/{interview_id}", json={"company": "Ghost"})
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
 
 class TestHealthEndpoint:
     """Test health check endpoint"""
@@ -0,0 +1,123 @@
+import cProfile
+import json
+from http import HTTPStatus
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import profiling, security
+from app.core.profiling import ProfilingMiddleware
+from app.main import app
+
+
+@pytest.fixture(autouse=True)
+def enabled(monkeypatch):
+    monkeypatch.setenv("AUTH_HMAC_KEYS", "k1:profiling-secret")
+    security._keyset_cache.clear()
+    security._claims_cache.clear()
+    monkeypatch.setattr(profiling, "PROFILING_ENABLED", True)
+    profiling.reports.clear()
+    yield
+    profiling.reports.clear()
+    profiling.stop_tracing()
+    security._keyset_cache.clear()
+
+
+@pytest.fixture
+def profiled_client(client):
+    # reuses client's get_db override, with the profiler in front of the app
+    with TestClient(ProfilingMiddleware(app)) as c:
+        yield c
+
+
+def bearer(**claims):
+    return {"Authorization": f"Bearer {security.issue_token(claims)}"}
+
+
+ADMIN = {"uid": 1, "admin": True}
+
+
+class TestRequestProfiling:
+    """Test per-request profiles"""
+
+    def test_profile_splits_time_by_layer(self, profiled_client):
+        """Test a flagged admin request is profiled across the loop and the worker thread"""
+        for i in range(5):
+            profiled_client.post("/api/v1/interviews", json={"user_id": 1, "company": f"C{i}"})
+        response = profiled_client.get("/api/v1/interviews", params={"user_id": 1},
+                                       headers={**bearer(**ADMIN), "x-profile": "1"})
+        assert response.status_code == HTTPStatus.OK
+        profile_id = response.headers["x-profile-id"]
+
+        report = profiled_client.get(f"/api/v1/admin/profiles/{profile_id}", headers=bearer(**ADMIN)).json()
+        assert report["path"] == "/api/v1/interviews"
+        split = report["self_time_ms"]
+        # SQLAlchemy runs in the route's worker thread, serialization on the event loop
+        assert split["sqlalchemy"] > 0 and split["pydantic"] > 0 and split["json encoding"] > 0
+        assert report["top"] and "Ordered by: cumulative time" in report["call_tree"]
+
+        listed = profiled_client.get("/api/v1/admin/profiles", headers=bearer(**ADMIN)).json()
+        assert [p["id"] for p in listed] == [int(profile_id)]
+
+    def test_report_merges_thread_profiles(self):
+        """Test work profiled in a worker thread shows up by name in the report"""
+        def route_handler():
+            return json.dumps([{"n": i} for i in range(20000)])
+
+        loop, worker = cProfile.Profile(), cProfile.Profile()
+        loop.runcall(sum, range(10))
+        worker.runcall(route_handler)
+        report = profiling.build_report([loop, worker], "/api/v1/things", 0.01)
+
+        [entry] = [t for t in report["top"] if t["function"].endswith("(route_handler)")]
+        assert entry["calls"] == 1 and entry["cumulative_ms"] >= entry["self_ms"]
+        assert report["top"][0]["cumulative_ms"] >= report["top"][-1]["cumulative_ms"]
+        assert "route_handler" in report["call_tree"]
+        assert report["self_time_ms"]["json encoding"] > 0
+
+    def test_requires_admin_token(self, profiled_client):
+        """Test the flag is ignored without an admin token"""
+        response = profiled_client.get("/api/v1/interviews?user_id=1&profile=1", headers=bearer(uid=1))
+        assert response.status_code == HTTPStatus.OK
+        assert "x-profile-id" not in response.headers
+        assert profiling.reports == {}
+
+    def test_disabled_endpoints(self, client, monkeypatch):
+        """Test the admin surface is off unless enabled"""
+        monkeypatch.setattr(profiling, "PROFILING_ENABLED", False)
+        response = client.get("/api/v1/admin/profiles", headers=bearer(**ADMIN))
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+class TestMemorySnapshots:
+    """Test tracemalloc snapshot and diff endpoints"""
+
+    def test_diff_shows_growth(self, client):
+        """Test allocations made between two snapshots show up in the diff"""
+        base = client.post("/api/v1/admin/memory/snapshots", headers=bearer(**ADMIN))
+        assert base.status_code == HTTPStatus.CREATED
+        leak = [bytearray(1024) for _ in range(1000)]
+
+        response = client.get("/api/v1/admin/memory/diff", params={"base": base.json()["id"]},
+                              headers=bearer(**ADMIN))
+        assert response.status_code == HTTPStatus.OK
+        [top, *_] = response.json()["stats"]
+        assert top["size_diff"] >= 1024 * 1000
+        assert "test_profiling.py" in top["where"][0]
+        del leak
+
+        assert client.delete("/api/v1/admin/memory", headers=bearer(**ADMIN)).status_code == HTTPStatus.NO_CONTENT
+        assert profiling.snapshots == {}
+
+    def test_diff_against_oldest_snapshot(self, client, monkeypatch):
+        """Test the fresh target snapshot may evict base without failing the diff"""
+        monkeypatch.setattr(profiling, "MAX_SNAPSHOTS", 2)
+        ids = [client.post("/api/v1/admin/memory/snapshots", headers=bearer(**ADMIN)).json()["id"] for _ in range(2)]
+        response = client.get("/api/v1/admin/memory/diff", params={"base": ids[0]}, headers=bearer(**ADMIN))
+        assert response.status_code == HTTPStatus.OK
+        assert ids[0] not in profiling.snapshots
+
+    def test_unknown_snapshot(self, client):
+        """Test diffing against a missing snapshot is a 404"""
+        response = client.get("/api/v1/admin/memory/diff", params={"base": 999}, headers=bearer(**ADMIN))
+        assert response.status_code == HTTPStatus.NOT_FOUND
@@ -0,0 +1,155 @@
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.db import models
+from app.services import reminders
+from app.services.reminders import ReminderScheduler, TimingWheel
+
+HOUR = timedelta(hours=1)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = time.time()
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, delta: timedelta):
+        self.now += delta.total_seconds()
+
+
+class RecordingNotifier:
+    def __init__(self):
+        self.sent = []
+
+    def send(self, reminder):
+        self.sent.append((reminder.interview_id, reminder.lead))
+
+
+@pytest.fixture
+def notifier(monkeypatch):
+    recording = RecordingNotifier()
+    monkeypatch.setattr(reminders, "notifier", recording)
+    return recording
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def scheduler(TestingSessionLocal, clock, monkeypatch):
+    scheduler = ReminderScheduler(TestingSessionLocal, leads=[24 * HOUR, HOUR], tick=1, slots=60,
+                                  lookahead=HOUR, clock=clock)
+    monkeypatch.setattr(reminders, "schedulers", [scheduler]) # interview writes reach it
+    return scheduler
+
+
+def create(client, starts_in: timedelta):
+    starts_at = (datetime.now(timezone.utc) + starts_in).isoformat()
+    return client.post("/api/v1/interviews", json={"user_id": 1, "company": "Acme", "starts_at": starts_at}).json()["id"]
+
+
+class TestTimingWheel:
+    """Test the hashed timing wheel"""
+
+    def test_fires_in_order_across_revolutions(self):
+        """Test items due beyond one revolution wait for their own tick"""
+        wheel = TimingWheel(tick=1, slots=10, now=0)
+        wheel.add("a", 3, "a")
+        wheel.add("b", 13, "b") # same slot, next revolution
+        assert wheel.advance(5) == ["a"]
+        assert wheel.advance(12) == []
+        assert wheel.advance(13) == ["b"]
+        assert len(wheel) == 0
+
+    def test_remove_and_reschedule(self):
+        """Test re-adding a key moves it and removing cancels it"""
+        wheel = TimingWheel(tick=1, slots=10, now=0)
+        wheel.add("a", 3, "a")
+        wheel.add("a", 7, "a")
+        wheel.add("b", 4, "b")
+        wheel.remove("b")
+        assert wheel.advance(5) == []
+        assert wheel.advance(7) == ["a"]
+
+    def test_catches_up_after_stall(self):
+        """Test a long gap between ticks fires everything that came due"""
+        wheel = TimingWheel(tick=1, slots=10, now=0)
+        for i in range(30):
+            wheel.add(i, i, i)
+        assert sorted(wheel.advance(1000)) == list(range(30))
+
+
+class TestReminderScheduler:
+    """Test reminders over real interviews"""
+
+    def test_sends_each_lead_once(self, client, scheduler, clock, notifier):
+        """Test the 24h and 1h reminders fire at their time, exactly once"""
+        interview_id = create(client, starts_in=25 * HOUR)
+        scheduler.tick_once()
+        assert notifier.sent == []
+
+        clock.advance(HOUR / 2) # the window slides forward and picks the interview up
+        scheduler.tick_once()
+        clock.advance(HOUR / 2 + timedelta(seconds=5))
+        scheduler.tick_once()
+        assert notifier.sent == [(interview_id, 24 * HOUR)]
+
+        clock.advance(23 * HOUR)
+        scheduler.tick_once()
+        scheduler.tick_once()
+        assert notifier.sent == [(interview_id, 24 * HOUR), (interview_id, HOUR)]
+
+    def test_reschedule_and_delete_take_effect(self, client, scheduler, clock, notifier):
+        """Test writes reach the wheel through the after-commit hook"""
+        moved = create(client, starts_in=2 * HOUR)
+        deleted = create(client, starts_in=2 * HOUR)
+        scheduler.tick_once()
+
+        later = (datetime.now(timezone.utc) + 10 * HOUR).isoformat()
+        client.patch(f"/api/v1/interviews/{moved}", json={"starts_at": later})
+        client.delete(f"/api/v1/interviews/{deleted}")
+        clock.advance(HOUR + timedelta(seconds=5))
+        scheduler.tick_once()
+        assert notifier.sent == []
+
+        clock.advance(8 * HOUR)
+        scheduler.tick_once()
+        assert notifier.sent == [(moved, HOUR)]
+
+    def test_restart_does_not_resend(self, client, scheduler, clock, notifier, TestingSessionLocal):
+        """Test a fresh scheduler recovers the window and skips reminders already sent"""
+        interview_id = create(client, starts_in=30 * timedelta(minutes=1))
+        scheduler.tick_once() # the 1h reminder is overdue: sent late, 24h is skipped
+        assert notifier.sent == [(interview_id, HOUR)]
+
+        restarted = ReminderScheduler(TestingSessionLocal, leads=[24 * HOUR, HOUR], tick=1, slots=60,
+                                      lookahead=HOUR, clock=clock)
+        restarted.tick_once()
+        assert notifier.sent == [(interview_id, HOUR)]
+        with TestingSessionLocal() as db:
+            assert db.query(models.ReminderSent).count() == 1
+
+    def test_failed_delivery_is_retried(self, client, scheduler, clock, monkeypatch):
+        """Test a notifier error releases the claim and retries later"""
+        class Flaky(RecordingNotifier):
+            def send(self, reminder):
+                if not self.sent and not getattr(self, "failed", False):
+                    self.failed = True
+                    raise RuntimeError("smtp down")
+                super().send(reminder)
+
+        flaky = Flaky()
+        monkeypatch.setattr(reminders, "notifier", flaky)
+        interview_id = create(client, starts_in=30 * timedelta(minutes=1))
+        scheduler.tick_once()
+        assert flaky.sent == []
+
+        clock.advance(timedelta(seconds=reminders.REMINDER_RETRY + 1))
+        scheduler.tick_once()
+        assert flaky.sent == [(interview_id, HOUR)]
@@ -0,0 +1,102 @@
+import shutil
+import time
+from http import HTTPStatus
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.db import models
+from app.db.routing import PIN_HEADER, ReadYourWritesMiddleware, ReplicaSet, RoutingSession
+from app.db.session import get_db
+from app.main import app
+
+
+@pytest.fixture
+def replica(tmp_path, db_file):
+    # a file copy of the primary stands in for a lagging replica
+    path = tmp_path / "replica.db"
+    shutil.copyfile(db_file, path)
+    replicas = ReplicaSet([f"sqlite:///{path}"], cooldown=60)
+    yield path, replicas
+    replicas.dispose()
+
+
+@pytest.fixture
+def routed_client(engine, replica):
+    _, replicas = replica
+    RoutedSession = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False,
+                                 bind=engine, replicas=replicas)
+
+    def _override_get_db():
+        db = RoutedSession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = _override_get_db
+    with TestClient(ReadYourWritesMiddleware(app, window=0.5)) as c:
+        yield c
+    app.dependency_overrides.clear()
+
+
+class TestReplicaRouting:
+    """Test read-replica routing and read-your-writes pinning"""
+
+    def test_reads_go_to_replica_unless_client_just_wrote(self, routed_client, replica, db_file):
+        response = routed_client.post("/api/v1/users", json={"email": "rw@example.com"})
+        assert response.status_code == HTTPStatus.CREATED
+        assert response.cookies.get("rw_pin")
+        user_id = response.json()["id"]
+
+        # the writer reads its own write from the primary
+        assert routed_client.get(f"/api/v1/users/{user_id}").status_code == HTTPStatus.OK
+
+        # another client reads the (stale) replica
+        routed_client.cookies.clear()
+        assert routed_client.get(f"/api/v1/users/{user_id}").status_code == HTTPStatus.NOT_FOUND
+        pinned = routed_client.get(f"/api/v1/users/{user_id}",
+                                   headers={PIN_HEADER: response.headers[PIN_HEADER]})
+        assert pinned.status_code == HTTPStatus.OK
+
+        # once the window passes, reads return to the replica until it catches up
+        time.sleep(0.6)
+        assert routed_client.get(f"/api/v1/users/{user_id}",
+                                 headers={PIN_HEADER: response.headers[PIN_HEADER]}).status_code == HTTPStatus.NOT_FOUND
+        path, replicas = replica
+        replicas.dispose()
+        shutil.copyfile(db_file, path)
+        assert routed_client.get(f"/api/v1/users/{user_id}").status_code == HTTPStatus.OK
+
+    def test_session_pins_to_primary_after_write(self, engine, replica):
+        _, replicas = replica
+        with RoutingSession(bind=engine, replicas=replicas) as db:
+            assert db.get_bind(clause=select(models.User)) is replicas.engines[0]
+            db.add(models.User(email="pin@example.com"))
+            db.commit()
+            assert db.get_bind(clause=select(models.User)) is engine
+            assert db.query(models.User).filter_by(email="pin@example.com").one()
+
+
+class TestReplicaEjection:
+    """Test health-based replica ejection"""
+
+    def test_unreachable_replica_is_ejected(self, engine, tmp_path):
+        replicas = ReplicaSet([f"sqlite:///{tmp_path / 'missing' / 'replica.db'}"], cooldown=60)
+        with RoutingSession(bind=engine, replicas=replicas) as db:
+            with pytest.raises(OperationalError):
+                db.execute(select(models.User)).all()
+        assert replicas.healthy() == []
+
+        # with every replica out, reads fall back to the primary
+        with RoutingSession(bind=engine, replicas=replicas) as db:
+            assert db.execute(select(models.User)).all() == []
+
+        # after the cooldown the replica is re-probed, and stays out while still down
+        replicas.cooldown = 0
+        replicas.eject(replicas.engines[0])
+        assert replicas.pick() is None
+        replicas.dispose()
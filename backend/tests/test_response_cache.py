@@ -0,0 +1,76 @@
+import time
+from http import HTTPStatus
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import response_cache
+from app.core.response_cache import LocalVersionStore, ResponseCacheMiddleware
+from app.db.routing import PIN_HEADER, ReadYourWritesMiddleware
+from app.db.session import get_db
+from app.main import app
+
+
+@pytest.fixture
+def cached_client(client, monkeypatch):
+    # reuses client's get_db override, with the cache in front of the app
+    monkeypatch.setattr(response_cache, "versions", LocalVersionStore())
+    response_cache.pages.clear()
+    assert get_db in app.dependency_overrides
+    with TestClient(ResponseCacheMiddleware(app)) as c:
+        yield c
+    response_cache.pages.clear()
+
+
+class TestResponseCache:
+    """Test the versioned per-user list cache"""
+
+    def test_repeat_pages_skip_the_database(self, cached_client, sql_statements):
+        cached_client.post("/api/v1/interviews", json={"user_id": 1, "company": "Acme"})
+        first = cached_client.get("/api/v1/interviews?user_id=1&limit=10")
+        assert "x-cache" not in first.headers
+
+        sql_statements.clear()
+        # same query in another parameter order
+        again = cached_client.get("/api/v1/interviews?limit=10&user_id=1")
+        assert again.headers["x-cache"] == "hit"
+        assert again.content == first.content
+        assert sql_statements == []
+
+    def test_writes_invalidate_the_users_pages(self, cached_client):
+        interview_id = cached_client.post("/api/v1/interviews", json={"user_id": 1, "company": "Old"}).json()["id"]
+        cached_client.post("/api/v1/interviews", json={"user_id": 2, "company": "Other"})
+        cached_client.get("/api/v1/interviews?user_id=1")
+        cached_client.get("/api/v1/interviews?user_id=2")
+
+        cached_client.patch(f"/api/v1/interviews/{interview_id}", json={"company": "New"})
+        response = cached_client.get("/api/v1/interviews?user_id=1")
+        assert "x-cache" not in response.headers
+        assert response.json()[0]["company"] == "New"
+
+        # other users' pages stay cached
+        assert cached_client.get("/api/v1/interviews?user_id=2").headers["x-cache"] == "hit"
+
+        cached_client.delete(f"/api/v1/interviews/{interview_id}")
+        assert cached_client.get("/api/v1/interviews?user_id=1").json() == []
+
+    def test_uncacheable_requests(self, cached_client):
+        interview_id = cached_client.post("/api/v1/interviews", json={"user_id": 1}).json()["id"]
+        for _ in range(2):
+            response = cached_client.get(f"/api/v1/interviews?ids={interview_id}")
+            assert "x-cache" not in response.headers
+        for _ in range(2):
+            response = cached_client.get("/api/v1/interviews")
+            assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+            assert "x-cache" not in response.headers
+
+    def test_pinned_reads_bypass_the_cache(self, cached_client):
+        """Test a client that just wrote neither hits nor fills cached pages"""
+        cached_client.post("/api/v1/interviews", json={"user_id": 1})
+        pin = {PIN_HEADER: f"{time.time() + 60:.3f}"}
+        with TestClient(ReadYourWritesMiddleware(ResponseCacheMiddleware(app))) as c:
+            for _ in range(2):
+                assert "x-cache" not in c.get("/api/v1/interviews?user_id=1", headers=pin).headers
+            assert len(response_cache.pages) == 0
+            c.get("/api/v1/interviews?user_id=1")
+            assert c.get("/api/v1/interviews?user_id=1").headers["x-cache"] == "hit"
@@ -0,0 +1,22 @@
+import pytest
+
+from app.server import compute_workers, size_pools
+
+
+class TestWorkerSizing:
+    """Test worker count and per-worker pool sizing"""
+
+    def test_compute_workers_from_cpus(self):
+        assert compute_workers(1) == 3
+        assert compute_workers(4) == 9
+        assert compute_workers(4, max_workers=6) == 6
+
+    def test_pools_stay_under_connection_budget(self):
+        for workers in range(1, 20):
+            sizing = size_pools(workers, max_connections=100, reserved=5)
+            assert sizing.pool_size >= 1
+            assert workers * sizing.per_worker <= 95
+
+    def test_budget_too_small_raises(self):
+        with pytest.raises(ValueError):
+            size_pools(workers=10, max_connections=8, reserved=5)
@@ -0,0 +1,240 @@
+from contextlib import ExitStack
+from datetime import datetime, timedelta, timezone
+from http import HTTPStatus
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine
+
+from app.core import security
+from app.db import models
+from app.db import session as db_session
+from app.db.base import Base
+from app.db.shards import HashRing, ShardRouter
+from app.services import reminders, similar
+from app.services.archive import archive_interviews
+from app.services.compaction import make_compactor
+
+
+@pytest.fixture
+def shard_router(tmp_path, TestingSessionLocal, monkeypatch):
+    # the regular test database acts as the global directory
+    urls = [f"sqlite:///{tmp_path / f'shard{i}.db'}" for i in range(2)]
+    for url in urls:
+        engine = create_engine(url)
+        Base.metadata.create_all(bind=engine)
+        engine.dispose()
+    router = ShardRouter(urls, directory=TestingSessionLocal)
+    monkeypatch.setattr(db_session, "shard_router", router)
+    yield router
+    router.dispose()
+
+
+def rows_per_shard(router, model):
+    return {name: n for name, n in router.scatter(lambda db: db.query(model).count()).items()}
+
+
+class TestHashRing:
+    """Test consistent-hash placement"""
+
+    def test_spreads_and_mostly_keeps_placement(self):
+        two = HashRing(["shard0", "shard1"])
+        three = HashRing(["shard0", "shard1", "shard2"])
+        placements = [two.shard_for(key) for key in range(3000)]
+        assert 0.35 < placements.count("shard0") / 3000 < 0.65
+
+        moved = sum(two.shard_for(key) != three.shard_for(key) for key in range(3000))
+        assert moved / 3000 < 0.5  # only keys claimed by the new shard move
+
+
+class TestShardRouting:
+    """Test user-sharded routing through the API"""
+
+    def test_users_and_interviews_land_on_their_shard(self, client, shard_router):
+        user_ids = [client.post("/api/v1/users", json={"email": f"s{i}@example.com"}).json()["id"] for i in range(20)]
+        assert len(set(user_ids)) == 20
+        for user_id in user_ids:
+            response = client.post("/api/v1/interviews", json={"user_id": user_id, "company": "Acme"})
+            assert response.status_code == HTTPStatus.CREATED
+
+        users = rows_per_shard(shard_router, models.User)
+        interviews = rows_per_shard(shard_router, models.Interview)
+        assert sum(users.values()) == 20 and all(users.values())
+        assert interviews == users
+
+        user_id = user_ids[3]
+        shard = shard_router.shard_for_user(user_id)
+        with shard_router.session(shard) as db:
+            assert db.get(models.User, user_id) is not None
+
+        interviews = client.get(f"/api/v1/interviews?user_id={user_id}").json()
+        assert len(interviews) == 1
+        response = client.get(f"/api/v1/interviews/{interviews[0]['id']}")
+        assert response.status_code == HTTPStatus.OK
+
+    def test_admin_listing_scatter_gathers(self, client, shard_router):
+        user_ids = [client.post("/api/v1/users", json={"email": f"l{i}@example.com"}).json()["id"] for i in range(6)]
+
+        response = client.get("/api/v1/users?limit=4&offset=1")
+        assert [u["id"] for u in response.json()] == sorted(user_ids, reverse=True)[1:5]
+
+        response = client.get(f"/api/v1/users?ids={user_ids[5]},{user_ids[0]},999999")
+        assert [u["id"] for u in response.json()["items"]] == [user_ids[5], user_ids[0]]
+        assert response.json()["missing"] == [999999]
+
+        # emails stay unique across shards
+        response = client.post("/api/v1/users", json={"email": "L0@example.com"})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_emails_claimed_in_directory(self, client, shard_router):
+        """Test email changes and deletes keep the directory's claims in step"""
+        first = client.post("/api/v1/users", json={"email": "first@example.com"}).json()["id"]
+        second = client.post("/api/v1/users", json={"email": "second@example.com"}).json()["id"]
+
+        response = client.patch(f"/api/v1/users/{second}", json={"email": "FIRST@example.com"})
+        assert response.status_code == HTTPStatus.CONFLICT
+        response = client.patch(f"/api/v1/users/{first}", json={"email": "renamed@example.com"})
+        assert response.status_code == HTTPStatus.OK
+        # the old address is free again, the new one is taken
+        assert client.patch(f"/api/v1/users/{second}", json={"email": "first@example.com"}).status_code == HTTPStatus.OK
+        response = client.post("/api/v1/users", json={"email": "renamed@example.com"})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+        client.delete(f"/api/v1/users/{first}")
+        response = client.post("/api/v1/users", json={"email": "renamed@example.com"})
+        assert response.status_code == HTTPStatus.CREATED
+
+    def test_compactor_per_shard(self, client, shard_router):
+        """Test each shard's compactor purges the tombstones on its shard"""
+        user_id = client.post("/api/v1/users", json={"email": "gone@example.com"}).json()["id"]
+        client.post("/api/v1/interviews", json={"user_id": user_id})
+        client.delete(f"/api/v1/users/{user_id}")
+        long_ago = datetime.now(timezone.utc) - timedelta(days=1)
+        for model in (models.User, models.Interview):
+            shard_router.scatter(lambda db: (db.query(model).update({"deleted_at": long_ago}), db.commit()))
+
+        jobs = [make_compactor(factory, shard=name) for name, factory in shard_router.sessionmakers.items()]
+        assert sum(job.run_once() for job in jobs) == 2
+        assert rows_per_shard(shard_router, models.User) == {name: 0 for name in shard_router.names}
+
+    def test_reminders_per_shard(self, client, shard_router, monkeypatch):
+        """Test every shard's scheduler sends the reminders for its own interviews"""
+        sent = []
+        monkeypatch.setattr(reminders, "notifier", SimpleNamespace(send=sent.append))
+        monkeypatch.setattr(reminders, "schedulers", [])
+        jobs = [reminders.make_reminder_job(factory, shard=name) for name, factory in shard_router.sessionmakers.items()]
+        starts_at = (datetime.now(timezone.utc) + timedelta(minutes=30)).isoformat()
+        interview_ids = set()
+        for i in range(6):
+            user_id = client.post("/api/v1/users", json={"email": f"r{i}@example.com"}).json()["id"]
+            interview_ids.add(client.post("/api/v1/interviews", json={"user_id": user_id, "starts_at": starts_at})
+                              .json()["id"])
+        assert len({shard_router.shard_for_interview(i) for i in interview_ids}) == 2
+
+        for job in jobs:
+            job.run_once()
+        assert {r.interview_id for r in sent} == interview_ids
+
+    def test_similar_index_reads_every_shard(self, client, shard_router, tmp_path, monkeypatch):
+        """Test the similar-interview index follows each shard's change feed"""
+        vector_index = similar.VectorIndex(str(tmp_path / "similar"))
+        assert vector_index.acquire_writer()
+        monkeypatch.setattr(similar, "index", vector_index)
+
+        interview_ids = []
+        for i in range(6):
+            user_id = client.post("/api/v1/users", json={"email": f"v{i}@example.com"}).json()["id"]
+            interview_ids.append(client.post("/api/v1/interviews", json={
+                "user_id": user_id, "company": "Acme", "role": "Backend Engineer"}).json()["id"])
+        assert len({shard_router.shard_for_interview(i) for i in interview_ids}) == 2
+        with ExitStack() as stack:
+            feeds = similar._open(stack, shard_router.sessionmakers)
+            while similar.sync(feeds, vector_index):
+                pass
+        assert set(vector_index.stats()["cursors"]) == set(shard_router.names)
+
+        response = client.get(f"/api/v1/interviews/{interview_ids[0]}/similar")
+        assert {r["id"] for r in response.json()} == set(interview_ids[1:])
+        vector_index.release_writer()
+
+    def test_sub_only_token(self, client, shard_router, monkeypatch):
+        """Test a token carrying only google_sub finds its user on the user's shard"""
+        monkeypatch.setenv("AUTH_HMAC_KEYS", "k1:shards-secret")
+        security._keyset_cache.clear()
+        security._claims_cache.clear()
+        security._user_id_cache.clear()
+        user_id = client.post("/api/v1/users", json={"email": "sub@example.com", "google_sub": "sub-shard"}).json()["id"]
+        client.post("/api/v1/interviews", json={"user_id": user_id, "company": "Acme"})
+
+        headers = {"Authorization": f"Bearer {security.issue_token({'sub': 'sub-shard'})}"}
+        response = client.get("/api/v1/interviews", headers=headers)
+        assert response.status_code == HTTPStatus.OK
+        assert [i["user_id"] for i in response.json()] == [user_id]
+
+        headers = {"Authorization": f"Bearer {security.issue_token({'sub': 'sub-unknown'})}"}
+        assert client.get("/api/v1/interviews", headers=headers).status_code == HTTPStatus.UNAUTHORIZED
+        security._keyset_cache.clear()
+        security._user_id_cache.clear()
+
+    def test_duplicate_scan_covers_every_shard(self, client, shard_router, monkeypatch):
+        """Test the admin duplicate pass without user_id re-links interviews on all shards"""
+        user_ids = [client.post("/api/v1/users", json={"email": f"d{i}@example.com"}).json()["id"] for i in range(6)]
+        assert all(rows_per_shard(shard_router, models.User).values())
+        starts_at = datetime(2026, 11, 2, 15, 0, tzinfo=timezone.utc).isoformat()
+        for user_id in user_ids:
+            for _ in range(2):
+                client.post("/api/v1/interviews", json={"user_id": user_id, "company": "Acme", "starts_at": starts_at})
+        shard_router.scatter(lambda db: (db.query(models.Interview).update({"duplicate_of": None}), db.commit()))
+
+        monkeypatch.setenv("AUTH_HMAC_KEYS", "k1:shards-secret")
+        security._keyset_cache.clear()
+        security._claims_cache.clear()
+        token = security.issue_token({"uid": 1, "admin": True})
+        response = client.post("/api/v1/admin/duplicates/scan", headers={"Authorization": f"Bearer {token}"})
+        assert response.json() == {"users": 6, "links_changed": 6}
+        linked = shard_router.scatter(lambda db: db.query(models.Interview).filter(
+            models.Interview.duplicate_of.is_not(None)).count())
+        assert sum(linked.values()) == 6
+        security._keyset_cache.clear()
+
+    def test_move_user_between_shards(self, client, shard_router):
+        user_id = client.post("/api/v1/users", json={"email": "mover@example.com"}).json()["id"]
+        starts_at = (datetime.now(timezone.utc) - timedelta(days=400)).isoformat()
+        archived_id = client.post("/api/v1/interviews", json={"user_id": user_id, "starts_at": starts_at}).json()["id"]
+        source = shard_router.shard_for_user(user_id)
+        with shard_router.session(source) as db:
+            assert archive_interviews(db, older_than=timedelta(days=180)) == 1
+        assert client.get(f"/api/v1/interviews/{archived_id}").status_code == HTTPStatus.OK # placement cached
+        interview_id = client.post("/api/v1/interviews", json={"user_id": user_id}).json()["id"]
+        cursor = client.get(f"/api/v1/interviews/changes?user_id={user_id}").json()["cursor"]
+
+        target = next(name for name in shard_router.names if name != source)
+        assert shard_router.move_user(user_id, target) == 3
+
+        assert shard_router.shard_for_user(user_id) == target
+        assert rows_per_shard(shard_router, models.Interview)[source] == 0
+        assert rows_per_shard(shard_router, models.InterviewArchive) == {source: 0, target: 1}
+        assert client.get(f"/api/v1/users/{user_id}").status_code == HTTPStatus.OK
+        assert client.get(f"/api/v1/interviews/{interview_id}").status_code == HTTPStatus.OK
+        assert client.get(f"/api/v1/interviews/{archived_id}").status_code == HTTPStatus.OK
+
+        # moved rows are re-stamped past the old cursor, so sync clients see them again
+        changes = client.get(f"/api/v1/interviews/changes?user_id={user_id}&since={cursor}").json()
+        assert [item["id"] for item in changes["items"]] == [interview_id]
+
+    def test_move_from_another_process(self, client, shard_router, TestingSessionLocal):
+        """Test workers stop routing to the old shard once a lookup there misses"""
+        user_id = client.post("/api/v1/users", json={"email": "elsewhere@example.com"}).json()["id"]
+        interview_id = client.post("/api/v1/interviews", json={"user_id": user_id}).json()["id"]
+        assert client.get(f"/api/v1/interviews/{interview_id}").status_code == HTTPStatus.OK # both cached now
+
+        # the move CLI: its own router, sharing only the databases
+        cli = ShardRouter([str(e.url) for e in shard_router.engines.values()], directory=TestingSessionLocal)
+        target = next(name for name in cli.names if name != shard_router.shard_for_user(user_id))
+        cli.move_user(user_id, target)
+        cli.dispose()
+
+        assert client.get(f"/api/v1/users/{user_id}").status_code == HTTPStatus.NOT_FOUND
+        assert client.get(f"/api/v1/users/{user_id}").status_code == HTTPStatus.OK
+        assert client.get(f"/api/v1/interviews/{interview_id}").status_code == HTTPStatus.NOT_FOUND
+        assert client.get(f"/api/v1/interviews/{interview_id}").status_code == HTTPStatus.OK
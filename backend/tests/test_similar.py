@@ -0,0 +1,182 @@
+from datetime import timedelta
+from http import HTTPStatus
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.core import security
+from app.db import models
+from app.services import compaction, similar
+
+
+@pytest.fixture
+def vector_index(tmp_path, monkeypatch):
+    index = similar.VectorIndex(str(tmp_path))
+    assert index.acquire_writer()
+    monkeypatch.setattr(similar, "index", index)
+    yield index
+    index.release_writer()
+
+
+def sync(session_factory, index):
+    with session_factory() as db:
+        while similar.sync({similar.MAIN: db}, index):
+            pass
+
+
+def create(client, **fields):
+    payload = {"user_id": 1, "company": "Acme", "role": "Backend Engineer", "type": "coding", **fields}
+    return client.post("/api/v1/interviews", json=payload).json()
+
+
+def interview(company, role, type="coding", notes=""):
+    return SimpleNamespace(company=company, role=role, type=type, details={"notes": notes})
+
+
+class TestVectors:
+    """Test hashed n-gram vectors"""
+
+    def test_unit_length(self):
+        assert np.linalg.norm(similar.vectorize(interview("Acme", "SWE"))) == pytest.approx(1.0)
+        assert not similar.vectorize(interview(None, None, None)).any()
+
+    def test_spelling_variants_score_higher(self):
+        """Test company/role variants beat a different company"""
+        query = similar.vectorize(interview("Acme Inc.", "Senior Backend Engineer", notes="system design"))
+        variant = similar.vectorize(interview("ACME", "Backend Engineer", notes="system design round"))
+        other = similar.vectorize(interview("Globex", "Product Designer", "design", notes="portfolio review"))
+        assert query @ variant > 0.7
+        assert query @ variant > query @ other + 0.4
+
+
+class TestSimilarApi:
+    """Test GET /interviews/{id}/similar"""
+
+    def test_ranked_matches(self, client, TestingSessionLocal, vector_index):
+        """Test the closest interviews come first and the interview itself is left out"""
+        query = create(client, details={"notes": "caching and sharding"})
+        close = create(client, user_id=2, company="ACME Inc", details={"notes": "sharding questions"})
+        far = create(client, user_id=3, company="Globex", role="Product Designer", type="design")
+        sync(TestingSessionLocal, vector_index)
+
+        response = client.get(f"/api/v1/interviews/{query['id']}/similar")
+        assert response.status_code == HTTPStatus.OK
+        results = response.json()
+        assert [r["id"] for r in results] == [close["id"], far["id"]]
+        assert results[0]["score"] > results[1]["score"]
+        assert results[0]["company"] == "ACME Inc"
+
+    def test_filters(self, client, TestingSessionLocal, vector_index):
+        """Test type and user_id narrow the candidates"""
+        query = create(client)
+        mine = create(client, type="phone")
+        theirs = create(client, user_id=2)
+        sync(TestingSessionLocal, vector_index)
+
+        by_type = client.get(f"/api/v1/interviews/{query['id']}/similar", params={"type": "phone"}).json()
+        assert [r["id"] for r in by_type] == [mine["id"]]
+        by_user = client.get(f"/api/v1/interviews/{query['id']}/similar", params={"user_id": 2}).json()
+        assert [r["id"] for r in by_user] == [theirs["id"]]
+        limited = client.get(f"/api/v1/interviews/{query['id']}/similar", params={"limit": 1}).json()
+        assert len(limited) == 1
+
+    def test_follows_writes(self, client, TestingSessionLocal, vector_index):
+        """Test creates are appended and deletes tombstoned on the next sync"""
+        query = create(client)
+        sync(TestingSessionLocal, vector_index)
+        assert client.get(f"/api/v1/interviews/{query['id']}/similar").json() == []
+
+        added = create(client, user_id=2)
+        sync(TestingSessionLocal, vector_index)
+        assert [r["id"] for r in client.get(f"/api/v1/interviews/{query['id']}/similar").json()] == [added["id"]]
+
+        client.delete(f"/api/v1/interviews/{added['id']}")
+        # dropped at once, before the index has caught up
+        assert client.get(f"/api/v1/interviews/{query['id']}/similar").json() == []
+        sync(TestingSessionLocal, vector_index)
+        assert vector_index.stats()["dead"] == 1
+
+    def test_duplicates_left_out(self, client, TestingSessionLocal, vector_index):
+        """Test the interview's own duplicate import is not suggested"""
+        query = create(client, starts_at="2026-11-02T15:00:00Z", source="gmail")
+        copy = create(client, starts_at="2026-11-02T15:05:00Z", source="gcal")
+        assert copy["duplicate_of"] == query["id"]
+        sync(TestingSessionLocal, vector_index)
+        assert client.get(f"/api/v1/interviews/{query['id']}/similar").json() == []
+
+    def test_other_users_masked(self, client, TestingSessionLocal, vector_index, monkeypatch):
+        """Test other users' matches come without id and user_id"""
+        monkeypatch.setenv("AUTH_HMAC_KEYS", "k1:similar-secret")
+        security._keyset_cache.clear()
+        security._claims_cache.clear()
+        query = create(client)
+        mine = create(client, role="Backend Developer")
+        create(client, user_id=2)
+        sync(TestingSessionLocal, vector_index)
+
+        headers = {"Authorization": f"Bearer {security.issue_token({'uid': 1})}"}
+        results = client.get(f"/api/v1/interviews/{query['id']}/similar", headers=headers).json()
+        assert {r["id"] for r in results} == {mine["id"], None}
+        assert all(r["company"] == "Acme" for r in results)
+        response = client.get(f"/api/v1/interviews/{query['id']}/similar", params={"user_id": 2}, headers=headers)
+        assert response.status_code == HTTPStatus.FORBIDDEN
+        security._keyset_cache.clear()
+
+    def test_disabled_and_unknown(self, client, monkeypatch):
+        monkeypatch.setattr(similar, "index", None)
+        query = create(client)
+        assert client.get(f"/api/v1/interviews/{query['id']}/similar").status_code == HTTPStatus.NOT_FOUND
+        assert client.get("/api/v1/interviews/999999/similar").status_code == HTTPStatus.NOT_FOUND
+
+
+class TestIndexFiles:
+    """Test the memory-mapped index: lists, compaction and readers"""
+
+    def rows(self, count, offset=0):
+        rng = np.random.default_rng(offset)
+        vectors = rng.standard_normal((count, similar.SIMILAR_DIM)).astype(np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        return [(offset + i + 1, i % 5, i % 4, vectors[i]) for i in range(count)]
+
+    def test_lists_match_exact_scan(self, vector_index, monkeypatch):
+        """Test probing every list returns the exact top-k"""
+        monkeypatch.setattr(similar, "SIMILAR_EXACT_ROWS", 100)
+        rows = self.rows(400)
+        vector_index.compact(vector_index.load_rows(vector_index.staging({}), rows))
+        assert vector_index.stats()["lists"] == 20
+        monkeypatch.setattr(similar, "SIMILAR_NPROBE", 20)
+        query = rows[7][3]
+        exact = sorted(rows, key=lambda row: -(row[3] @ query))[:5]
+        assert [hit_id for hit_id, _ in vector_index.search(query, 5)] == [row[0] for row in exact]
+        owners = {row[0]: row[1] for row in rows}
+        assert {owners[hit_id] for hit_id, _ in vector_index.search(query, 5, user_id=2)} == {2}
+
+    def test_compaction_drops_tombstones(self, vector_index, monkeypatch):
+        monkeypatch.setattr(similar, "SIMILAR_EXACT_ROWS", 100)
+        vector_index.compact(vector_index.load_rows(vector_index.staging({}), self.rows(200)))
+        vector_index.apply(self.rows(10, offset=1000), removals=range(1, 61), cursor=5)
+        stats = vector_index.stats()
+        assert (stats["rows"], stats["dead"], stats["clustered"]) == (210, 60, 200)
+        assert vector_index.needs_compaction()
+
+        reader = similar.VectorIndex(vector_index.root)
+        assert not reader.acquire_writer()
+        assert reader.stats()["rows"] == 210
+        vector_index.compact()
+        assert reader.stats() == {"rows": 150, "dead": 0, "clustered": 150, "lists": 12, "cursors": {"main": 5},
+                                  "generation": vector_index.stats()["generation"]}
+        assert not {hit_id for hit_id, _ in reader.search(self.rows(1)[0][3], 150)} & set(range(1, 61))
+
+    def test_purged_feed_rebuilds(self, client, TestingSessionLocal, vector_index):
+        """Test a cursor older than purged tombstones triggers a rebuild"""
+        kept, deleted = create(client), create(client)
+        sync(TestingSessionLocal, vector_index)
+        generation = vector_index.stats()["generation"]
+        client.delete(f"/api/v1/interviews/{deleted['id']}")
+        with TestingSessionLocal() as db:
+            assert compaction.purge_tombstones(db, models.Interview, retention=timedelta(0)) == 1
+        sync(TestingSessionLocal, vector_index)
+        assert vector_index.stats()["generation"] > generation
+        assert vector_index.stats()["rows"] == 1
+        assert client.get(f"/api/v1/interviews/{kept['id']}/similar").json() == []
@@ -0,0 +1,101 @@
+from http import HTTPStatus
+
+import pytest
+from sqlalchemy import text
+
+from app.core import security
+from app.db import slow_queries
+from app.db.slow_queries import SlowQueryLog, fingerprint
+
+
+@pytest.fixture(autouse=True)
+def slow_log(monkeypatch):
+    monkeypatch.setenv("AUTH_HMAC_KEYS", "k1:slow-query-secret")
+    security._keyset_cache.clear()
+    security._claims_cache.clear()
+    log = SlowQueryLog()
+    monkeypatch.setattr(slow_queries, "slow_log", log)
+    monkeypatch.setattr(slow_queries, "SLOW_QUERY_THRESHOLD_MS", 0) # every statement is "slow"
+    yield log
+    security._keyset_cache.clear()
+
+
+def admin():
+    return {"Authorization": f"Bearer {security.issue_token({'uid': 1, 'admin': True})}"}
+
+
+class TestFingerprint:
+    """Test statements are grouped regardless of their literals"""
+
+    def test_literals_and_in_lists_collapse(self):
+        """Test numbers, strings and IN-lists of any length share a fingerprint"""
+        assert fingerprint("SELECT * FROM users WHERE id IN (?, ?, ?)") == \
+            fingerprint("SELECT *\n  FROM users WHERE id IN (?)")
+        assert fingerprint("SELECT 1 FROM t WHERE a = 'x' AND b = 42") == \
+            "SELECT ? FROM t WHERE a = ? AND b = ?"
+
+
+class TestSlowQueryLog:
+    """Test slow statements are aggregated with their plans"""
+
+    def test_aggregates_and_captures_plan(self, engine, slow_log):
+        """Test repeated statements count once per fingerprint and full scans are flagged"""
+        with engine.connect() as conn:
+            for email in ("a@example.com", "b@example.com"):
+                conn.execute(text("SELECT id FROM users WHERE email_lower = :e"), {"e": email})
+            conn.execute(text("SELECT id FROM users WHERE id = :id"), {"id": 1})
+
+        entries = {e["fingerprint"]: e for e in slow_log.top()}
+        scan = entries["SELECT id FROM users WHERE email_lower = ?"]
+        lookup = entries["SELECT id FROM users WHERE id = ?"]
+        assert scan["count"] == 2 and scan["params"] == "<redacted>"
+        assert lookup["count"] == 1 and lookup["plan"]
+        assert lookup["full_scan"] is False
+
+    def test_full_scan_flagged(self, engine, slow_log):
+        """Test a query without a usable index is marked as a full scan"""
+        with engine.connect() as conn:
+            conn.execute(text("SELECT id FROM interviews WHERE company = :c"), {"c": "Acme"})
+        [entry] = [e for e in slow_log.top() if "company" in e["fingerprint"]]
+        assert entry["full_scan"] is True
+
+    def test_params_logged_when_enabled(self, engine, slow_log, monkeypatch):
+        """Test sample parameters are only kept when explicitly allowed"""
+        monkeypatch.setattr(slow_queries, "SLOW_QUERY_LOG_PARAMS", True)
+        with engine.connect() as conn:
+            conn.execute(text("SELECT id FROM users WHERE id = :id"), {"id": 7})
+        [entry] = slow_log.top()
+        assert "7" in entry["params"]
+
+    def test_threshold_filters(self, engine, slow_log, monkeypatch):
+        """Test statements under the threshold are not recorded"""
+        monkeypatch.setattr(slow_queries, "SLOW_QUERY_THRESHOLD_MS", 60_000)
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        assert slow_log.top() == []
+
+    def test_bounded(self, slow_log):
+        """Test new fingerprints are dropped once the log is full"""
+        small = SlowQueryLog(max_fingerprints=1)
+        small.record("SELECT a FROM t", (), 5.0, None)
+        small.record("SELECT b FROM t", (), 5.0, None)
+        assert len(small.top()) == 1 and small.dropped == 1
+
+
+class TestSlowQueryEndpoint:
+    """Test the admin slow-query endpoints"""
+
+    def test_reports_route_of_origin(self, client, slow_log):
+        """Test entries name the route template that issued them"""
+        client.get("/api/v1/interviews", params={"user_id": 1})
+        response = client.get("/api/v1/admin/slow-queries", headers=admin())
+        assert response.status_code == HTTPStatus.OK
+        routes = {route for e in response.json()["queries"] for route in e["routes"]}
+        assert "GET /api/v1/interviews" in routes
+
+        assert client.delete("/api/v1/admin/slow-queries", headers=admin()).status_code == HTTPStatus.NO_CONTENT
+        assert slow_log.top() == []
+
+    def test_requires_admin(self, client):
+        """Test the endpoint is not public"""
+        assert client.get("/api/v1/admin/slow-queries").status_code == HTTPStatus.UNAUTHORIZED
@@ -0,0 +1,71 @@
+from http import HTTPStatus
+from typing import get_args
+
+import pytest
+from sqlalchemy import text
+
+from app.db import models, types
+from app.schemas import InterviewSource, InterviewType
+
+
+class TestCodedEnums:
+    """Test type/source are stored as small integers"""
+
+    def test_codes_cover_schema_literals(self):
+        """Test every value the API accepts has an on-disk code"""
+        assert set(models.INTERVIEW_TYPE_CODES) == set(get_args(InterviewType))
+        assert set(models.INTERVIEW_SOURCE_CODES) == set(get_args(InterviewSource))
+
+    def test_round_trip_and_filter(self, client, engine):
+        """Test the API still speaks strings while the row holds codes"""
+        created = client.post("/api/v1/interviews",
+                              json={"user_id": 1, "type": "coding", "source": "gcal"}).json()
+        assert created["type"] == "coding" and created["source"] == "gcal"
+        with engine.connect() as conn:
+            raw = conn.execute(text("SELECT type, source FROM interviews WHERE id = :id"),
+                               {"id": created["id"]}).one()
+        assert tuple(raw) == (models.INTERVIEW_TYPE_CODES["coding"], models.INTERVIEW_SOURCE_CODES["gcal"])
+
+        # filters compare codes too
+        response = client.patch("/api/v1/interviews:batch",
+                                json={"filter": {"user_id": 1, "type": "coding"}, "patch": {"role": "SWE"}})
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()["updated"] == [created["id"]]
+
+    def test_unknown_value_rejected(self):
+        """Test values without a code fail instead of being stored"""
+        with pytest.raises(ValueError):
+            types.CodedEnum({"a": 1}).process_bind_param("b", None)
+
+
+class TestPackedJSON:
+    """Test details are stored as packed, possibly compressed bytes"""
+
+    def test_small_documents_stay_uncompressed(self):
+        """Test documents under the threshold are plain msgpack"""
+        packed = types.pack({"notes": "short"})
+        assert packed[:1] == b"m" and types.unpack(packed) == {"notes": "short"}
+
+    def test_large_documents_compressed(self):
+        """Test documents over the threshold are zlib-compressed"""
+        document = {"notes": "interview " * 200}
+        packed = types.pack(document)
+        assert packed[:1] == b"M" and len(packed) < 200
+        assert types.unpack(packed) == document
+
+    def test_json_fallback_readable(self, monkeypatch):
+        """Test rows written without msgpack decode either way"""
+        monkeypatch.setattr(types, "msgpack", None)
+        packed = types.pack({"notes": "x" * 1000})
+        assert packed[:1] == b"J"
+        monkeypatch.undo()
+        assert types.unpack(packed) == {"notes": "x" * 1000}
+
+    def test_api_round_trip(self, client, engine):
+        """Test the API returns details exactly as sent while the row holds bytes"""
+        details = {"notes": "system design " * 100, "interviewers": ["A", "B"], "round": 2}
+        created = client.post("/api/v1/interviews", json={"user_id": 1, "details": details}).json()
+        assert client.get(f"/api/v1/interviews/{created['id']}").json()["details"] == details
+        with engine.connect() as conn:
+            stored = conn.execute(text("SELECT details FROM interviews WHERE id = :id"), {"id": created["id"]}).scalar()
+        assert isinstance(stored, bytes) and len(stored) < len(details["notes"])
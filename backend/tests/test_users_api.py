@@ -1,4 +1,5 @@
 import pytest
+from datetime import datetime, timedelta, timezone
 from http import HTTPStatus
 
 
@@ -175,6 +176,18 @@ class TestUserRetrieval:
         assert len(data) == 1
         assert data[0]["email"] == "filter1@example.com"
 
+    def test_multi_get_users(self, client):
+        """Test fetching several users by id in one request"""
+        first = client.post("/api/v1/users", json={"email": "multi1@example.com"}).json()["id"]
+        second = client.post("/api/v1/users", json={"email": "multi2@example.com"}).json()["id"]
+
+        response = client.get(f"/api/v1/users?ids={second},{first},99999")
+        assert response.status_code == HTTPStatus.OK
+
+        data = response.json()
+        assert [user["id"] for user in data["items"]] == [second, first]
+        assert data["missing"] == [99999]
+
     def test_list_users_pagination(self, client):
         """Test pagination functionality"""
         # Create 5 users
@@ -352,6 +365,17 @@ class TestUserDeletion:
         get_response = client.get(f"/api/v1/users/{user_id}")
         assert get_response.status_code == HTTPStatus.NOT_FOUND
 
+    def test_deleted_email_can_sign_up_again(self, client):
+        """Test uniqueness only applies to live users"""
+        payload = {"email": "again@example.com", "google_sub": "again123"}
+        user_id = client.post("/api/v1/users", json=payload).json()["id"]
+        client.delete(f"/api/v1/users/{user_id}")
+
+        response = client.post("/api/v1/users", json=payload)
+        assert response.status_code == HTTPStatus.CREATED
+        assert response.json()["id"] != user_id
+        assert [u["id"] for u in client.get("/api/v1/users").json()] == [response.json()["id"]]
+
     def test_delete_user_not_found(self, client):
         """Test deleting non-existent user"""
         response = client.delete("/api/v1/users/99999")
@@ -363,6 +387,68 @@ class TestUserDeletion:
         assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
 
 
+class TestUserDashboard:
+    """Test the single-round-trip home screen endpoint"""
+
+    def _interview(self, client, user_id, hours, **fields):
+        starts_at = (datetime.now(timezone.utc) + timedelta(hours=hours)).isoformat()
+        payload = {"user_id": user_id, "starts_at": starts_at, **fields}
+        return client.post("/api/v1/interviews", json=payload).json()["id"]
+
+    def test_dashboard_contents(self, client):
+        """Test upcoming soonest first, recent latest first, and per-type counts"""
+        user_id = client.post("/api/v1/users", json={"email": "dash@example.com"}).json()["id"]
+        later = self._interview(client, user_id, 48, type="coding")
+        soon = self._interview(client, user_id, 2, type="coding")
+        past = self._interview(client, user_id, -24, type="phone")
+        older = self._interview(client, user_id, -72)
+        client.post("/api/v1/interviews", json={"user_id": user_id}) # no starts_at: counted only
+        deleted = self._interview(client, user_id, 1, type="design")
+        client.delete(f"/api/v1/interviews/{deleted}")
+        self._interview(client, user_id + 1, 3, type="coding") # someone else's
+
+        response = client.get(f"/api/v1/users/{user_id}/dashboard", params={"upcoming": 5, "recent": 1})
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert data["user"]["email"] == "dash@example.com"
+        assert [i["id"] for i in data["upcoming"]] == [soon, later]
+        assert [i["id"] for i in data["recent"]] == [past]
+        assert "details" not in data["upcoming"][0]
+        assert data["counts_by_type"] == {"coding": 2, "phone": 1}
+        assert data["total"] == 5
+        assert older not in [i["id"] for i in data["recent"]]
+        # sqlite hands back naive datetimes; the API always says UTC
+        assert datetime.fromisoformat(data["upcoming"][0]["starts_at"]).tzinfo is not None
+
+    def test_dashboard_is_two_statements(self, client, sql_statements):
+        """Test the whole dashboard costs the user lookup plus one UNION ALL"""
+        user_id = client.post("/api/v1/users", json={"email": "dash@example.com"}).json()["id"]
+        for hours in (-5, -1, 1, 5):
+            self._interview(client, user_id, hours, type="coding")
+        sql_statements.clear()
+
+        assert client.get(f"/api/v1/users/{user_id}/dashboard").status_code == HTTPStatus.OK
+        selects = [s for s in sql_statements if s.lstrip().upper().startswith("SELECT")]
+        assert len(selects) == 2
+        assert "UNION ALL" in selects[1]
+
+    def test_dashboard_uses_indexes(self, client, engine, sql_statements):
+        """Test no branch of the UNION scans the interviews table"""
+        user_id = client.post("/api/v1/users", json={"email": "dash@example.com"}).json()["id"]
+        sql_statements.clear()
+        client.get(f"/api/v1/users/{user_id}/dashboard")
+        union = next(s for s in sql_statements if "UNION ALL" in s)
+        with engine.connect() as conn:
+            # placeholder values do not change the plan
+            plan = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + union, (user_id,) * union.count("?")).all()
+        details = [row[-1] for row in plan]
+        assert not any(d.startswith("SCAN interviews") for d in details), details
+
+    def test_dashboard_unknown_user(self, client):
+        """Test a missing user is a 404"""
+        assert client.get("/api/v1/users/999999/dashboard").status_code == HTTPStatus.NOT_FOUND
+
+
 class TestUserEdgeCases:
     """Test edge cases and error scenarios"""
 
@@ -393,14 +479,29 @@ class TestUserEdgeCases:
         assert data["email"] == "extra@example.com"
         assert data["google_sub"] == "extra123"
 
-    def test_case_sensitive_email(self, client):
-        """Test that email addresses are case sensitive"""
+    def test_case_insensitive_email(self, client):
+        """Test that emails differing only by case are duplicates"""
         # Create user with lowercase email
         client.post("/api/v1/users", json={"email": "case@example.com"})
         
-        # Try to create user with uppercase email (should succeed)
+        # Try to create user with uppercase email (should be rejected)
         response = client.post("/api/v1/users", json={"email": "CASE@example.com"})
-        assert response.status_code == HTTPStatus.CREATED
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+        # Updating another user to a case variant conflicts too
+        other_id = client.post("/api/v1/users", json={"email": "other@example.com"}).json()["id"]
+        response = client.patch(f"/api/v1/users/{other_id}", json={"email": "Case@Example.com"})
+        assert response.status_code == HTTPStatus.CONFLICT
+
+    def test_email_filter_case_insensitive(self, client):
+        """Test email lookups ignore case unless exact_email is set"""
+        client.post("/api/v1/users", json={"email": "Mixed@example.com"})
+
+        response = client.get("/api/v1/users?email=mixed@EXAMPLE.com")
+        assert [user["email"] for user in response.json()] == ["Mixed@example.com"]
+
+        response = client.get("/api/v1/users?email=mixed@example.com&exact_email=true")
+        assert response.json() == []
 
     def test_unicode_in_email(self, client):
         """Test creating user with unicode characters in email"""